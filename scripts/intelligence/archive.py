@@ -0,0 +1,481 @@
+"""
+Lynx Eye Archive
+Archive locale en colonnes des items collectés, écrite à chaque exécution à côté des upserts :
+- partitions par jour de publication (UTC) : archive/day=AAAA-MM-JJ/part-*.lya
+- un fichier par lot écrit : colonnes contiguës (horodatages, score, source et mots-clés
+  encodés par dictionnaire, external_id et contenu en offsets + UTF-8) et pied JSON
+- lecture par mmap : les colonnes sont des memoryview sur le fichier, seules les lignes
+  retenues sont décodées ; la mémoire ne dépend pas de la taille de l'archive
+- lignes triées par source puis date : le filtre par source est une plage de lignes,
+  le filtre par date une recherche dichotomique, sans parcours
+- requêtes : Archive.scan(start, end, sources, keywords, columns) et Archive.count(...)
+
+Usage :
+    python archive.py --from 2026-02-01 --to 2026-02-07 --source "Gabon Review (national)"
+    python archive.py --keyword oligui --count
+    python archive.py --compact    # fusionne les fichiers des jours passés
+"""
+
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+
+import metrics
+import settings
+from state import state_path
+
+MAGIC = b'LYNXARC1'
+# Pied du fichier : taille du JSON de description puis MAGIC
+TRAILER = struct.Struct('<Q8s')
+FORMAT_VERSION = 1
+PART_SUFFIX = '.lya'
+# Lignes gardées en mémoire avant écriture d'un lot
+DEFAULT_FLUSH_ROWS = 20000
+
+COLUMNS = ('published_at', 'collected_at', 'author', 'external_id', 'content',
+           'relevance_score', 'matched_keywords')
+
+ArchiveRow = namedtuple('ArchiveRow', ['published', 'collected', 'author', 'external_id', 'content',
+                                       'relevance', 'keywords'])
+
+_part_counter = itertools.count()
+
+
+def archive_dir():
+    """Répertoire de l'archive (LYNX_ARCHIVE_DIR, sinon .lynx_state/archive/)"""
+    directory = settings.get('LYNX_ARCHIVE_DIR') or state_path('archive')
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def to_timestamp(value):
+    """Horodatage Unix (s) d'une date ISO 8601, RFC 822 (flux RSS), date ou datetime ; None si illisible"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    if not isinstance(value, datetime):
+        text = str(value).strip()
+        try:
+            value = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            # Import différé : email.utils coûte plus que tout le reste du module
+            from email.utils import parsedate_to_datetime
+            try:
+                value = parsedate_to_datetime(text)
+            except (TypeError, ValueError, IndexError):
+                return None
+    # Dates naïves : heure locale, comme datetime.now().isoformat() dans les scrapers
+    return int(value.timestamp())
+
+
+def _day(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).date()
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def archive_row(item, collected):
+    """Ligne d'archive d'un item sauvegardé (date de collecte à défaut de date de publication)"""
+    published = to_timestamp(item.get('published_at'))
+    return ArchiveRow(
+        published if published is not None else collected,
+        collected,
+        item.get('author') or '',
+        item.get('external_id') or '',
+        item.get('content') or '',
+        float(item.get('relevance_score') or 0.0),
+        tuple(item.get('matched_keywords') or ()),
+    )
+
+
+def _strings(values):
+    offsets = array('Q', [0])
+    data = bytearray()
+    for value in values:
+        data += value.encode('utf-8')
+        offsets.append(len(data))
+    return offsets, data
+
+
+def part_path(root, day):
+    """Nouveau fichier de partition du jour (nom unique entre processus et workers)"""
+    directory = os.path.join(root, f"day={day.isoformat()}")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"part-{time.time_ns()}-{os.getpid()}-{next(_part_counter)}{PART_SUFFIX}")
+
+
+def write_part(path, rows):
+    """Écrit un fichier de partition (ArchiveRow), de façon atomique ; retourne le nombre de lignes"""
+    rows = sorted(rows, key=lambda row: (row.author, row.published, row.external_id))
+    if not rows:
+        return 0
+    sources = [author for author, _ in itertools.groupby(row.author for row in rows)]
+    source_rows = []
+    start = 0
+    for _, group in itertools.groupby(rows, key=lambda row: row.author):
+        end = start + sum(1 for _ in group)
+        source_rows.append([start, end])
+        start = end
+    keywords = sorted({keyword for row in rows for keyword in row.keywords})
+    keyword_ids = {keyword: index for index, keyword in enumerate(keywords)}
+    source_ids = {author: index for index, author in enumerate(sources)}
+
+    keyword_offsets = array('Q', [0])
+    keyword_column = array('I')
+    for row in rows:
+        keyword_column.extend(keyword_ids[keyword] for keyword in row.keywords)
+        keyword_offsets.append(len(keyword_column))
+    external_id_offsets, external_id_data = _strings(row.external_id for row in rows)
+    content_offsets, content_data = _strings(row.content for row in rows)
+
+    sections = [
+        ('published', array('q', (row.published for row in rows))),
+        ('collected', array('q', (row.collected for row in rows))),
+        ('source', array('I', (source_ids[row.author] for row in rows))),
+        ('relevance', array('f', (row.relevance for row in rows))),
+        ('external_id_offsets', external_id_offsets),
+        ('external_id_data', external_id_data),
+        ('content_offsets', content_offsets),
+        ('content_data', content_data),
+        ('keyword_offsets', keyword_offsets),
+        ('keyword_ids', keyword_column),
+    ]
+    published = [row.published for row in rows]
+    layout = {}
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        position = len(MAGIC)
+        for name, values in sections:
+            # Colonnes alignées sur 8 octets : memoryview.cast directement sur le mmap
+            padding = -position % 8
+            f.write(b'\0' * padding)
+            position += padding
+            payload = values.tobytes() if isinstance(values, array) else bytes(values)
+            layout[name] = [position, len(payload), values.typecode if isinstance(values, array) else 'B']
+            f.write(payload)
+            position += len(payload)
+        footer = json.dumps({
+            'version': FORMAT_VERSION,
+            'byteorder': sys.byteorder,
+            'rows': len(rows),
+            'columns': layout,
+            'sources': sources,
+            'source_rows': source_rows,
+            'keywords': keywords,
+            'min_published': min(published),
+            'max_published': max(published),
+        }, ensure_ascii=False).encode('utf-8')
+        f.write(footer)
+        f.write(TRAILER.pack(len(footer), MAGIC))
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+class ArchivePart:
+    """Fichier de partition ouvert en mmap ; colonnes lues à la demande"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self._columns = {}
+        try:
+            footer_size, magic = TRAILER.unpack(self._view[-TRAILER.size:])
+            if magic != MAGIC or self._view[:len(MAGIC)] != MAGIC:
+                raise ValueError('marqueur absent')
+            footer = json.loads(bytes(self._view[-TRAILER.size - footer_size:-TRAILER.size]))
+            if footer['version'] != FORMAT_VERSION or footer['byteorder'] != sys.byteorder:
+                raise ValueError('format ou boutisme différent')
+        except (ValueError, KeyError, struct.error) as e:
+            self.close()
+            raise ValueError(f"Fichier d'archive illisible {path}: {e}") from e
+        self.rows = footer['rows']
+        self.sources = footer['sources']
+        self.source_rows = footer['source_rows']
+        self.keywords = footer['keywords']
+        self.min_published = footer['min_published']
+        self.max_published = footer['max_published']
+        self._layout = footer['columns']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def column(self, name):
+        """Colonne `name` sous forme de memoryview typée (aucune copie)"""
+        view = self._columns.get(name)
+        if view is None:
+            offset, length, typecode = self._layout[name]
+            view = self._view[offset:offset + length]
+            if typecode != 'B':
+                view = view.cast(typecode)
+            self._columns[name] = view
+        return view
+
+    def select(self, start=None, end=None, sources=None, keywords=None):
+        """
+        Indices des lignes retenues, dans l'ordre du fichier.
+        start / end : horodatages (fin exclue) ; sources : noms exacts ;
+        keywords : mots-clés en minuscules (au moins un présent)
+        """
+        if (start is not None and self.max_published < start) or (end is not None and self.min_published >= end):
+            return
+        wanted = None
+        if keywords is not None:
+            wanted = {index for index, keyword in enumerate(self.keywords) if keyword.casefold() in keywords}
+            if not wanted:
+                return
+            keyword_offsets = self.column('keyword_offsets')
+            keyword_ids = self.column('keyword_ids')
+        published = self.column('published')
+        for name, (low, high) in zip(self.sources, self.source_rows):
+            if sources is not None and name not in sources:
+                continue
+            # Lignes d'une même source triées par date de publication
+            if start is not None:
+                low = bisect_left(published, start, low, high)
+            if end is not None:
+                high = bisect_left(published, end, low, high)
+            if wanted is None:
+                yield from range(low, high)
+                continue
+            for index in range(low, high):
+                if not wanted.isdisjoint(keyword_ids[keyword_offsets[index]:keyword_offsets[index + 1]]):
+                    yield index
+
+    def _string(self, name, index):
+        offsets = self.column(f"{name}_offsets")
+        return str(self.column(f"{name}_data")[offsets[index]:offsets[index + 1]], 'utf-8')
+
+    def _keywords(self, index):
+        offsets = self.column('keyword_offsets')
+        return [self.keywords[keyword_id]
+                for keyword_id in self.column('keyword_ids')[offsets[index]:offsets[index + 1]]]
+
+    def value(self, name, index):
+        if name == 'published_at':
+            return _iso(self.column('published')[index])
+        if name == 'collected_at':
+            return _iso(self.column('collected')[index])
+        if name == 'author':
+            return self.sources[self.column('source')[index]]
+        if name in ('external_id', 'content'):
+            return self._string(name, index)
+        if name == 'relevance_score':
+            return self.column('relevance')[index]
+        if name == 'matched_keywords':
+            return self._keywords(index)
+        raise KeyError(name)
+
+    def row(self, index, columns=COLUMNS):
+        """Ligne décodée (dict), limitée aux colonnes demandées"""
+        return {name: self.value(name, index) for name in columns}
+
+    def record(self, index):
+        """Ligne brute (ArchiveRow), pour réécrire une partition"""
+        return ArchiveRow(
+            self.column('published')[index],
+            self.column('collected')[index],
+            self.sources[self.column('source')[index]],
+            self._string('external_id', index),
+            self._string('content', index),
+            self.column('relevance')[index],
+            tuple(self._keywords(index)),
+        )
+
+    def close(self):
+        for view in self._columns.values():
+            view.release()
+        self._columns = {}
+        self._view.release()
+        self._mmap.close()
+
+
+class Archive:
+    """Lecture de l'archive : jours, parcours filtré, comptage, compactage"""
+
+    def __init__(self, root=None):
+        self.root = root or archive_dir()
+
+    def days(self):
+        days = []
+        for name in os.listdir(self.root) if os.path.isdir(self.root) else []:
+            if name.startswith('day='):
+                try:
+                    days.append(date.fromisoformat(name[4:]))
+                except ValueError:
+                    continue
+        return sorted(days)
+
+    def part_paths(self, day):
+        directory = os.path.join(self.root, f"day={day.isoformat()}")
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                      if name.endswith(PART_SUFFIX))
+
+    def _parts(self, start, end):
+        """Fichiers des partitions qui recoupent [start, end[ (élagage par nom de répertoire)"""
+        first = _day(start) if start is not None else None
+        last = _day(end - 1) if end is not None else None
+        for day in self.days():
+            if (first is not None and day < first) or (last is not None and day > last):
+                continue
+            for path in self.part_paths(day):
+                with ArchivePart(path) as part:
+                    yield part
+
+    @staticmethod
+    def _filters(start, end, sources, keywords):
+        return (
+            to_timestamp(start),
+            to_timestamp(end),
+            set(sources) if sources is not None else None,
+            {keyword.casefold() for keyword in keywords} if keywords is not None else None,
+        )
+
+    def scan(self, start=None, end=None, sources=None, keywords=None, columns=COLUMNS, limit=None):
+        """
+        Items archivés publiés dans [start, end[ (dates, datetimes ou chaînes ISO),
+        éventuellement restreints à des sources et à des mots-clés (au moins un).
+        Génère des dicts limités à `columns` ; l'ordre suit les partitions, pas les dates.
+        """
+        start, end, sources, keywords = self._filters(start, end, sources, keywords)
+        remaining = limit
+        for part in self._parts(start, end):
+            for index in part.select(start, end, sources, keywords):
+                if remaining is not None:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                yield part.row(index, columns)
+
+    def count(self, start=None, end=None, sources=None, keywords=None):
+        """Nombre d'items correspondant aux filtres, sans décoder les lignes"""
+        start, end, sources, keywords = self._filters(start, end, sources, keywords)
+        return sum(sum(1 for _ in part.select(start, end, sources, keywords))
+                   for part in self._parts(start, end))
+
+    def compact(self, day):
+        """
+        Fusionne les fichiers d'un jour en un seul, dédupliqué par external_id (la collecte
+        la plus récente l'emporte) ; retourne le nombre de fichiers fusionnés.
+        À réserver aux jours révolus, un seul processus à la fois.
+        """
+        paths = self.part_paths(day)
+        if len(paths) < 2:
+            return 0
+        latest = {}
+        for path in paths:
+            with ArchivePart(path) as part:
+                for index in range(part.rows):
+                    row = part.record(index)
+                    key = row.external_id or f"{path}#{index}"
+                    if key not in latest or row.collected >= latest[key].collected:
+                        latest[key] = row
+        write_part(part_path(self.root, day), latest.values())
+        for path in paths:
+            os.remove(path)
+        return len(paths)
+
+    def compact_past(self):
+        """Compacte tous les jours révolus (UTC) ; retourne le nombre de fichiers fusionnés"""
+        today = datetime.now(timezone.utc).date()
+        return sum(self.compact(day) for day in self.days() if day < today)
+
+
+class ArchiveWriter:
+    """
+    Tampon des items sauvegardés (à brancher sur le on_saved du BatchWriter),
+    écrit par lots en fichiers de partition par jour de publication
+    """
+
+    def __init__(self, root=None, flush_rows=DEFAULT_FLUSH_ROWS, clock=time.time):
+        self.root = root or archive_dir()
+        self.flush_rows = flush_rows
+        self.written = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._size = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add_rows(self, rows):
+        collected = int(self._clock())
+        with self._lock:
+            for item in rows:
+                row = archive_row(item, collected)
+                # Une ligne par external_id et par lot (spool rejoué, item mis à jour)
+                bucket = self._pending.setdefault(_day(row.published), {})
+                bucket[row.external_id or ('#', self._size)] = row
+                self._size += 1
+            full = self._size >= self.flush_rows
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Écrit les lignes en attente (un fichier par jour) ; une erreur disque ne bloque pas la collecte"""
+        with self._lock:
+            pending, self._pending, self._size = self._pending, {}, 0
+            for day, rows in pending.items():
+                try:
+                    self.written += write_part(part_path(self.root, day), rows.values())
+                except OSError as e:
+                    print(f"  ⚠️  Archive locale non écrite ({day.isoformat()}, {len(rows)} items): {e}")
+                    metrics.current().error('archive', day.isoformat())
+
+    def close(self):
+        self.flush()
+
+
+def main(argv=None):
+    # Import différé : inutile aux scrapers qui importent ce module
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Requêtes sur l'archive locale des items collectés")
+    parser.add_argument('--from', dest='start', type=date.fromisoformat, help="premier jour (AAAA-MM-JJ)")
+    parser.add_argument('--to', dest='end', type=date.fromisoformat, help="dernier jour inclus")
+    parser.add_argument('--source', action='append', help="source exacte (répétable)")
+    parser.add_argument('--keyword', action='append', help="mot-clé (répétable, au moins un présent)")
+    parser.add_argument('--count', action='store_true', help="affiche seulement le nombre d'items")
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--compact', action='store_true', help="fusionne les fichiers des jours passés")
+    args = parser.parse_args(argv)
+
+    archive = Archive()
+    if args.compact:
+        print(f"🗜️  {archive.compact_past()} fichiers fusionnés")
+        return
+    end = args.end + timedelta(days=1) if args.end else None
+    if args.count:
+        print(archive.count(args.start, end, args.source, args.keyword))
+        return
+    for row in archive.scan(args.start, end, args.source, args.keyword, limit=args.limit):
+        print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
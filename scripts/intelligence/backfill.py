@@ -0,0 +1,151 @@
+"""
+Lynx Eye Keyword Backfill
+Rattrapage des items déjà vus après un ajout de mots-clés dans keywords.py :
+- diff entre la taxonomie courante et celle enregistrée dans l'index des termes
+  (ou mots-clés choisis avec --add)
+- candidats lus dans l'index inversé (term_index.py), confirmés par l'automate,
+  sans relire ni re-scraper les autres items
+- items rescorés sur toute la taxonomie et envoyés au writer (spool + upserts groupés) :
+  les entrées écartées à la collecte apparaissent, les items déjà sauvegardés
+  reçoivent leurs nouveaux mots-clés
+
+Usage :
+    python backfill.py                          # mots-clés ajoutés depuis la dernière fois
+    python backfill.py --add "vie chère" --add seeg
+    python backfill.py --dry-run                # liste sans écrire
+"""
+
+import sys
+import time
+from collections import namedtuple
+
+from archive import ArchiveWriter
+from clients import supabase_client
+from keywords import get_keyword_terms
+from matcher import KeywordMatcher, normalize
+from relevance import RelevanceScorer
+from seen_index import SeenIndex
+from settings import ConfigError
+from spool import WriteSpool
+from supabase_writer import BatchWriter, configured_chunk_size
+from term_index import TermIndex
+
+KeywordDiff = namedtuple('KeywordDiff', ['added', 'removed'])
+
+
+def _form(keyword):
+    return normalize(keyword).strip()
+
+
+def keyword_diff(previous, current):
+    """Mots-clés ajoutés et retirés (comparés sous forme normalisée)"""
+    previous_forms = {_form(keyword) for keyword in previous}
+    current_forms = {_form(keyword) for keyword in current}
+    return KeywordDiff(
+        [keyword for keyword in current if _form(keyword) not in previous_forms],
+        [keyword for keyword in previous if _form(keyword) not in current_forms],
+    )
+
+
+def find_matches(term_index, keywords, scorer):
+    """
+    Items de l'index contenant au moins un des `keywords`, rescorés sur toute la taxonomie ;
+    génère (IndexedItem, ligne intelligence_items)
+    """
+    matcher = KeywordMatcher(keywords)
+    for item in term_index.candidates(keywords):
+        # L'index garantit la présence des mots, l'automate leur ordre et leurs frontières
+        if not matcher.search(item.content):
+            continue
+        yield item, scorer.annotate({
+            'content': item.content,
+            'author': item.author,
+            'external_id': item.external_id,
+            'published_at': item.published_at,
+        }, scorer.score(item.content))
+
+
+def main(argv=None):
+    # Import différé, comme dans archive.py
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rattrapage des items après un ajout de mots-clés")
+    parser.add_argument('--add', action='append', metavar='MOT_CLÉ',
+                        help="mot-clé de keywords.py à rattraper (répétable) ; par défaut les ajouts détectés")
+    parser.add_argument('--dry-run', action='store_true', help="affiche les items trouvés sans les envoyer")
+    parser.add_argument('--limit', type=int, default=20, help="items affichés avec --dry-run")
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print("🦅 LYNX EYE - BACKFILL DES MOTS-CLÉS")
+    print("=" * 70)
+
+    scorer = RelevanceScorer(get_keyword_terms())
+    taxonomy = scorer.matcher.keywords
+
+    with TermIndex() as term_index:
+        previous = term_index.applied_keywords()
+        if args.add:
+            known = {_form(keyword): keyword for keyword in taxonomy}
+            unknown = [keyword for keyword in args.add if _form(keyword) not in known]
+            if unknown:
+                print(f"⚠️  Absents de keywords.py (ajoutez-les d'abord) : {', '.join(unknown)}")
+            keywords = [known[_form(keyword)] for keyword in args.add if _form(keyword) in known]
+        elif previous is None:
+            print("ℹ️  Aucune taxonomie enregistrée : l'index n'a encore rien collecté, rien à rattraper")
+            term_index.record_keywords(taxonomy)
+            return
+        else:
+            diff = keyword_diff(previous, taxonomy)
+            keywords = diff.added
+            if diff.removed:
+                print(f"ℹ️  {len(diff.removed)} mots-clés retirés (les items déjà envoyés restent en base)")
+
+        if not keywords:
+            print("✅ Aucun mot-clé ajouté depuis le dernier backfill")
+            if not args.add or previous is None:
+                term_index.record_keywords(taxonomy)
+            return
+
+        print(f"🔤 Mots-clés à rattraper ({len(keywords)}) : {', '.join(keywords[:10])}"
+              f"{'...' if len(keywords) > 10 else ''}")
+        started = time.perf_counter()
+        matches = list(find_matches(term_index, keywords, scorer))
+        elapsed = time.perf_counter() - started
+        rejected = sum(1 for item, _ in matches if not item.kept)
+        print(f"🔎 {len(matches)} items trouvés parmi {len(term_index)} indexés en {elapsed * 1000:.0f} ms "
+              f"({rejected} écartés à la collecte, {len(matches) - rejected} déjà sauvegardés)")
+
+        if args.dry_run:
+            for _, row in matches[:args.limit]:
+                print(f"   • [{row['relevance_score']}] {row['content'][:90]} ({', '.join(row['matched_keywords'])})")
+            return
+
+        if matches:
+            try:
+                supabase = supabase_client()
+            except ConfigError as e:
+                print(f"❌ Erreur: {e}")
+                sys.exit(1)
+            with SeenIndex() as seen_index, WriteSpool() as spool, ArchiveWriter() as archive:
+
+                def on_saved(rows):
+                    seen_index.mark_items(rows)
+                    archive.add_rows(rows)
+                    term_index.add_saved(rows)
+
+                writer = BatchWriter(supabase, chunk_size=configured_chunk_size(), on_saved=on_saved, spool=spool)
+                writer.extend(row for _, row in matches)
+                result = writer.close()
+            print(f"💾 {result.saved} items envoyés, {result.failed} échecs, {result.pending} en attente dans le spool")
+
+        # Les mots-clés traités servent de référence au prochain diff ; sans taxonomie
+        # enregistrée, c'est la taxonomie complète (comme sans --add)
+        if args.add and previous is not None:
+            term_index.record_keywords(sorted(previous | set(keywords)))
+        else:
+            term_index.record_keywords(taxonomy)
+
+
+if __name__ == '__main__':
+    main()
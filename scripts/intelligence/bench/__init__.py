@@ -0,0 +1,7 @@
+"""
+Lynx Eye Benchmarks
+Banc d'essai hors ligne des scrapers (flux enregistrés, moteurs de recherche
+simulés, faux Supabase). Lancement depuis scripts/intelligence :
+
+    python -m bench.run_bench
+"""
@@ -0,0 +1,136 @@
+"""
+Benchmark hors ligne de l'archive en colonnes (archive.py).
+
+Écrit N items synthétiques (ordre chronologique, comme en production) répartis sur
+plusieurs jours et sources, puis mesure dans un sous-processus neuf :
+- le comptage complet, par semaine, par source et par mot-clé
+- le décodage des lignes d'une source sur une semaine
+- la mémoire résidente maximale du processus de lecture
+
+Usage (depuis scripts/intelligence) :
+    python -m bench.archive_bench --items 1000000
+    python -m bench.archive_bench --items 2000000 --compact
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+START_DAY = date(2026, 1, 1)
+KEYWORDS = ['oligui nguema', 'ctri', 'libreville', 'seeg', 'port-gentil', 'vie chère', 'transition',
+            'délestage', 'grève', 'assemblée nationale', 'budget', 'manganèse', 'pétrole', 'franceville']
+
+
+def synthetic_items(count, days, sources, seed=7):
+    rng = random.Random(seed)
+    start = datetime(START_DAY.year, START_DAY.month, START_DAY.day, tzinfo=timezone.utc).timestamp()
+    step = days * 86400 / count
+    for index in range(count):
+        published = datetime.fromtimestamp(start + index * step, timezone.utc)
+        matched = rng.sample(KEYWORDS, rng.randint(1, 3))
+        yield {
+            'content': f"Article {index} - {' '.join(matched)} : " + 'x' * rng.randint(60, 240),
+            'author': f"Source {rng.randrange(sources):02d}",
+            'external_id': f"https://media.example/{index}",
+            'published_at': published.isoformat(),
+            'relevance_score': round(rng.uniform(0.5, 8.0), 2),
+            'matched_keywords': matched,
+        }
+
+
+def write(root, count, days, sources, batch):
+    from archive import ArchiveWriter
+
+    started = time.perf_counter()
+    with ArchiveWriter(root) as writer:
+        chunk = []
+        for item in synthetic_items(count, days, sources):
+            chunk.append(item)
+            if len(chunk) >= batch:
+                writer.add_rows(chunk)
+                chunk = []
+        writer.add_rows(chunk)
+    return time.perf_counter() - started
+
+
+def _timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def query(root):
+    """Requêtes mesurées (exécuté dans un sous-processus pour isoler la mémoire)"""
+    from archive import Archive
+
+    archive = Archive(root)
+    week = (START_DAY + timedelta(days=7), START_DAY + timedelta(days=14))
+    results = {}
+    results['count_all'] = _timed(archive.count)
+    results['count_week'] = _timed(lambda: archive.count(*week))
+    results['count_source'] = _timed(lambda: archive.count(sources=['Source 03']))
+    results['count_keyword'] = _timed(lambda: archive.count(keywords=['seeg']))
+    results['rows_source_week'] = _timed(
+        lambda: sum(1 for _ in archive.scan(*week, sources=['Source 03'], columns=('published_at', 'content'))))
+    results['rows_keyword_week'] = _timed(
+        lambda: sum(1 for _ in archive.scan(*week, keywords=['grève'])))
+    return {
+        name: {'items': items, 'seconds': seconds} for name, (items, seconds) in results.items()
+    } | {'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+def _disk_usage(root):
+    files = [os.path.join(directory, name) for directory, _, names in os.walk(root) for name in names]
+    return len(files), sum(os.path.getsize(path) for path in files)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de l'archive locale en colonnes")
+    parser.add_argument('--items', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--sources', type=int, default=40)
+    parser.add_argument('--batch', type=int, default=200, help="lignes par appel on_saved (taille de chunk)")
+    parser.add_argument('--compact', action='store_true', help="compacte les jours avant les requêtes")
+    parser.add_argument('--query', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.query:
+        print(json.dumps(query(args.query)))
+        return
+
+    with tempfile.TemporaryDirectory(prefix='lynx-archive-') as root:
+        elapsed = write(root, args.items, args.days, args.sources, args.batch)
+        files, size = _disk_usage(root)
+        print(f"✍️  {args.items} items écrits en {elapsed:.1f}s ({args.items / elapsed:,.0f} items/s), "
+              f"{files} fichiers, {size / 1e6:.0f} Mo")
+        if args.compact:
+            from archive import Archive
+            started = time.perf_counter()
+            merged = Archive(root).compact_past()
+            files, size = _disk_usage(root)
+            print(f"🗜️  {merged} fichiers fusionnés en {time.perf_counter() - started:.1f}s -> {files} fichiers")
+
+        completed = subprocess.run([sys.executable, '-m', 'bench.archive_bench', '--query', root],
+                                   cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+        results = json.loads(completed.stdout.strip().splitlines()[-1])
+    max_rss = results.pop('max_rss_mb')
+    print(f"{'requête':<20} {'items':>10} {'temps':>9}")
+    for name, result in results.items():
+        print(f"{name:<20} {result['items']:>10} {result['seconds']:>8.3f}s")
+    print(f"🧠 Mémoire résidente maximale (lecture): {max_rss:.0f} Mo")
+
+
+if __name__ == '__main__':
+    main()
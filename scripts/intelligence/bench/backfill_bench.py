@@ -0,0 +1,85 @@
+"""
+Benchmark hors ligne de l'index inversé et du backfill (term_index.py, backfill.py).
+
+Indexe N items synthétiques (vocabulaire de presse + termes rares), puis mesure le temps
+de recherche des items correspondant à des mots-clés « ajoutés » : mot courant, mot rare,
+expression de plusieurs mots.
+
+Usage (depuis scripts/intelligence) :
+    python -m bench.backfill_bench --items 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+VOCABULARY = ("gouvernement ministre conseil réunion projet route école hôpital santé budget élection "
+              "président assemblée sénat député préfet maire quartier marché prix carburant électricité "
+              "eau coupure grève syndicat enseignants étudiants université football match équipe "
+              "économie pétrole manganèse bois forêt port aéroport transport justice tribunal procès "
+              "police gendarmerie sécurité frontière douane impôt taxe banque emploi jeunesse culture").split()
+RARE = ['orpaillage', 'cybercriminalité', 'mpox', 'bauxite']
+
+
+def synthetic_items(count, seed=11):
+    rng = random.Random(seed)
+    for index in range(count):
+        words = rng.choices(VOCABULARY, k=rng.randint(25, 45))
+        if rng.random() < 0.002:
+            words.insert(rng.randrange(len(words)), rng.choice(RARE))
+        if rng.random() < 0.01:
+            words[rng.randrange(len(words)):0] = ['vie', 'chère']
+        yield {
+            'content': ' '.join(words).capitalize(),
+            'author': f"Source {index % 40}",
+            'external_id': f"https://media.example/{index}",
+            'published_at': '2026-02-03T10:00:00',
+        }
+
+
+def main(argv=None):
+    from backfill import find_matches
+    from keywords import get_keyword_terms
+    from relevance import RelevanceScorer
+    from term_index import TermIndex
+
+    parser = argparse.ArgumentParser(description="Benchmark de l'index inversé et du backfill")
+    parser.add_argument('--items', type=int, default=200000)
+    parser.add_argument('--batch', type=int, default=50, help="lignes par appel (taille d'un flux)")
+    args = parser.parse_args(argv)
+
+    scorer = RelevanceScorer(get_keyword_terms())
+    with tempfile.TemporaryDirectory(prefix='lynx-terms-') as state_dir:
+        with TermIndex(path=os.path.join(state_dir, 'term_index.sqlite3')) as index:
+            started = time.perf_counter()
+            batch = []
+            for item in synthetic_items(args.items):
+                batch.append(item)
+                if len(batch) >= args.batch:
+                    index.add_rejected(batch)
+                    batch = []
+            index.add_rejected(batch)
+            elapsed = time.perf_counter() - started
+            size = sum(os.path.getsize(os.path.join(state_dir, name)) for name in os.listdir(state_dir))
+            print(f"🗂️  {args.items} items indexés en {elapsed:.1f}s ({args.items / elapsed:,.0f} items/s), "
+                  f"{size / 1e6:.0f} Mo")
+
+            print(f"{'mots-clés ajoutés':<32} {'candidats':>10} {'trouvés':>8} {'temps':>9}")
+            for keywords in (['orpaillage'], ['vie chère'], ['orpaillage', 'mpox', 'bauxite'], ['grève']):
+                started = time.perf_counter()
+                candidates = sum(1 for _ in index.candidates(keywords))
+                matches = sum(1 for _ in find_matches(index, keywords, scorer))
+                elapsed = time.perf_counter() - started
+                print(f"{', '.join(keywords):<32} {candidates:>10} {matches:>8} {elapsed * 1000:>7.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
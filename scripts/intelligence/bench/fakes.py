@@ -0,0 +1,190 @@
+"""
+Doublures locales des services externes pour les benchmarks :
+serveur HTTP de flux, moteurs DuckDuckGo / YouTube simulés, faux Supabase
+"""
+
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench.fixtures import filler_sentence, load_search_results
+
+
+class LocalFeedServer:
+    """Serveur HTTP local servant des documents fixes (ETag + 304 supportés)"""
+
+    def __init__(self, routes, latency=0.0, content_types=None):
+        self.routes = routes
+        self.latency = latency
+        # Chemin -> en-tête Content-Type (par défaut flux RSS en UTF-8)
+        self.content_types = content_types or {}
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                body = server.routes.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', server.content_types.get(self.path,
+                                                                          'application/rss+xml; charset=utf-8'))
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self._httpd.server_port}{path}"
+
+
+class _FakeQuery:
+    def __init__(self, table, rows, on_conflict):
+        self._table = table
+        self._rows = rows if isinstance(rows, list) else [rows]
+        self._on_conflict = on_conflict
+
+    def execute(self):
+        return self._table._execute(self._rows, self._on_conflict)
+
+
+class _FakeTable:
+    def __init__(self, database, name):
+        self._database = database
+        self.name = name
+
+    def upsert(self, rows, on_conflict=None):
+        return _FakeQuery(self, rows, on_conflict)
+
+    def _execute(self, rows, on_conflict):
+        database = self._database
+        started = time.perf_counter()
+        if database.latency:
+            time.sleep(database.latency)
+        with database.lock:
+            database.requests += 1
+            if database.fail_when and any(database.fail_when(row) for row in rows):
+                raise RuntimeError('fake supabase: ligne rejetée')
+            keys = [row.get(on_conflict) for row in rows]
+            if len(set(keys)) != len(keys):
+                raise RuntimeError('ON CONFLICT DO UPDATE command cannot affect row a second time')
+            store = database.tables.setdefault(self.name, {})
+            for key, row in zip(keys, rows):
+                store[key or f"anon:{len(store)}"] = row
+            database.request_latencies.append(time.perf_counter() - started)
+
+
+class FakeSupabase:
+    """Faux client Supabase : upsert en mémoire avec latence configurable"""
+
+    def __init__(self, latency=0.02, fail_when=None):
+        self.latency = latency
+        self.fail_when = fail_when
+        self.tables = {}
+        self.requests = 0
+        self.request_latencies = []
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        return _FakeTable(self, name)
+
+    def rows(self, name='intelligence_items'):
+        return self.tables.get(name, {})
+
+
+class StubSearchBackend:
+    """Moteur DuckDuckGo simulé : résultats déterministes et uniques par requête"""
+
+    name = 'ddg'
+
+    def __init__(self, latency=0.01, throttle_every=0):
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.calls = 0
+        self._templates = load_search_results()['ddg']
+        self._lock = threading.Lock()
+
+    def search(self, query, max_results):
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+        if self.latency:
+            time.sleep(self.latency)
+        if self.throttle_every and calls % self.throttle_every == 0:
+            raise RuntimeError('https://html.duckduckgo.com/html 202 Ratelimit')
+
+        slug = hashlib.sha1(query.encode('utf-8')).hexdigest()[:10]
+        results = []
+        for index in range(max_results):
+            template = self._templates[index % len(self._templates)]
+            rng = random.Random(f"{query}-{index}")
+            results.append({
+                'title': f"{template['title']} - {filler_sentence(rng, 6)}",
+                'href': f"{template['href']}-{slug}-{index}",
+                'body': f"{filler_sentence(rng, 25)} {template['body']}",
+            })
+        return results
+
+    def close(self):
+        pass
+
+
+class StubVideoBackend:
+    """Moteur YouTube simulé : vidéos déterministes par requête (mêmes ids d'une exécution à l'autre)"""
+
+    name = 'youtube'
+
+    def __init__(self, latency=0.01):
+        self.latency = latency
+        self.calls = 0
+        self._templates = load_search_results()['youtube']
+        self._lock = threading.Lock()
+
+    def search(self, query, max_results):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        slug = hashlib.sha1(query.encode('utf-8')).hexdigest()[:8]
+        videos = []
+        for index in range(max_results):
+            template = self._templates[index % len(self._templates)]
+            rng = random.Random(f"{query}-{index}")
+            videos.append(dict(
+                template,
+                id=f"{template['id']}-{slug}-{index}",
+                title=f"{template['title']} - {filler_sentence(rng, 6)}",
+                descriptionSnippet=[{'text': filler_sentence(rng, 20)}],
+                publishedTime=f"{index + 1} days ago"
+            ))
+        return videos
+
+    def close(self):
+        pass
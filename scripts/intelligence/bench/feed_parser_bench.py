@@ -0,0 +1,112 @@
+"""
+Benchmark hors ligne du parseur de flux en continu (feed_parser.py) contre feedparser.
+
+Flux RSS synthétiques volumineux (contenu complet, comme les /feed/ WordPress), mesurés
+chacun dans un sous-processus neuf qui ne fait que lire le fichier et le parser :
+- temps de parsing
+- mémoire résidente maximale ajoutée par le parsing (document déjà chargé)
+- pic des allocations Python pendant le parsing (tracemalloc, passe séparée)
+Deux modes : toutes les entrées lues, ou lecture arrêtée par le curseur après
+10 entrées nouvelles (cas courant d'une collecte incrémentale).
+
+Usage (depuis scripts/intelligence) :
+    python -m bench.feed_parser_bench
+    python -m bench.feed_parser_bench --entries 500 5000 --paragraphs 20
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+NEW_ENTRIES = 10
+
+
+def build_feed(entries, paragraphs):
+    from bench.fixtures import build_rss, synthetic_articles
+
+    articles = synthetic_articles(entries)
+    for article in articles:
+        # Contenu complet : plusieurs paragraphes par article
+        article['summary'] = ' '.join([article['summary']] * paragraphs)
+    return build_rss(articles)
+
+
+def measure(parser, mode, path):
+    """Exécuté dans le sous-processus : parse le flux et retourne temps et mémoire"""
+    from feed_cursors import CursorScan
+    import feed_parser
+
+    with open(path, 'rb') as f:
+        document = f.read()
+    if parser == 'feedparser':
+        import feedparser
+    # Curseur : la 11e entrée est déjà connue, seules les 10 premières sont nouvelles
+    cursor = {'guids': [f"bench-{NEW_ENTRIES}"]} if mode == 'cursor' else None
+
+    def parse():
+        if parser == 'feedparser':
+            feed_entries = feedparser.parse(document).entries
+        else:
+            feed_entries = feed_parser.iter_entries(document)
+        return sum(1 for _ in CursorScan(cursor).new_entries(feed_entries))
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    read = parse()
+    elapsed = time.perf_counter() - started
+    rss = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024
+
+    tracemalloc.start()
+    parse()
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'size': len(document), 'read': read, 'seconds': elapsed, 'rss_mb': rss,
+            'traced_mb': traced_peak / 1e6}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parseur de flux en continu contre feedparser")
+    parser.add_argument('--entries', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--paragraphs', type=int, default=10, help="taille du contenu de chaque article")
+    parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(*args.child)))
+        return
+
+    print(f"{'entrées':>8} {'taille':>9} {'mode':>7} {'parseur':>11} {'lues':>6} {'temps':>9} "
+          f"{'RSS max':>9} {'alloc. max':>11}")
+    with tempfile.TemporaryDirectory(prefix='lynx-feeds-') as directory:
+        for entries in args.entries:
+            path = os.path.join(directory, f"feed-{entries}.xml")
+            with open(path, 'wb') as f:
+                f.write(build_feed(entries, args.paragraphs))
+            for mode in ('full', 'cursor'):
+                results = {}
+                for name in ('feedparser', 'stream'):
+                    completed = subprocess.run(
+                        [sys.executable, '-m', 'bench.feed_parser_bench', '--child', name, mode, path],
+                        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+                    )
+                    result = results[name] = json.loads(completed.stdout.strip().splitlines()[-1])
+                    print(f"{entries:>8} {result['size'] / 1e6:>7.1f}Mo {mode:>7} {name:>11} {result['read']:>6} "
+                          f"{result['seconds'] * 1000:>7.0f}ms {result['rss_mb']:>7.1f}Mo "
+                          f"{result['traced_mb']:>9.1f}Mo")
+                speedup = results['feedparser']['seconds'] / max(results['stream']['seconds'], 1e-9)
+                print(f"{'':>36} → {speedup:.1f}x plus rapide")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Jeux de données des benchmarks : fixtures enregistrées (bench/data/)
+et générateur d'articles synthétiques au format RSS 2.0
+"""
+
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Vocabulaire neutre (aucun mot-clé de veille) pour le corps des articles
+_FILLER = [
+    "annonce", "rencontre", "semaine", "nouvelle", "projet", "quartier", "habitants",
+    "responsable", "direction", "programme", "équipe", "réunion", "rapport", "service",
+    "public", "travaux", "secteur", "village", "marché", "saison", "festival", "école",
+    "lycée", "concours", "jeunes", "famille", "artistes", "musique", "sport", "match",
+    "stade", "cérémonie", "visite", "délégation", "partenaires", "accord", "signature",
+    "formation", "atelier", "bilan", "résultats", "calendrier", "prochaine", "étape",
+    "mardi", "jeudi", "samedi", "matin", "soir", "centre", "région", "province",
+    "association", "initiative", "soutien", "campagne", "sensibilisation", "santé",
+]
+
+_RSS_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/" '
+    'xmlns:dc="http://purl.org/dc/elements/1.1/">\n<channel>\n'
+    '<title>{title}</title>\n<link>{link}</link>\n<description>Flux de benchmark</description>\n'
+)
+
+
+def load_recorded_feed(name='gabonreview_feed.xml'):
+    with open(os.path.join(DATA_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def load_search_results():
+    with open(os.path.join(DATA_DIR, 'search_results.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def filler_sentence(rng, count):
+    """Suite de mots neutres tirés au hasard"""
+    return ' '.join(rng.choice(_FILLER) for _ in range(count))
+
+
+def synthetic_articles(count, relevant_ratio=0.7, duplicate_ratio=0.1, seed=241):
+    """
+    Articles synthétiques distincts, du plus récent au plus ancien :
+    - `relevant_ratio` contiennent au moins un mot-clé de veille
+    - `duplicate_ratio` sont des reprises quasi identiques d'un article précédent
+    """
+    from keywords import INTELLIGENCE_KEYWORDS
+
+    rng = random.Random(seed)
+    now = datetime(2024, 11, 26, 12, 0, tzinfo=timezone.utc)
+    articles = []
+
+    for index in range(count):
+        if articles and rng.random() < duplicate_ratio:
+            original = rng.choice(articles)
+            title = f"{original['title']} (reprise)"
+            summary = original['summary']
+        else:
+            words = rng.sample(_FILLER, 10)
+            if rng.random() < relevant_ratio:
+                words.insert(rng.randrange(len(words)), rng.choice(INTELLIGENCE_KEYWORDS))
+            title = ' '.join(words[:7]).capitalize()
+            body = rng.sample(_FILLER, 25) + [str(index)]
+            summary = f"{' '.join(words[7:])} {' '.join(body)}."
+
+        articles.append({
+            'title': title,
+            'summary': summary,
+            'link': f"https://bench.lynx-eye.local/articles/{index}",
+            'guid': f"bench-{index}",
+            'published': now - timedelta(minutes=index),
+        })
+
+    return articles
+
+
+def build_rss(articles, title='Flux benchmark', link='https://bench.lynx-eye.local/'):
+    """Document RSS 2.0 (description + content:encoded) pour une liste d'articles"""
+    parts = [_RSS_HEADER.format(title=escape(title), link=escape(link))]
+    for article in articles:
+        summary = escape(article['summary'])
+        parts.append(
+            '<item>\n'
+            f"<title>{escape(article['title'])}</title>\n"
+            f"<link>{escape(article['link'])}</link>\n"
+            f"<guid isPermaLink=\"false\">{escape(article['guid'])}</guid>\n"
+            f"<pubDate>{format_datetime(article['published'])}</pubDate>\n"
+            f"<description>&lt;p&gt;{summary}&lt;/p&gt;</description>\n"
+            f"<content:encoded>&lt;p&gt;{summary}&lt;/p&gt;&lt;p&gt;{summary}&lt;/p&gt;</content:encoded>\n"
+            '</item>\n'
+        )
+    parts.append('</channel>\n</rss>\n')
+    return ''.join(parts).encode('utf-8')
@@ -0,0 +1,93 @@
+"""
+Simulation hors ligne du planificateur de requêtes.
+
+Chaque combinaison de requête reçoit un rendement caché (items nouveaux par requête,
+loi de Poisson, la plupart des combinaisons ne rapportant presque rien). On compare
+sur plusieurs exécutions successives :
+- l'ancien tirage aléatoire (get_daily_keywords + generate_search_queries)
+- le QueryPlanner (Thompson sampling, état persistant)
+
+Usage (depuis scripts/intelligence) :
+    python -m bench.planner_sim --runs 40 --budget 15
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+
+def poisson(rng, lam):
+    """Tirage de Poisson (algorithme de Knuth, suffisant pour de petits lambda)"""
+    threshold = math.exp(-lam)
+    count, product = 0, rng.random()
+    while product > threshold:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def hidden_yields(arms, seed):
+    """Rendement caché par requête : mot-clé porteur x combinaison, distribution très asymétrique"""
+    rng = random.Random(seed)
+    keyword_factor = {}
+    yields = {}
+    for arm in arms:
+        if arm.keyword not in keyword_factor:
+            keyword_factor[arm.keyword] = rng.random() ** 4 * 3
+        yields[arm.query] = keyword_factor[arm.keyword] * rng.random() ** 2
+    return yields
+
+
+def simulate(runs, budget, seed):
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    import keywords
+    from query_planner import QueryPlanner, build_arms
+
+    arms = build_arms(keywords.PRIORITY_KEYWORDS + keywords.INTELLIGENCE_KEYWORDS,
+                      keywords.MODIFIERS, keywords.CITIES)
+    yields = hidden_yields(arms, seed)
+    rng = random.Random(seed + 1)
+    random.seed(seed + 2)
+
+    baseline, planned = [], []
+    with tempfile.TemporaryDirectory(prefix='lynx-planner-') as state_dir:
+        with QueryPlanner(arms, keywords.PRIORITY_KEYWORDS,
+                          path=os.path.join(state_dir, 'planner.sqlite3'),
+                          rng=random.Random(seed + 3)) as planner:
+            for _ in range(runs):
+                daily = keywords.get_daily_keywords(count=max(20, budget // 3))
+                queries = keywords.generate_search_queries(daily, max_queries=budget)
+                baseline.append(sum(poisson(rng, yields.get(q, 0.0)) for q in queries) / len(queries))
+
+                queries = planner.plan(budget)
+                for query in queries:
+                    planner.record(query, poisson(rng, yields[query]))
+                planned.append(planner.finish_run())
+    return baseline, planned
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulation du planificateur de requêtes")
+    parser.add_argument('--runs', type=int, default=40)
+    parser.add_argument('--budget', type=int, default=15)
+    parser.add_argument('--seed', type=int, default=241)
+    args = parser.parse_args(argv)
+
+    baseline, planned = simulate(args.runs, args.budget, args.seed)
+    window = max(1, args.runs // 4)
+    print(f"{'exécutions':<14} {'aléatoire':>10} {'planifié':>10}   (items nouveaux / requête)")
+    for start in range(0, args.runs, window):
+        chunk = slice(start, start + window)
+        print(f"{start + 1:>4} → {min(args.runs, start + window):<7} "
+              f"{sum(baseline[chunk]) / len(baseline[chunk]):>10.2f} {sum(planned[chunk]) / len(planned[chunk]):>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""
+Benchmark hors ligne des scrapers RSS et Web/YouTube.
+
+Chaque scénario (rss, web) est exécuté pour plusieurs tailles de charge dans un
+sous-processus isolé (état local temporaire, mémoire de pointe mesurée proprement).
+Le main() réel des scrapers est utilisé, avec :
+- des flux RSS servis par un serveur HTTP local
+- des moteurs DuckDuckGo / YouTube simulés
+- un faux Supabase (upsert en mémoire, latence configurable)
+
+Usage (depuis scripts/intelligence) :
+    python -m bench.run_bench
+    python -m bench.run_bench --sizes 10 100 --scenarios rss
+    python -m bench.run_bench --save-baseline            # écrit bench/baseline.json
+    python -m bench.run_bench --baseline bench/baseline.json   # compare à la référence
+"""
+
+import argparse
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+SCENARIOS = ['rss', 'web']
+ARTICLES_PER_FEED = 100
+
+
+def percentile(values, pct):
+    """Percentile par rang le plus proche"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(durations):
+    return {
+        'count': len(durations),
+        'p50_ms': round(percentile(durations, 50) * 1000, 2),
+        'p99_ms': round(percentile(durations, 99) * 1000, 2),
+    }
+
+
+def _prepare_environment(state_dir):
+    """Isole l'exécution : état local temporaire et identifiants Supabase factices"""
+    os.environ['LYNX_STATE_DIR'] = state_dir
+    os.environ['SUPABASE_URL'] = 'http://127.0.0.1:9'
+    os.environ['SUPABASE_SERVICE_ROLE_KEY'] = 'bench.bench.bench'
+    # Le débit DuckDuckGo / YouTube simulé n'est pas limité
+    os.environ['LYNX_SEARCH_RATE'] = '10000'
+    os.environ['LYNX_YOUTUBE_RATE'] = '10000'
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+
+
+def _bench_rss(size, args):
+    from bench.fakes import FakeSupabase, LocalFeedServer
+    from bench.fixtures import build_rss, synthetic_articles
+    import clients
+    import feed_fetcher
+    import rss_scraper
+
+    articles = synthetic_articles(size)
+    routes = {}
+    for index in range(0, len(articles), ARTICLES_PER_FEED):
+        routes[f"/feed/{index // ARTICLES_PER_FEED}/"] = build_rss(articles[index:index + ARTICLES_PER_FEED])
+
+    durations = []
+    original_fetch = feed_fetcher.FeedFetcher.fetch
+
+    def timed_fetch(self, url, sink=None):
+        response = original_fetch(self, url, sink)
+        durations.append(response.elapsed)
+        return response
+
+    database = FakeSupabase(latency=args.supabase_latency)
+    with LocalFeedServer(routes, latency=args.source_latency) as server:
+        clients.set_client('supabase', database)
+        rss_scraper.PRESS_URLS = {'bench': {f"Feed {path}": server.url(path) for path in routes}}
+        feed_fetcher.FeedFetcher.fetch = timed_fetch
+        try:
+            started = time.perf_counter()
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                rss_scraper.main()
+            elapsed = time.perf_counter() - started
+        finally:
+            feed_fetcher.FeedFetcher.fetch = original_fetch
+
+    return elapsed, {'feeds': latency_summary(durations)}, database
+
+
+def _bench_web(size, args):
+    from bench.fakes import FakeSupabase, StubSearchBackend, StubVideoBackend
+    import clients
+    import query_planner
+    import search_executor
+    import web_scraper
+
+    query_count = max(1, math.ceil(size / 3))
+    queries = [f"requete benchmark {index}" for index in range(query_count)]
+
+    durations = []
+    original_search = search_executor.SearchExecutor.search
+
+    def timed_search(self, query, max_results):
+        result = original_search(self, query, max_results)
+        durations.append(result.elapsed)
+        return result
+
+    backend = StubSearchBackend(latency=args.source_latency)
+    database = FakeSupabase(latency=args.supabase_latency)
+    clients.set_client('supabase', database)
+    web_scraper.DDGSBackend = lambda: backend
+    video_backend = StubVideoBackend(latency=args.source_latency)
+    web_scraper.YouTubeBackend = lambda: video_backend
+    query_planner.QueryPlanner.plan = lambda self, budget, engine='ddg': queries if engine == 'ddg' else queries[:5]
+    search_executor.SearchExecutor.search = timed_search
+    try:
+        started = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            web_scraper.main()
+        elapsed = time.perf_counter() - started
+    finally:
+        search_executor.SearchExecutor.search = original_search
+
+    return elapsed, {'queries': latency_summary(durations)}, database
+
+
+def run_worker(scenario, size, args):
+    """Exécute un scénario dans le processus courant et retourne ses mesures"""
+    with tempfile.TemporaryDirectory(prefix='lynx-bench-') as state_dir:
+        _prepare_environment(state_dir)
+        runner = _bench_rss if scenario == 'rss' else _bench_web
+        elapsed, sources, database = runner(size, args)
+
+        import metrics
+        stages = metrics.current().report()['stages']
+
+    return {
+        'scenario': scenario,
+        'size': size,
+        'elapsed_s': round(elapsed, 3),
+        'items_per_s': round(size / elapsed, 1) if elapsed else 0.0,
+        'saved_rows': len(database.rows()),
+        'upsert_requests': database.requests,
+        'sources': sources,
+        'upserts': latency_summary(database.request_latencies),
+        'stages': stages,
+        # ru_maxrss est exprimé en Ko sous Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def run_in_subprocess(scenario, size, args):
+    command = [
+        sys.executable, '-m', 'bench.run_bench',
+        '--worker', scenario, '--size', str(size),
+        '--supabase-latency', str(args.supabase_latency),
+        '--source-latency', str(args.source_latency),
+    ]
+    completed = subprocess.run(command, cwd=ROOT_DIR, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{scenario}/{size} a échoué:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline):
+    """Affiche l'écart par rapport à une exécution de référence"""
+    reference = {(r['scenario'], r['size']): r for r in baseline.get('results', [])}
+    print()
+    print(f"{'scénario':<8} {'taille':>7} {'items/s':>10} {'Δ':>8} {'RSS Mo':>8} {'Δ':>8}")
+    for result in results:
+        previous = reference.get((result['scenario'], result['size']))
+        if not previous:
+            continue
+        speed_delta = (result['items_per_s'] / previous['items_per_s'] - 1) * 100 if previous['items_per_s'] else 0.0
+        memory_delta = (result['peak_rss_mb'] / previous['peak_rss_mb'] - 1) * 100 if previous['peak_rss_mb'] else 0.0
+        print(f"{result['scenario']:<8} {result['size']:>7} {result['items_per_s']:>10.1f} {speed_delta:>+7.1f}% "
+              f"{result['peak_rss_mb']:>8.1f} {memory_delta:>+7.1f}%")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hors ligne des scrapers Lynx Eye")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--supabase-latency', type=float, default=0.02,
+                        help="latence simulée par requête Supabase (s)")
+    parser.add_argument('--source-latency', type=float, default=0.01,
+                        help="latence simulée par flux / requête de recherche (s)")
+    parser.add_argument('--output', help="fichier JSON des résultats")
+    parser.add_argument('--baseline', help="référence JSON à comparer")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help=f"enregistre les résultats comme référence ({DEFAULT_BASELINE})")
+    parser.add_argument('--worker', choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.size, args)))
+        return
+
+    print("=" * 70)
+    print("🦅 LYNX EYE - BENCHMARK HORS LIGNE")
+    print("=" * 70)
+
+    results = []
+    for scenario in args.scenarios:
+        for size in args.sizes:
+            result = run_in_subprocess(scenario, size, args)
+            results.append(result)
+            latencies = next(iter(result['sources'].values()))
+            print(f"  {scenario:<4} {size:>6} articles: {result['items_per_s']:>9.1f} items/s | "
+                  f"source p50 {latencies['p50_ms']:.1f} ms p99 {latencies['p99_ms']:.1f} ms | "
+                  f"upsert p99 {result['upserts']['p99_ms']:.1f} ms | RSS {result['peak_rss_mb']:.1f} Mo")
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'settings': {
+            'supabase_latency_s': args.supabase_latency,
+            'source_latency_s': args.source_latency,
+        },
+        'results': results,
+    }
+
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+    targets = [path for path in (args.output, DEFAULT_BASELINE if args.save_baseline else None) if path]
+    for path in targets:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Résultats écrits dans {path}")
+
+
+if __name__ == '__main__':
+    main()
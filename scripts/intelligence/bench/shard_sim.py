@@ -0,0 +1,119 @@
+"""
+Simulation hors ligne du sharding multi-workers.
+
+N processus se partagent K sources via ShardCoordinator (anneau cohérent + baux SQLite) ;
+chaque source « collectée » coûte une latence fixe (téléchargement simulé). On mesure :
+- le temps total et l'accélération par rapport à un seul worker
+- les doublons (source collectée par deux workers)
+- avec --crash : un worker meurt en cours de route sans rendre ses baux,
+  sa part doit être reprise par les survivants après expiration des baux
+
+Usage (depuis scripts/intelligence) :
+    python -m bench.shard_sim --workers 1 2 4 8
+    python -m bench.shard_sim --workers 4 --crash
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+
+def _collected(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('CREATE TABLE IF NOT EXISTS collected (key TEXT NOT NULL, worker TEXT NOT NULL)')
+    conn.commit()
+    return conn
+
+
+def worker(worker_id, keys, shard_db, results_db, latency, lease_ttl, barrier, crash_after):
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from sharding import ShardCoordinator
+
+    coordinator = ShardCoordinator(worker_id, path=shard_db, lease_ttl=lease_ttl).start()
+    results = _collected(results_db)
+    barrier.wait()
+
+    processed = 0
+    while True:
+        done = {key for key, in results.execute('SELECT DISTINCT key FROM collected')}
+        if len(done) >= len(keys):
+            break
+        todo = [key for key in coordinator.assign(keys) if key not in done]
+        if not todo:
+            time.sleep(lease_ttl / 10)
+            continue
+        # Un lot par tour : la répartition est réévaluée régulièrement (arrivées, pannes)
+        for key in todo[:20]:
+            if not coordinator.holds([key]):
+                # Bail perdu entre-temps (heartbeat en retard) : la source est à un autre worker
+                break
+            time.sleep(latency)
+            results.execute('INSERT INTO collected (key, worker) VALUES (?, ?)', (key, worker_id))
+            results.commit()
+            processed += 1
+            if crash_after is not None and processed >= crash_after:
+                # Panne brutale : ni baux rendus, ni retrait de l'anneau
+                os._exit(1)
+    coordinator.close()
+
+
+def simulate(workers, keys, latency, lease_ttl, crash):
+    with tempfile.TemporaryDirectory(prefix='lynx-shards-') as state_dir:
+        shard_db = os.path.join(state_dir, 'shards.sqlite3')
+        results_db = os.path.join(state_dir, 'results.sqlite3')
+        _collected(results_db).close()
+        barrier = multiprocessing.Barrier(workers + 1)
+        processes = []
+        for index in range(workers):
+            crash_after = len(keys) // workers // 3 if crash and index == 0 else None
+            process = multiprocessing.Process(
+                target=worker,
+                args=(f"w{index}", keys, shard_db, results_db, latency, lease_ttl, barrier, crash_after)
+            )
+            process.start()
+            processes.append(process)
+
+        barrier.wait()
+        started = time.perf_counter()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        conn = _collected(results_db)
+        total, unique = conn.execute('SELECT COUNT(*), COUNT(DISTINCT key) FROM collected').fetchone()
+        per_worker = dict(conn.execute('SELECT worker, COUNT(*) FROM collected GROUP BY worker ORDER BY worker'))
+        conn.close()
+    return elapsed, total - unique, unique, per_worker
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulation du sharding multi-workers")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--keys', type=int, default=400)
+    parser.add_argument('--latency', type=float, default=0.02, help="coût simulé d'une source (s)")
+    parser.add_argument('--lease-ttl', type=float, default=2.0)
+    parser.add_argument('--crash', action='store_true', help="le worker w0 meurt en cours de route")
+    args = parser.parse_args(argv)
+
+    keys = [f"rss:https://source-{index}.example/feed/" for index in range(args.keys)]
+    serial = args.keys * args.latency
+    print(f"{'workers':>8} {'temps':>8} {'accél.':>7} {'doublons':>9} {'collectées':>11}   répartition")
+    for count in args.workers:
+        elapsed, duplicates, unique, per_worker = simulate(count, keys, args.latency, args.lease_ttl, args.crash)
+        # Accélération par rapport au coût séquentiel des sources (un seul processus, sans coordination)
+        speedup = serial / elapsed
+        print(f"{count:>8} {elapsed:>7.2f}s {speedup:>6.2f}x {duplicates:>9} {unique:>5}/{args.keys:<5}   "
+              f"{' '.join(f'{name}={value}' for name, value in per_worker.items())}")
+
+
+if __name__ == '__main__':
+    main()
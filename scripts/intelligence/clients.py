@@ -0,0 +1,40 @@
+"""
+Lynx Eye Clients
+Clients externes construits au premier usage puis partagés par tout le processus.
+Les bibliothèques lourdes (supabase...) ne sont importées qu'à ce moment.
+"""
+
+import threading
+
+import settings
+
+_lock = threading.Lock()
+_instances = {}
+
+
+def get_client(name, factory):
+    """Instance partagée `name`, créée par `factory()` au premier appel"""
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(name)
+            if instance is None:
+                instance = _instances[name] = factory()
+    return instance
+
+
+def set_client(name, instance):
+    """Remplace une instance partagée (benchmarks, outils, tests)"""
+    with _lock:
+        _instances[name] = instance
+
+
+def _create_supabase():
+    url, key = settings.require('SUPABASE_URL', 'SUPABASE_SERVICE_ROLE_KEY')
+    from supabase import create_client
+    return create_client(url, key)
+
+
+def supabase_client():
+    """Client Supabase (ConfigError si SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY manquent)"""
+    return get_client('supabase', _create_supabase)
@@ -0,0 +1,307 @@
+"""
+Lynx Eye Daemon
+Mode résident, alternative aux cron jobs de setup_cron.sh :
+- clients (Supabase, session HTTP) et caches/index créés une seule fois ; les sessions
+  DuckDuckGo / YouTube sont recréées après un cycle où une recherche a échoué
+- chaque flux RSS, page HTML, requête web et requête YouTube a son propre intervalle,
+  adapté à ce qu'il produit réellement (voir scheduler.py)
+- les items passent par le spool local (spool.py) : une panne de Supabase
+  n'interrompt pas la collecte, les lignes sont rejouées au retour de la base
+- arrêt propre sur SIGTERM / SIGINT : le cycle en cours se termine,
+  les écritures en attente et l'état local sont sauvegardés
+- disjoncteurs par source et par moteur (health.py) : une source morte est ignorée
+  pendant son délai de refroidissement au lieu de coûter un timeout à chaque cycle
+- avec LYNX_WORKER_ID, le daemon est un worker parmi d'autres (sharding.py) : il ne
+  collecte que sa part des sources, et reprend celle d'un worker tombé
+
+Usage :
+    python daemon.py
+    LYNX_WORKER_ID=w1 python daemon.py    # un processus par worker, même LYNX_STATE_DIR
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import date, datetime
+
+import metrics
+import rss_scraper
+import settings
+import web_scraper
+from archive import Archive, ArchiveWriter
+from clients import supabase_client
+from feed_cursors import FeedCursors
+from feed_fetcher import FeedFetcher
+from health import OPEN, HealthRegistry
+from near_dup import NearDuplicateIndex
+from pipeline import Pipeline, YieldTracker, collection_stages
+from query_cache import QueryCache
+from scheduler import AdaptiveScheduler
+from feed_fetcher import ValidatorCache
+from settings import ConfigError
+from seen_index import SeenIndex
+from sharding import ShardCoordinator, worker_state_path
+from spool import WriteSpool
+from state import state_path
+from supabase_writer import BatchWriter, configured_chunk_size
+from term_index import TermIndex
+from video_index import VideoIndex
+
+# Intervalles de départ (s) ; chaque source évolue ensuite entre 1/6 et 8 fois cette valeur
+DEFAULT_RSS_INTERVAL = 3600.0
+DEFAULT_WEB_INTERVAL = 21600.0
+
+# Réveil au moins toutes les minutes (changement de jour, arrêt demandé)
+MAX_SLEEP = 60.0
+
+
+class Daemon:
+    """Boucle de collecte résidente"""
+
+    def __init__(self, scheduler=None, stop_event=None, coordinator=None):
+        # Configuration Supabase validée avant d'ouvrir caches et sessions
+        client = supabase_client()
+        # En mode worker, l'état écrit en bloc (JSON, spool) est propre au worker ;
+        # les index SQLite (déjà vus, quasi-doublons, cache, planificateur) sont partagés
+        self.coordinator = coordinator
+        worker_id = coordinator.worker_id if coordinator else None
+        self.scheduler = scheduler or AdaptiveScheduler(path=worker_state_path('schedule.json', worker_id))
+        self.stop_event = stop_event or threading.Event()
+        self.run_metrics = metrics.start_run('daemon')
+        self.rss_interval = settings.get('LYNX_DAEMON_RSS_INTERVAL', DEFAULT_RSS_INTERVAL, float)
+        self.web_interval = settings.get('LYNX_DAEMON_WEB_INTERVAL', DEFAULT_WEB_INTERVAL, float)
+
+        self.health = HealthRegistry()
+        self.fetcher = FeedFetcher(cache=ValidatorCache(worker_state_path('feed_validators.json', worker_id)),
+                                   health=self.health)
+        self.cursors = FeedCursors(path=worker_state_path('feed_cursors.json', worker_id))
+        self.query_cache = QueryCache()
+        self.seen_index = SeenIndex()
+        self.dedup_index = NearDuplicateIndex()
+        self.planner = web_scraper.query_planner()
+        self.executor = web_scraper.search_executor(self.query_cache, self.health)
+        self.youtube_executor = web_scraper.youtube_executor(self.query_cache, self.health)
+        self.video_index = VideoIndex()
+        self.spool = WriteSpool(path=worker_state_path('write_spool.sqlite3', worker_id))
+        self.archive = ArchiveWriter()
+        self.term_index = TermIndex()
+        self.term_index.ensure_keywords(rss_scraper.SCORER.matcher.keywords)
+        self.writer = BatchWriter(client, chunk_size=configured_chunk_size(), on_saved=self._on_saved,
+                                  spool=self.spool)
+
+        self.feeds = {}
+        self.listings = {}
+        self.web_queries = []
+        self.youtube_queries = []
+        self.planned_videos = set()
+        self._queries_day = None
+        self.tracker = YieldTracker()
+        self.cycles = 0
+
+    def request_stop(self, *_):
+        print("\n🛑 Arrêt demandé, fin du cycle en cours...")
+        self.stop_event.set()
+
+    def _plan(self, engine, budget, today):
+        if self.coordinator is None:
+            return self.planner.plan(budget, engine=engine)
+        # Tous les workers doivent se partager le même ensemble de requêtes
+        return self.coordinator.shared_value(f"plan:{engine}:{today.isoformat()}",
+                                             lambda: self.planner.plan(budget, engine=engine))
+
+    def refresh_sources(self):
+        """
+        Enregistre les flux configurés et, une fois par jour, les requêtes planifiées du jour ;
+        en mode worker, seules les sources dont le worker obtient le bail sont enregistrées
+        """
+        self.feeds = rss_scraper.rss_feeds()
+        self.listings = rss_scraper.html_listings()
+
+        today = date.today()
+        if self._queries_day != today:
+            self._roll_metrics(today)
+            self.web_queries = self._plan('ddg', web_scraper.web_query_budget(), today)
+            planned_videos = self._plan('youtube', web_scraper.youtube_query_budget(), today)
+            # Comptes suivis (SOCIAL_HANDLES) en plus du budget planifié
+            self.youtube_queries = web_scraper.youtube_queries(planned_videos)
+            self.planned_videos = set(planned_videos)
+            self._queries_day = today
+            print(f"🎯 Requêtes du jour: {len(self.web_queries)} web, {len(self.youtube_queries)} YouTube")
+            # Fichiers d'archive des jours révolus fusionnés une fois par jour, par un seul worker
+            if self.coordinator is None or self.coordinator.is_leader('archive'):
+                Archive(self.archive.root).compact_past()
+
+        keys = [f"rss:{url}" for url in self.feeds]
+        keys += [f"html:{url}" for url in self.listings]
+        keys += [f"web:{query}" for query in self.web_queries]
+        keys += [f"youtube:{query}" for query in self.youtube_queries]
+        if self.coordinator is not None:
+            owned = self.coordinator.assign(keys)
+            if len(owned) != len(self.scheduler.sources):
+                print(f"🧩 Worker {self.coordinator.worker_id}: {len(owned)}/{len(keys)} sources")
+            keys = owned
+        for key in keys:
+            press = key.startswith(('rss:', 'html:'))
+            self.scheduler.register(key, self.rss_interval if press else self.web_interval)
+        self.scheduler.retain(keys)
+
+    def _on_saved(self, rows):
+        self.seen_index.mark_items(rows)
+        self.archive.add_rows(rows)
+        self.term_index.add_saved(rows)
+        self.video_index.mark_saved(rows)
+        self.tracker.saved(rows)
+
+    def run_cycle(self):
+        """Collecte les sources arrivées à échéance ; retourne le nombre de sources traitées"""
+        due = self.scheduler.due()
+        if self.coordinator is not None:
+            # Un bail perdu depuis refresh_sources (worker figé plus de lease_ttl) : source laissée
+            due = self.coordinator.holds(due)
+        if not due:
+            return 0
+
+        feeds = {url: self.feeds[url] for url in self.feeds if f"rss:{url}" in due}
+        listings = {url: self.listings[url] for url in self.listings if f"html:{url}" in due}
+        web_queries = [query for query in self.web_queries if f"web:{query}" in due]
+        youtube_queries = [query for query in self.youtube_queries if f"youtube:{query}" in due]
+
+        sources = {}
+        if feeds:
+            sources['rss'] = lambda: rss_scraper.iter_rss_items(
+                self.fetcher, self.cursors, feeds=feeds, on_feed=self.tracker.callback('rss'),
+                on_rejected=self.term_index.add_rejected)
+        if listings:
+            sources['html'] = lambda: rss_scraper.iter_html_items(
+                self.fetcher, listings, on_page=self.tracker.callback('html'),
+                on_rejected=self.term_index.add_rejected)
+        if web_queries:
+            sources['web'] = lambda: web_scraper.iter_web_news(
+                web_queries, max_results_per_query=3, executor=self.executor,
+                on_query=self.tracker.callback('web'))
+        if youtube_queries:
+            sources['youtube'] = lambda: web_scraper.iter_youtube(
+                youtube_queries, max_results_per_query=2, executor=self.youtube_executor,
+                on_query=self.tracker.callback('youtube'), videos=self.video_index)
+
+        print(f"\n⏰ Cycle {self.cycles + 1} ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')}): "
+              f"{len(feeds)} flux, {len(listings)} pages, {len(web_queries)} requêtes web, {len(youtube_queries)} YouTube")
+
+        self.tracker.reset()
+        pipeline = Pipeline(sources=sources, stages=collection_stages(self.seen_index, self.dedup_index),
+                            sink=self.writer)
+        saved_before = self.writer.saved
+        pipeline.run()
+
+        for key in due:
+            outcome = self.tracker.outcome(key)
+            self.scheduler.record(key, outcome['new'], outcome['failed'])
+        # Une seule érosion des statistiques du planificateur par cycle, quel que soit le nombre de workers
+        decay = self.coordinator is None or self.coordinator.is_leader('planner')
+        # Supabase indisponible : lignes restées dans le spool, rendement des requêtes non mesurable
+        pending = len(self.spool)
+        web_scraper.record_query_yields(self.planner, self.tracker, 'web', 'ddg', web_queries, decay, pending)
+        web_scraper.record_query_yields(self.planner, self.tracker, 'youtube', 'youtube',
+                                        [query for query in youtube_queries if query in self.planned_videos],
+                                        decay, pending)
+        self._renew_backend(self.executor, web_scraper.DDGSBackend, 'web', web_queries)
+        self._renew_backend(self.youtube_executor, web_scraper.YouTubeBackend, 'youtube', youtube_queries)
+        self.cycles += 1
+
+        spooled = f", {pending} en attente dans le spool" if pending else ""
+        print(f"✅ {self.writer.saved - saved_before} items sauvegardés en {pipeline.elapsed:.1f}s{spooled}")
+        if self.health.summary()[OPEN]:
+            self.health.print_summary()
+        self._persist()
+        return len(due)
+
+    def _renew_backend(self, executor, backend, prefix, queries):
+        """Sessions du moteur recréées après un échec : une session en erreur ne doit pas durer tout le processus"""
+        if any(self.tracker.outcome(f"{prefix}:{query}")['failed'] for query in queries):
+            executor.replace_backend(backend())
+
+    def _report_path(self, day=None):
+        """Rapport du jour en cours (daemon.json) ou d'un jour révolu (daemon-AAAAMMJJ.json)"""
+        os.makedirs(state_path('reports'), exist_ok=True)
+        worker_id = self.coordinator.worker_id if self.coordinator else None
+        report = os.path.basename(worker_state_path('daemon.json', worker_id))
+        if day is not None:
+            report = f"{report[:-len('.json')]}-{day.strftime('%Y%m%d')}.json"
+        return os.path.join(state_path('reports'), report)
+
+    def _roll_metrics(self, today):
+        """
+        Une collecte de métriques par jour : les libellés par requête changent avec le plan
+        du jour, un processus résident ne doit pas les accumuler sans fin
+        """
+        day = self.run_metrics.started_at.date()
+        if day == today:
+            return
+        self.run_metrics.write_json(self._report_path(day))
+        self.run_metrics = metrics.start_run('daemon')
+
+    def _persist(self):
+        self.archive.flush()
+        self.fetcher.cache.save()
+        self.cursors.save()
+        self.scheduler.save()
+        self.run_metrics.export(self._report_path())
+
+    def run_forever(self):
+        print("=" * 70)
+        print("🦅 LYNX EYE - MODE RÉSIDENT")
+        print("=" * 70)
+
+        try:
+            while not self.stop_event.is_set():
+                self.refresh_sources()
+                self.run_cycle()
+
+                next_wakeup = self.scheduler.next_wakeup()
+                wait = MAX_SLEEP if next_wakeup is None else next_wakeup - time.time()
+                self.stop_event.wait(min(MAX_SLEEP, max(1.0, wait)))
+        finally:
+            self.close()
+
+    def close(self):
+        """Vide les écritures en attente et sauvegarde l'état local"""
+        result = self.writer.close()
+        self.executor.close()
+        self.youtube_executor.close()
+        self.fetcher.close()
+        self._persist()
+        self.seen_index.close()
+        self.dedup_index.close()
+        self.query_cache.close()
+        self.planner.close()
+        self.spool.close()
+        self.archive.close()
+        self.term_index.close()
+        self.video_index.close()
+        self.health.print_summary()
+        self.health.close()
+        if self.coordinator is not None:
+            self.coordinator.close()
+        print(f"👋 Arrêt après {self.cycles} cycles ({result.saved} items sauvegardés, {result.failed} échecs, "
+              f"{result.pending} en attente)")
+
+
+def main():
+    worker_id = settings.get('LYNX_WORKER_ID')
+    coordinator = ShardCoordinator(worker_id).start() if worker_id else None
+    try:
+        daemon = Daemon(coordinator=coordinator)
+    except ConfigError as e:
+        if coordinator is not None:
+            coordinator.close()
+        print(f"❌ Erreur: {e}")
+        sys.exit(1)
+    signal.signal(signal.SIGTERM, daemon.request_stop)
+    signal.signal(signal.SIGINT, daemon.request_stop)
+    daemon.run_forever()
+
+
+if __name__ == '__main__':
+    main()
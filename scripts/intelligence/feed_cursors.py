@@ -0,0 +1,117 @@
+"""
+Lynx Eye Feed Cursors
+Curseurs incrémentaux par flux RSS (remplacent la fenêtre fixe entries[:10]) :
+- high-water mark = date de publication la plus récente + GUID récents
+- la lecture s'arrête à la première entrée déjà vue
+- toutes les nouvelles entrées sont traitées, sans plafond
+"""
+
+import calendar
+import json
+import os
+import threading
+
+from state import state_path
+
+MAX_REMEMBERED_GUIDS = 200
+
+
+def entry_guid(entry):
+    """Identifiant stable d'une entrée (id, sinon lien)"""
+    return entry.get('id') or entry.get('guid') or entry.get('link') or ''
+
+
+def entry_timestamp(entry):
+    """Date de publication en secondes epoch (UTC), ou None"""
+    for field in ('published_parsed', 'updated_parsed'):
+        value = entry.get(field)
+        if value:
+            return float(calendar.timegm(value))
+    return None
+
+
+class CursorScan:
+    """Parcours d'un flux à partir d'un curseur ; calcule le curseur suivant"""
+
+    def __init__(self, cursor=None):
+        cursor = cursor or {}
+        self.newest = cursor.get('newest')
+        self.guids = list(cursor.get('guids', []))
+        self._known = set(self.guids)
+        self.new_guids = []
+        self.new_newest = self.newest
+        self.scanned = 0
+        self.stopped_early = False
+
+    def is_known(self, entry):
+        if entry_guid(entry) in self._known:
+            return True
+        timestamp = entry_timestamp(entry)
+        return timestamp is not None and self.newest is not None and timestamp < self.newest
+
+    def accept(self, entry):
+        """Enregistre une entrée nouvelle ; False (fin du parcours) si elle est déjà connue"""
+        if self.is_known(entry):
+            self.stopped_early = True
+            return False
+        self.scanned += 1
+
+        guid = entry_guid(entry)
+        if guid:
+            self.new_guids.append(guid)
+            self._known.add(guid)
+
+        timestamp = entry_timestamp(entry)
+        if timestamp is not None and (self.new_newest is None or timestamp > self.new_newest):
+            self.new_newest = timestamp
+        return True
+
+    def new_entries(self, entries):
+        """Génère les entrées nouvelles et s'arrête à la première déjà vue"""
+        for entry in entries:
+            if not self.accept(entry):
+                return
+            yield entry
+
+    def next_cursor(self):
+        guids = list(dict.fromkeys(self.new_guids + self.guids))
+        return {'newest': self.new_newest, 'guids': guids[:MAX_REMEMBERED_GUIDS]}
+
+
+class FeedCursors:
+    """Stockage JSON des curseurs par URL de flux"""
+
+    def __init__(self, path=None):
+        self.path = path or state_path('feed_cursors.json')
+        self._lock = threading.Lock()
+        self._data = {}
+        self._dirty = False
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+
+    def scan(self, url):
+        """Nouveau parcours à partir du curseur enregistré pour ce flux"""
+        with self._lock:
+            return CursorScan(self._data.get(url))
+
+    def commit(self, url, scan):
+        """Avance le curseur une fois les entrées traitées avec succès"""
+        with self._lock:
+            cursor = scan.next_cursor()
+            if self._data.get(url) != cursor:
+                self._data[url] = cursor
+                self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
@@ -0,0 +1,205 @@
+"""
+Lynx Eye Feed Fetcher
+Téléchargement concurrent des flux RSS :
+- pool de threads borné et limite de connexions par hôte
+- timeout global par flux (connexion + lecture du corps), compté à partir de l'obtention
+  de la connexion de l'hôte (l'attente derrière les autres flux du même hôte n'en fait pas
+  partie) ; il est vérifié entre deux morceaux : une lecture lente n'est interrompue que par
+  le timeout de lecture de requests, le dépassement peut donc atteindre `timeout` secondes
+- GET conditionnel (ETag / Last-Modified) avec cache persistant des validateurs,
+  les flux inchangés reviennent en 304 sans corps
+- lecture en flux optionnelle : les morceaux du corps sont passés à un consommateur
+  (parseur incrémental) au lieu d'être accumulés, qui peut interrompre le téléchargement
+- registre de santé optionnel (health.py) : latence et erreurs de chaque URL enregistrées,
+  les URL dont le disjoncteur est ouvert reviennent en erreur sans appel réseau
+"""
+
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import metrics
+from health import CircuitOpenError
+from state import state_path
+
+USER_AGENT = 'LynxEye/1.0 (+veille strategique)'
+
+FeedResponse = namedtuple('FeedResponse', ['url', 'status', 'content', 'etag', 'last_modified', 'elapsed', 'error'])
+
+
+class ValidatorCache:
+    """Cache JSON des validateurs HTTP (ETag / Last-Modified) par URL de flux"""
+
+    def __init__(self, path=None):
+        self.path = path or state_path('feed_validators.json')
+        self._lock = threading.Lock()
+        self._data = {}
+        self._dirty = False
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+
+    def get(self, url):
+        with self._lock:
+            return dict(self._data.get(url, {}))
+
+    def update(self, url, etag=None, last_modified=None):
+        with self._lock:
+            entry = {}
+            if etag:
+                entry['etag'] = etag
+            if last_modified:
+                entry['last_modified'] = last_modified
+            if self._data.get(url) != entry:
+                self._data[url] = entry
+                self._dirty = True
+
+    def save(self):
+        """Écriture atomique du cache sur disque"""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+class FeedFetcher:
+    """Télécharge plusieurs flux en parallèle avec GET conditionnel"""
+
+    def __init__(self, cache=None, max_workers=8, per_host=2, timeout=20, connect_timeout=5, session=None,
+                 health=None):
+        self.cache = cache if cache is not None else ValidatorCache()
+        self.health = health
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.session = session or self._build_session(max_workers)
+        self._host_locks = {}
+        self._host_locks_guard = threading.Lock()
+
+    @staticmethod
+    def _build_session(pool_size):
+        import requests
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['User-Agent'] = USER_AGENT
+        return session
+
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc
+        with self._host_locks_guard:
+            if host not in self._host_locks:
+                self._host_locks[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_locks[host]
+
+    def fetch(self, url, sink=None):
+        """
+        Télécharge un flux ; status 304 = inchangé depuis la dernière exécution.
+        sink : callable(morceau) recevant le corps au fil de l'eau (content vaut alors None) ;
+               s'il retourne True, la lecture s'arrête là. Sa méthode start(en-têtes),
+               si elle existe, reçoit les en-têtes de la réponse avant le corps.
+        Source au disjoncteur ouvert : réponse en erreur CircuitOpenError, sans appel réseau.
+        """
+        if self.health is not None and not self.health.allow(url):
+            return FeedResponse(url, None, None, None, None, 0.0,
+                                CircuitOpenError(url, self.health.get(url).open_until))
+        response = self._fetch(url, sink)
+        if self.health is not None:
+            self.health.record(url, response.elapsed, response.error)
+        run_metrics = metrics.current()
+        run_metrics.add_stage_time('fetch', response.elapsed)
+        run_metrics.observe('source', url, response.elapsed)
+        run_metrics.count_items('fetch', 1, 0 if response.error else 1)
+        if response.error:
+            run_metrics.error('fetch', url)
+        elif response.status == 304:
+            run_metrics.incr('feeds_not_modified')
+        return response
+
+    def _fetch(self, url, sink=None):
+        validators = self.cache.get(url)
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        started = time.monotonic()
+        try:
+            with self._host_semaphore(url):
+                # Délai compté une fois la place obtenue dans la file de l'hôte
+                started = time.monotonic()
+                deadline = started + self.timeout
+                response = self.session.get(
+                    url,
+                    headers=headers,
+                    timeout=(self.connect_timeout, self.timeout),
+                    stream=True
+                )
+                with response:
+                    if response.status_code == 304:
+                        return FeedResponse(url, 304, None, validators.get('etag'),
+                                            validators.get('last_modified'), time.monotonic() - started, None)
+                    response.raise_for_status()
+
+                    start = getattr(sink, 'start', None)
+                    if start is not None:
+                        start(response.headers)
+                    chunks = []
+                    for chunk in response.iter_content(chunk_size=65536):
+                        # Vérifié entre deux morceaux ; une lecture bloquée relève du timeout de requests
+                        if time.monotonic() > deadline:
+                            raise TimeoutError(f"timeout global de {self.timeout}s dépassé")
+                        if sink is None:
+                            chunks.append(chunk)
+                        elif sink(chunk):
+                            break
+
+                    return FeedResponse(
+                        url,
+                        response.status_code,
+                        b''.join(chunks) if sink is None else None,
+                        response.headers.get('ETag'),
+                        response.headers.get('Last-Modified'),
+                        time.monotonic() - started,
+                        None
+                    )
+        except Exception as e:
+            return FeedResponse(url, None, None, None, None, time.monotonic() - started, e)
+
+    def fetch_all(self, urls, sinks=None):
+        """
+        Génère les réponses au fil de l'eau (ordre de complétion)
+        sinks : dict URL -> consommateur du corps (voir fetch)
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        if not unique_urls:
+            return
+        sinks = sinks or {}
+        workers = min(self.max_workers, len(unique_urls))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self.fetch, url, sinks.get(url)) for url in unique_urls]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def commit(self, response):
+        """Enregistre les validateurs d'une réponse traitée avec succès"""
+        if response.status == 200:
+            self.cache.update(response.url, response.etag, response.last_modified)
+
+    def close(self):
+        self.cache.save()
+        self.session.close()
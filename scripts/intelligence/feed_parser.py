@@ -0,0 +1,283 @@
+"""
+Lynx Eye Streaming Feed Parser
+Lecture en flux des documents RSS 2.0 / RSS 1.0 / Atom, alternative à feedparser.parse :
+- parseur XML incrémental (XMLPullParser) alimenté par morceaux : les entrées sont
+  générées une à une, dès que leur balise fermante est lue
+- seuls les champs utilisés sont extraits (title, summary, link, id, published, updated
+  et leurs dates analysées), avec les mêmes clés que feedparser
+- chaque entrée est retirée de l'arbre une fois traitée : l'arbre XML ne contient que
+  l'entrée en cours, quelle que soit la taille du flux
+- FeedScan parse le corps pendant le téléchargement, passe chaque entrée nouvelle à son
+  consommateur et interrompt le téléchargement à la première entrée déjà vue du curseur ;
+  le corps gardé pour le repli sur feedparser passe sur disque au-delà de FALLBACK_MEMORY
+- document mal formé (entités HTML, encodage inconnu...) : repli automatique sur feedparser
+"""
+
+import time
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import metrics
+import settings
+
+CHUNK_SIZE = 65536
+# Corps d'un flux gardé en mémoire pour le repli sur feedparser ; au-delà, fichier temporaire
+FALLBACK_MEMORY = 1 << 20
+DEFAULT_PARSER = 'stream'
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+RSS1 = '{http://purl.org/rss/1.0/}'
+CONTENT = '{http://purl.org/rss/1.0/modules/content/}'
+DC = '{http://purl.org/dc/elements/1.1/}'
+
+ENTRY_TAGS = {'item', RSS1 + 'item', ATOM + 'entry'}
+
+# Balise (enfant direct de l'entrée) -> champ ; les autres espaces de noms
+# (media:title, itunes:summary...) sont ignorés
+FIELD_TAGS = {
+    'title': 'title', RSS1 + 'title': 'title', ATOM + 'title': 'title',
+    'link': 'link', RSS1 + 'link': 'link', ATOM + 'link': 'link',
+    'guid': 'id', ATOM + 'id': 'id',
+    'description': 'summary', RSS1 + 'description': 'summary', ATOM + 'summary': 'summary',
+    CONTENT + 'encoded': 'content', ATOM + 'content': 'content',
+    'pubDate': 'published', ATOM + 'published': 'published',
+    DC + 'date': 'updated', ATOM + 'updated': 'updated',
+}
+
+
+def configured_parser():
+    """Parseur des flux RSS (LYNX_FEED_PARSER : stream, ou feedparser pour l'ancien comportement)"""
+    return settings.get('LYNX_FEED_PARSER', DEFAULT_PARSER)
+
+
+def parse_date(text):
+    """struct_time UTC d'une date RFC 822 ou ISO 8601 (comme published_parsed de feedparser), ou None"""
+    from datetime import datetime
+    from email.utils import parsedate_tz, mktime_tz
+
+    text = (text or '').strip()
+    if not text:
+        return None
+    parsed = parsedate_tz(text)
+    if parsed is not None:
+        try:
+            return time.gmtime(mktime_tz(parsed))
+        except (OverflowError, ValueError):
+            return None
+    try:
+        value = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return value.utctimetuple()
+
+
+def _entry(element):
+    """Entrée au format feedparser à partir de l'élément item / entry complet"""
+    fields = {}
+    permalink = None
+    for child in element:
+        field = FIELD_TAGS.get(child.tag)
+        if field is None:
+            continue
+        if field == 'link':
+            # Atom : <link rel="alternate" href="..."/> ; RSS : texte de l'élément
+            href = child.get('href')
+            if href is not None:
+                if child.get('rel', 'alternate') != 'alternate':
+                    continue
+                fields.setdefault('link', href.strip())
+                continue
+        if field not in fields:
+            fields[field] = (child.text or '').strip()
+            if child.tag == 'guid' and child.get('isPermaLink', 'true') == 'true':
+                permalink = fields[field]
+
+    entry = {
+        'title': fields.get('title', ''),
+        # Comme feedparser : contenu complet à défaut de résumé
+        'summary': fields.get('summary') or fields.get('content', ''),
+    }
+    # Comme feedparser : pas de clé 'link' sans lien ; un guid permalien RSS en tient lieu
+    link = fields.get('link') or permalink
+    if link:
+        entry['link'] = link
+    for field in ('id', 'published', 'updated'):
+        if fields.get(field):
+            entry[field] = fields[field]
+    if 'published' in entry and 'updated' not in entry:
+        # Comme feedparser : la date de publication RSS sert aussi de date de mise à jour
+        entry['updated'] = entry['published']
+    if entry.get('published'):
+        entry['published_parsed'] = parse_date(entry['published'])
+    if entry.get('updated'):
+        entry['updated_parsed'] = parse_date(entry['updated'])
+    return entry
+
+
+class EntryReader:
+    """Parseur incrémental : chaque morceau reçu retourne les entrées qu'il a complétées"""
+
+    def __init__(self):
+        self._parser = XMLPullParser(events=('start', 'end'))
+        self._stack = []
+        self._entry_depth = None
+        self._started = False
+
+    def feed(self, chunk):
+        if not self._started:
+            # Espaces ou BOM avant la déclaration XML : tolérés par feedparser, refusés par expat
+            chunk = bytes(chunk)
+            if chunk.startswith(b'\xef\xbb\xbf'):
+                chunk = chunk[3:]
+            chunk = chunk.lstrip()
+            if not chunk:
+                return []
+            self._started = True
+        self._parser.feed(chunk)
+        return self._read()
+
+    def close(self):
+        """Fin du document : lève ParseError s'il est incomplet"""
+        if not self._started:
+            return []
+        self._parser.close()
+        return self._read()
+
+    def _read(self):
+        entries = []
+        stack = self._stack
+        for event, element in self._parser.read_events():
+            if event == 'start':
+                stack.append(element)
+                if self._entry_depth is None and element.tag in ENTRY_TAGS:
+                    self._entry_depth = len(stack)
+                continue
+            stack.pop()
+            if self._entry_depth is not None and len(stack) == self._entry_depth - 1:
+                self._entry_depth = None
+                entries.append(_entry(element))
+                # L'élément traité quitte l'arbre : seule l'entrée en cours reste en mémoire
+                element.clear()
+                if stack:
+                    stack[-1].remove(element)
+        return entries
+
+
+def _chunks(source, chunk_size):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset:offset + chunk_size]
+    else:
+        yield from source
+
+
+def _fallback_entries(document):
+    import feedparser
+
+    metrics.current().incr('feed_parser_fallback')
+    return feedparser.parse(document).entries
+
+
+def iter_entries(source, chunk_size=CHUNK_SIZE, fallback=True):
+    """
+    Génère les entrées d'un flux une à une.
+    source   : document complet (bytes) ou itérable de morceaux
+    fallback : en cas de document mal formé, les entrées restantes sont lues par feedparser
+               (source en bytes uniquement)
+    """
+    reader = EntryReader()
+    yielded = 0
+    try:
+        for chunk in _chunks(source, chunk_size):
+            for entry in reader.feed(chunk):
+                yielded += 1
+                yield entry
+        yield from reader.close()
+    except ParseError:
+        if not fallback or not isinstance(source, (bytes, bytearray, memoryview)):
+            raise
+        # Même ordre de document : les entrées déjà générées sont sautées
+        yield from _fallback_entries(bytes(source))[yielded:]
+
+
+class FeedScan:
+    """
+    Consommateur du corps d'un flux (voir FeedFetcher.fetch) : parse chaque morceau dès
+    sa réception ; retourne True à la première entrée déjà connue du curseur, ce qui
+    interrompt le téléchargement.
+    scan     : CursorScan ; seules les entrées nouvelles sont retenues, le curseur avance
+    on_entry : callback(entrée) appelé pour chaque entrée nouvelle dès qu'elle est lue ;
+               sans callback, les entrées sont accumulées dans self.entries
+    """
+
+    def __init__(self, scan=None, on_entry=None, max_buffer=FALLBACK_MEMORY):
+        import tempfile
+
+        self.scan = scan
+        self.on_entry = on_entry
+        self.reader = EntryReader()
+        self.entries = []
+        self.count = 0
+        self.bytes_read = 0
+        self.stopped = False
+        self._failed = False
+        # Corps conservé pour le repli sur feedparser : en mémoire jusqu'à max_buffer, sur disque au-delà
+        self._raw = tempfile.SpooledTemporaryFile(max_size=max_buffer)
+
+    def __call__(self, chunk):
+        self.bytes_read += len(chunk)
+        self._raw.write(chunk)
+        if self._failed:
+            # Document mal formé : lu jusqu'au bout pour feedparser
+            return False
+        try:
+            entries = self.reader.feed(chunk)
+        except ParseError:
+            self._failed = True
+            return False
+        return self._accept(entries)
+
+    def _accept(self, entries):
+        for entry in entries:
+            if self.scan is not None and not self.scan.accept(entry):
+                self.stopped = True
+                self.close()
+                return True
+            self.count += 1
+            if self.on_entry is not None:
+                self.on_entry(entry)
+            else:
+                self.entries.append(entry)
+        return False
+
+    def finish(self):
+        """
+        Termine la lecture (repli sur feedparser si le document est mal formé) ; retourne
+        les entrées nouvelles dans l'ordre du flux (liste vide avec on_entry)
+        """
+        if self._raw is None:
+            return self.entries
+        try:
+            if not self.stopped and not self._failed:
+                try:
+                    self._accept(self.reader.close())
+                except ParseError:
+                    self._failed = True
+            if self._failed and not self.stopped:
+                # Même ordre de document : les entrées déjà transmises sont sautées
+                self._raw.seek(0)
+                self._accept(_fallback_entries(self._raw)[self.count:])
+        finally:
+            self.close()
+        return self.entries
+
+    def close(self):
+        """Libère le corps conservé (téléchargement en erreur ou terminé)"""
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+
+
+def parse_entries(source):
+    """Toutes les entrées d'un flux (liste)"""
+    return list(iter_entries(source))
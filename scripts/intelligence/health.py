@@ -0,0 +1,252 @@
+"""
+Lynx Eye Source Health
+Registre persistant (SQLite en mode WAL) de l'état de chaque source et de chaque moteur :
+- clés : URL des flux RSS / pages HTML (FeedFetcher), nom du moteur de recherche
+  ('ddg', 'youtube') ; les requêtes changent chaque jour, c'est le moteur qui tombe
+- latence et taux d'erreur en moyennes glissantes, compteurs d'appels et d'erreurs
+- disjoncteur : après `failure_threshold` échecs consécutifs la source est ouverte
+  (ignorée sans appel réseau) pendant un délai de refroidissement ; à son terme un seul
+  appel d'essai passe (semi-ouvert) : succès -> fermé, échec -> rouvert avec un délai doublé
+- chaque décision relit l'état en base dans une transaction d'écriture : les compteurs des
+  workers s'additionnent et un --reset lancé d'un autre terminal est pris en compte
+- partagé par les exécutions cron, le daemon et les workers (même LYNX_STATE_DIR)
+
+Usage :
+    python health.py                 # état des sources suivies
+    python health.py --reset URL     # referme un disjoncteur à la main
+"""
+
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import metrics
+import settings
+from state import state_path
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 1800.0
+MAX_COOLDOWN = 86400.0
+# Poids de la dernière mesure dans les moyennes glissantes
+ALPHA = 0.2
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+SourceHealth = namedtuple('SourceHealth', [
+    'key', 'state', 'failures', 'calls', 'errors', 'latency', 'error_rate',
+    'cooldown', 'open_until', 'trips', 'last_error', 'updated_at'
+])
+
+_COLUMNS = ', '.join(SourceHealth._fields)
+
+
+class CircuitOpenError(Exception):
+    """Source ignorée : son disjoncteur est ouvert"""
+
+    def __init__(self, key, retry_at):
+        super().__init__(f"disjoncteur ouvert jusqu'à {time.strftime('%H:%M', time.localtime(retry_at))}")
+        self.key = key
+        self.retry_at = retry_at
+
+
+class HealthRegistry:
+    """Disjoncteurs par source, avec latence et taux d'erreur persistés"""
+
+    def __init__(self, path=None, failure_threshold=None, cooldown=None, clock=time.time):
+        if failure_threshold is None:
+            failure_threshold = settings.get('LYNX_BREAKER_FAILURES', DEFAULT_FAILURE_THRESHOLD, int)
+        if cooldown is None:
+            cooldown = settings.get('LYNX_BREAKER_COOLDOWN', DEFAULT_COOLDOWN, float)
+        self.path = path or state_path('source_health.sqlite3')
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS source_health ('
+            ' key TEXT PRIMARY KEY,'
+            ' state TEXT NOT NULL,'
+            ' failures INTEGER NOT NULL,'
+            ' calls INTEGER NOT NULL,'
+            ' errors INTEGER NOT NULL,'
+            ' latency REAL NOT NULL,'
+            ' error_rate REAL NOT NULL,'
+            ' cooldown REAL NOT NULL,'
+            ' open_until REAL NOT NULL,'
+            ' trips INTEGER NOT NULL,'
+            ' last_error TEXT,'
+            ' updated_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+        self.skipped = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _initial(self, key):
+        return SourceHealth(key, CLOSED, 0, 0, 0, 0.0, 0.0, self.cooldown, 0.0, 0, None, 0.0)
+
+    def _read(self, key):
+        row = self._conn.execute(f"SELECT {_COLUMNS} FROM source_health WHERE key = ?", (key,)).fetchone()
+        return SourceHealth(*row) if row else None
+
+    @contextmanager
+    def _update(self):
+        """
+        Transaction d'écriture (BEGIN IMMEDIATE) : l'état relu à l'intérieur est celui que les
+        autres processus (workers, daemon, --reset) ont pu modifier depuis le dernier appel
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            return self._read(key) or self._initial(key)
+
+    def allow(self, key):
+        """
+        True si la source peut être appelée ; un disjoncteur ouvert dont le délai est écoulé
+        laisse passer un seul appel d'essai à la fois, tous processus confondus
+        """
+        now = self._clock()
+        with self._lock:
+            health = self._read(key)
+        if health is None or health.state == CLOSED:
+            return True
+        with self._update():
+            health = self._read(key)
+            if health is None or health.state == CLOSED:
+                return True
+            # Semi-ouvert : updated_at est le départ de l'essai en cours ; un essai sans compte
+            # rendu (appel interrompu) n'en bloque un autre que pendant le délai
+            retry_at = health.open_until if health.state == OPEN else health.updated_at + health.cooldown
+            if now < retry_at:
+                self.skipped += 1
+                metrics.current().incr('circuit_skipped')
+                return False
+            self._store(health._replace(state=HALF_OPEN, updated_at=now))
+            return True
+
+    def check(self, key):
+        """Lève CircuitOpenError si la source doit être ignorée"""
+        if not self.allow(key):
+            raise CircuitOpenError(key, self.get(key).open_until)
+
+    def record(self, key, seconds, error=None):
+        """Compte rendu d'un appel : durée (s) et erreur éventuelle"""
+        now = self._clock()
+        failed = error is not None
+        with self._update():
+            health = self._read(key) or self._initial(key)
+            health = health._replace(
+                calls=health.calls + 1,
+                errors=health.errors + failed,
+                latency=seconds if not health.calls else health.latency + ALPHA * (seconds - health.latency),
+                error_rate=health.error_rate + ALPHA * (failed - health.error_rate),
+                updated_at=now,
+            )
+            if not failed:
+                health = health._replace(state=CLOSED, failures=0, cooldown=self.cooldown, open_until=0.0)
+            else:
+                health = health._replace(failures=health.failures + 1, last_error=str(error)[:200])
+                if health.state == HALF_OPEN:
+                    # Essai en échec : rouvert, délai doublé
+                    cooldown = min(MAX_COOLDOWN, health.cooldown * 2)
+                    health = health._replace(state=OPEN, cooldown=cooldown, open_until=now + cooldown)
+                elif health.state == CLOSED and health.failures >= self.failure_threshold:
+                    health = health._replace(state=OPEN, cooldown=self.cooldown, open_until=now + self.cooldown,
+                                             trips=health.trips + 1)
+                    metrics.current().incr('circuit_trips')
+                    print(f"  🔌 Disjoncteur ouvert pour {key} ({health.failures} échecs consécutifs, "
+                          f"pause de {self.cooldown / 60:.0f} min)")
+            self._store(health)
+
+    def _store(self, health):
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO source_health ({_COLUMNS}) VALUES ({', '.join('?' * len(health))})",
+            health
+        )
+
+    def reset(self, key):
+        """Referme le disjoncteur d'une source ; retourne False si elle est inconnue"""
+        with self._update():
+            health = self._read(key)
+            if health is None:
+                return False
+            self._store(health._replace(state=CLOSED, failures=0, cooldown=self.cooldown, open_until=0.0))
+            return True
+
+    def sources(self):
+        """États de toutes les sources suivies, les moins saines en tête"""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {_COLUMNS} FROM source_health").fetchall()
+        return sorted((SourceHealth(*row) for row in rows), key=lambda health: (health.state == CLOSED, -health.error_rate))
+
+    def summary(self):
+        """Nombre de sources par état"""
+        counts = {CLOSED: 0, HALF_OPEN: 0, OPEN: 0}
+        for health in self.sources():
+            counts[health.state] += 1
+        return counts
+
+    def print_summary(self):
+        counts = self.summary()
+        print(f"🩺 Santé des sources: {counts[CLOSED]} fermées, {counts[HALF_OPEN]} en essai, "
+              f"{counts[OPEN]} ouvertes ({self.skipped} appels évités)")
+        for health in self.sources():
+            if health.state == CLOSED:
+                break
+            print(f"   🔌 {health.key}: {_describe(health)}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _describe(health):
+    if health.state == OPEN:
+        state = f"ouvert jusqu'à {time.strftime('%Y-%m-%d %H:%M', time.localtime(health.open_until))}"
+    else:
+        state = {CLOSED: 'fermé', HALF_OPEN: 'essai en cours'}[health.state]
+    line = (f"{state}, {health.failures} échecs consécutifs, erreurs {health.error_rate:.0%}, "
+            f"latence {health.latency * 1000:.0f} ms")
+    if health.state != CLOSED and health.last_error:
+        line += f" — {health.last_error}"
+    return line
+
+
+def main(argv=None):
+    # Import différé, comme dans archive.py
+    import argparse
+
+    parser = argparse.ArgumentParser(description="État des disjoncteurs des sources")
+    parser.add_argument('--reset', action='append', metavar='SOURCE', help="referme le disjoncteur (répétable)")
+    args = parser.parse_args(argv)
+
+    with HealthRegistry() as registry:
+        for key in args.reset or []:
+            print(f"{'✅ Refermé' if registry.reset(key) else '⚠️  Source inconnue'} : {key}")
+        if args.reset:
+            return
+        for health in registry.sources():
+            print(f"{health.key}\n   {_describe(health)} ({health.calls} appels, {health.trips} déclenchements)")
+        registry.print_summary()
+
+
+if __name__ == '__main__':
+    main()
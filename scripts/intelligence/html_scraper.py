@@ -0,0 +1,342 @@
+"""
+Lynx Eye HTML Listing Scraper
+Extraction des titres et liens des pages de rubrique sans flux RSS
+(L'Union, AGP Gabon, Infos241, RFI, Africa Intelligence, Mondafrique...) :
+- sélecteurs par site (sources.HTML_SELECTORS) : bloc article, titre, lien, résumé, date
+- parseur en flux (html.parser) alimenté morceau par morceau pendant le téléchargement,
+  sans construire le DOM de la page ; la lecture s'arrête dès que la page a livré
+  assez d'articles
+- mêmes entrées que les flux RSS (title, summary, link, published) : le filtre par
+  mots-clés et le writer sont ceux du scraper RSS
+- encodage : charset de l'en-tête Content-Type, sinon <meta charset> du début de page,
+  sinon UTF-8 (ISO-8859-1 lu en windows-1252, comme les navigateurs)
+"""
+
+import codecs
+import re
+from collections import namedtuple
+from datetime import datetime
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+# Articles lus au plus par page de rubrique
+DEFAULT_MAX_ENTRIES = 40
+
+# Début de page examiné pour trouver <meta charset> (comme les navigateurs)
+CHARSET_PRESCAN = 1024
+DEFAULT_ENCODING = 'utf-8'
+
+HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+
+# Pages annoncées en Latin-1 mais écrites en windows-1252 (apostrophes et guillemets typographiques)
+LATIN1_ALIASES = {'iso8859-1', 'ascii'}
+
+# Éléments sans balise fermante : jamais empilés
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+
+HtmlListing = namedtuple('HtmlListing', ['name', 'selectors'])
+
+SimpleSelector = namedtuple('SimpleSelector', ['tag', 'classes', 'id'])
+
+
+def _parse_simple(text):
+    """'div.a.b#c' -> SimpleSelector('div', {'a', 'b'}, 'c')"""
+    tag, classes, element_id = None, set(), None
+    token, kind = '', 'tag'
+    for char in text + '\0':
+        if char in '.#\0':
+            if token:
+                if kind == 'tag':
+                    tag = token.lower()
+                elif kind == 'class':
+                    classes.add(token)
+                else:
+                    element_id = token
+            token, kind = '', 'class' if char == '.' else 'id'
+        else:
+            token += char
+    return SimpleSelector(tag if tag != '*' else None, frozenset(classes), element_id)
+
+
+class Selector:
+    """
+    Sous-ensemble de CSS suffisant pour les pages de rubrique :
+    balise, .classe, #id, combinateur descendant (espace), alternatives (virgule)
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.alternatives = [
+            [_parse_simple(part) for part in alternative.split()]
+            for alternative in text.split(',') if alternative.strip()
+        ]
+
+    @staticmethod
+    def _match_one(simple, element):
+        tag, classes, element_id = element
+        return ((simple.tag is None or simple.tag == tag)
+                and simple.classes <= classes
+                and (simple.id is None or simple.id == element_id))
+
+    def matches(self, stack, start=0):
+        """L'élément au sommet de la pile correspond-il (ancêtres cherchés à partir de `start`) ?"""
+        if len(stack) <= start:
+            return False
+        for parts in self.alternatives:
+            if not self._match_one(parts[-1], stack[-1]):
+                continue
+            position = len(stack) - 2
+            for simple in reversed(parts[:-1]):
+                while position >= start and not self._match_one(simple, stack[position]):
+                    position -= 1
+                if position < start:
+                    break
+                position -= 1
+            else:
+                return True
+        return False
+
+
+# Dates affichées à la française : 03/02/2026, 03/02/2026 - 10:45, 03-02-2026 10h45
+FRENCH_DATE = re.compile(r'(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})(?:\D+(\d{1,2})[:h](\d{2}))?')
+
+
+def _clean(text):
+    return ' '.join(text.split())
+
+
+def normalize_date(text):
+    """Date ISO 8601 à partir d'un attribut datetime ou d'une date affichée ; None si illisible"""
+    text = _clean(text or '')
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text.replace('Z', '+00:00')).isoformat()
+    except ValueError:
+        pass
+    match = FRENCH_DATE.search(text)
+    if not match:
+        return None
+    day, month, year, hour, minute = match.groups()
+    try:
+        return datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0)).isoformat()
+    except ValueError:
+        return None
+
+
+class ListingParser(HTMLParser):
+    """
+    Parseur incrémental d'une page de rubrique : feed() peut être appelé avec
+    des morceaux arbitraires, les articles complets s'accumulent dans `entries`.
+    """
+
+    def __init__(self, selectors, base_url='', max_entries=DEFAULT_MAX_ENTRIES):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.max_entries = max_entries
+        self.item = Selector(selectors['item'])
+        self.fields = {
+            field: Selector(selectors[field])
+            for field in ('title', 'link', 'summary', 'date') if selectors.get(field)
+        }
+        self.entries = []
+        self._stack = []
+        self._current = None
+        self._item_depth = None
+        self._captures = []
+        self._links = set()
+
+    @property
+    def full(self):
+        return len(self.entries) >= self.max_entries
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        self._separate()
+        self._stack.append((tag, frozenset((attrs.get('class') or '').split()), attrs.get('id')))
+        self._inspect(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self._stack.pop()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self._pop_to(len(self._stack) - 1)
+
+    def _inspect(self, tag, attrs):
+        depth = len(self._stack)
+        if self._current is None:
+            if self.item.matches(self._stack):
+                self._current = {}
+                self._item_depth = depth
+            return
+
+        # Champs cherchés à l'intérieur du bloc courant ; la première occurrence l'emporte
+        item_start = self._item_depth
+        current = self._current
+        for field, selector in self.fields.items():
+            if field in current or not selector.matches(self._stack, item_start):
+                continue
+            if field == 'link':
+                if attrs.get('href'):
+                    current['link'] = urljoin(self.base_url, attrs['href'])
+            elif field == 'date' and attrs.get('datetime'):
+                current['published'] = attrs['datetime']
+            elif tag not in VOID_ELEMENTS:
+                key = 'published' if field == 'date' else field
+                if key not in current:
+                    current[key] = ''
+                    self._captures.append((key, depth))
+        if 'link' not in self.fields and 'link' not in current and tag == 'a' and attrs.get('href') \
+                and any(key == 'title' for key, _ in self._captures):
+            # Sans sélecteur de lien : lien porté par le titre
+            current['link'] = urljoin(self.base_url, attrs['href'])
+
+    def handle_data(self, data):
+        for key, _ in self._captures:
+            self._current[key] += data
+
+    def _separate(self):
+        # Une frontière de balise sépare les mots (<br>, paragraphes successifs)
+        for key, _ in self._captures:
+            self._current[key] += ' '
+
+    def handle_endtag(self, tag):
+        self._separate()
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                self._pop_to(index)
+                return
+
+    def _pop_to(self, index):
+        """Ferme les éléments à partir de `index` (balises non fermées comprises)"""
+        del self._stack[index:]
+        depth = len(self._stack)
+        self._captures = [(key, level) for key, level in self._captures if level <= depth]
+        if self._item_depth is not None and self._item_depth > depth:
+            self._finish_item()
+
+    def _finish_item(self):
+        current = self._current
+        self._current, self._item_depth, self._captures = None, None, []
+        title = _clean(current.get('title', ''))
+        link = current.get('link')
+        if not title or not link or link in self._links or self.full:
+            return
+        self._links.add(link)
+        self.entries.append({
+            'title': title,
+            'summary': _clean(current.get('summary', '')),
+            'link': link,
+            'published': normalize_date(current.get('published')),
+        })
+
+    def close(self):
+        super().close()
+        if self._current is not None:
+            self._finish_item()
+
+
+def _codec(charset):
+    """Nom de codec Python d'un charset déclaré, ou None s'il est inconnu"""
+    try:
+        name = codecs.lookup(charset.strip()).name
+    except (LookupError, ValueError):
+        return None
+    return 'cp1252' if name in LATIN1_ALIASES else name
+
+
+def header_charset(content_type):
+    """Charset de l'en-tête Content-Type ('text/html; charset=ISO-8859-1'), ou None"""
+    match = HEADER_CHARSET.search(content_type or '')
+    return _codec(match.group(1)) if match else None
+
+
+def meta_charset(head):
+    """Charset déclaré dans le début de page (BOM, <meta charset>, <meta http-equiv>), ou None"""
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8'
+    match = META_CHARSET.search(head[:CHARSET_PRESCAN])
+    return _codec(match.group(1).decode('ascii', 'replace')) if match else None
+
+
+class ListingScan:
+    """
+    Consommateur du corps d'une page (voir FeedFetcher.fetch) : décode et parse
+    chaque morceau dès sa réception ; retourne True quand la page a livré assez d'articles.
+    encoding : imposé, sinon charset de l'en-tête (start), du <meta charset> ou UTF-8
+    """
+
+    def __init__(self, selectors, base_url='', max_entries=DEFAULT_MAX_ENTRIES, encoding=None):
+        self.parser = ListingParser(selectors, base_url, max_entries)
+        self.encoding = None
+        self._decoder = None
+        # Début de page retenu tant que l'encodage n'est pas connu
+        self._head = b''
+        self.bytes_read = 0
+        if encoding:
+            self._set_encoding(_codec(encoding))
+
+    def _set_encoding(self, encoding):
+        self.encoding = encoding or DEFAULT_ENCODING
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+
+    def start(self, headers):
+        """En-têtes HTTP de la réponse, reçus avant le corps (voir FeedFetcher.fetch)"""
+        if self._decoder is None:
+            charset = header_charset(headers.get('Content-Type'))
+            if charset:
+                self._set_encoding(charset)
+
+    def __call__(self, chunk):
+        self.bytes_read += len(chunk)
+        if self._decoder is None:
+            self._head += chunk
+            if len(self._head) < CHARSET_PRESCAN:
+                return False
+            self._set_encoding(meta_charset(self._head))
+            chunk, self._head = self._head, b''
+        self.parser.feed(self._decoder.decode(chunk))
+        return self.parser.full
+
+    def finish(self):
+        """Articles extraits (dans l'ordre de la page)"""
+        if self._decoder is None:
+            # Page plus courte que la zone examinée
+            self._set_encoding(meta_charset(self._head))
+            self.parser.feed(self._decoder.decode(self._head))
+            self._head = b''
+        if not self.parser.full:
+            self.parser.feed(self._decoder.decode(b'', final=True))
+            self.parser.close()
+        return self.parser.entries
+
+
+def extract_entries(html, selectors, base_url='', max_entries=DEFAULT_MAX_ENTRIES):
+    """Articles d'une page déjà téléchargée (str ou bytes)"""
+    if isinstance(html, str):
+        scan = ListingScan(selectors, base_url, max_entries, encoding='utf-8')
+        html = html.encode('utf-8')
+    else:
+        scan = ListingScan(selectors, base_url, max_entries)
+    scan(html)
+    return scan.finish()
+
+
+def iter_listings(fetcher, listings, max_entries=DEFAULT_MAX_ENTRIES):
+    """
+    Télécharge les pages en parallèle (concurrence bornée du fetcher) et génère
+    (réponse, articles) au fil des téléchargements ; articles vaut None si la page
+    est en erreur ou inchangée (304).
+    listings : dict URL -> HtmlListing
+    """
+    scans = {url: ListingScan(listing.selectors, url, max_entries) for url, listing in listings.items()}
+    for response in fetcher.fetch_all(listings, sinks=scans):
+        if response.error or response.status == 304:
+            yield response, None
+            continue
+        yield response, scans.pop(response.url).finish()
@@ -3,81 +3,134 @@ Lynx Eye Keywords Database
 Base de données de mots-clés pour la veille stratégique
 """
 
-# Mots-clés principaux (300+ termes)
-INTELLIGENCE_KEYWORDS = [
+from collections import namedtuple
+
+# Taxonomie des mots-clés : catégorie -> poids par défaut et termes
+# (300+ termes ; le poids reflète la valeur de signal d'une occurrence)
+KEYWORD_TAXONOMY = {
     # POLITIQUE & TRANSITION
-    "ctri", "comité de transition", "présidence de la transition",
-    "président oligui", "brice oligui nguema", "général oligui", "oligui",
-    "conseil des ministres", "assemblée nationale de transition",
-    "gouvernement de transition", "dialogue national inclusif", "dni",
-    "référendum constitutionnel", "nouvelle constitution", "élections 2025",
-    "code électoral", "commission électorale", "ali bongo", "famille bongo",
-    "pdg", "parti démocratique gabonais", "opposition gabonaise",
-    "alternance démocratique", "alexandre barro chambrier", "raymond ndong sima",
-    "coup d'état", "putsch", "30 août 2023", "libération",
-    "restauration des institutions", "retour à l'ordre constitutionnel",
-    "le boss", "le patron", "le vieux", "mapane", "mbeng",
+    "politique": {
+        "weight": 1.2,
+        "terms": [
+            "ctri", "comité de transition", "présidence de la transition",
+            "président oligui", "brice oligui nguema", "général oligui", "oligui",
+            "conseil des ministres", "assemblée nationale de transition",
+            "gouvernement de transition", "dialogue national inclusif", "dni",
+            "référendum constitutionnel", "nouvelle constitution", "élections 2025",
+            "code électoral", "commission électorale", "ali bongo", "famille bongo",
+            "pdg", "parti démocratique gabonais", "opposition gabonaise",
+            "alternance démocratique", "alexandre barro chambrier", "raymond ndong sima",
+            "coup d'état", "putsch", "30 août 2023", "libération",
+            "restauration des institutions", "retour à l'ordre constitutionnel",
+            "le boss", "le patron", "le vieux", "mapane", "mbeng"
+        ]
+    },
     
     # SÉCURITÉ & DÉFENSE
-    "gendarmerie nationale", "police nationale", "garde républicaine",
-    "gr", "forces armées gabonaises", "fag", "état-major",
-    "microbes", "braquage", "cambriolage", "vol à main armée",
-    "criminalité", "insécurité", "bavure policière", "banditisme",
-    "kobolo", "cannabis", "weed", "yamba", "cocaïne", "trafic de drogue",
-    "narcotrafic", "dealer", "coupeur de route",
-    "frontière cameroun", "frontière guinée équatoriale", "kyé-ossi",
-    "bitam", "mitzic", "bata", "immigration clandestine", "réfugiés",
-    "boko haram", "menace terroriste", "golfe de guinée",
-    "piraterie maritime", "otages", "les képis", "les gars de la gr",
+    "securite": {
+        "weight": 1.5,
+        "terms": [
+            "gendarmerie nationale", "police nationale", "garde républicaine",
+            "gr", "forces armées gabonaises", "fag", "état-major",
+            "microbes", "braquage", "cambriolage", "vol à main armée",
+            "criminalité", "insécurité", "bavure policière", "banditisme",
+            "kobolo", "cannabis", "weed", "yamba", "cocaïne", "trafic de drogue",
+            "narcotrafic", "dealer", "coupeur de route",
+            "frontière cameroun", "frontière guinée équatoriale", "kyé-ossi",
+            "bitam", "mitzic", "bata", "immigration clandestine", "réfugiés",
+            "boko haram", "menace terroriste", "golfe de guinée",
+            "piraterie maritime", "otages", "les képis", "les gars de la gr"
+        ]
+    },
     
     # ÉCONOMIE & INDUSTRIES
-    "perenco", "maurel & prom", "total gabon", "vaalco", "assala energy",
-    "production pétrolière", "gisement", "offshore", "port-gentil",
-    "rabi", "gamba", "manganèse", "comilog", "eramet", "moanda",
-    "franceville", "belinga", "fer", "or", "minerai",
-    "exploitation forestière", "bois précieux", "okoumé", "déforestation",
-    "olam", "rougier", "port d'owendo", "oprag", "terminal pétrolier",
-    "dette publique", "fmi", "banque mondiale", "budget de l'état",
-    "bgfibank", "franc cfa", "beac", "salaires des fonctionnaires",
-    "arriérés de salaires", "cnss", "chômage des jeunes",
-    "zone économique spéciale nkok", "gsez", "ngori", "mabé",
+    "economie": {
+        "weight": 1.0,
+        "terms": [
+            "perenco", "maurel & prom", "total gabon", "vaalco", "assala energy",
+            "production pétrolière", "gisement", "offshore", "port-gentil",
+            "rabi", "gamba", "manganèse", "comilog", "eramet", "moanda",
+            "franceville", "belinga", "fer", "or", "minerai",
+            "exploitation forestière", "bois précieux", "okoumé", "déforestation",
+            "olam", "rougier", "port d'owendo", "oprag", "terminal pétrolier",
+            "dette publique", "fmi", "banque mondiale", "budget de l'état",
+            "bgfibank", "franc cfa", "beac", "salaires des fonctionnaires",
+            "arriérés de salaires", "cnss", "chômage des jeunes",
+            "zone économique spéciale nkok", "gsez", "ngori", "mabé"
+        ]
+    },
     
     # SOCIAL & BAROMÈTRE
-    "vie chère", "cherté de la vie", "pouvoir d'achat",
-    "prix des denrées", "essence", "gasoil", "pain", "riz",
-    "seeg", "coupure électricité", "délestage", "coupure d'eau",
-    "pénurie d'eau", "état des routes", "nids de poule",
-    "transgabonaise", "setrag", "hôpital de libreville",
-    "chu angondjé", "pénurie de médicaments", "amo", "cnamgs",
-    "bourses étudiants", "université omar bongo", "grève des enseignants",
-    "crise du logement", "ordures ménagères",
-    "c'est dur au gabon", "on souffre", "le pays est bloqué",
-    "wé on fait comment", "ça chauffe", "la route est gâtée",
+    "social": {
+        "weight": 1.0,
+        "terms": [
+            "vie chère", "cherté de la vie", "pouvoir d'achat", "coupure",
+            "prix des denrées", "essence", "gasoil", "pain", "riz",
+            "seeg", "coupure électricité", "délestage", "coupure d'eau",
+            "pénurie d'eau", "état des routes", "nids de poule",
+            "transgabonaise", "setrag", "hôpital de libreville",
+            "chu angondjé", "pénurie de médicaments", "amo", "cnamgs",
+            "bourses étudiants", "université omar bongo", "grève des enseignants",
+            "crise du logement", "ordures ménagères",
+            "c'est dur au gabon", "on souffre", "le pays est bloqué",
+            "wé on fait comment", "ça chauffe", "la route est gâtée"
+        ]
+    },
     
     # INFRASTRUCTURES & PROJETS
-    "belinga exploitation", "transgabonais santa clara",
-    "barrage de grand poubara", "barrage de kinguélé",
-    "aéroport international léon mba", "air gabon",
-    "libreville", "oyem", "tchibanga", "mouila", "lambaréné",
+    "infrastructures": {
+        "weight": 0.8,
+        "terms": [
+            "belinga exploitation", "transgabonais santa clara",
+            "barrage de grand poubara", "barrage de kinguélé",
+            "aéroport international léon mba", "air gabon",
+            "libreville", "oyem", "tchibanga", "mouila", "lambaréné"
+        ]
+    },
     
     # DIPLOMATIE & INTERNATIONAL
-    "coopération franco-gabonaise", "bases militaires françaises",
-    "ambassade de france", "total", "bolloré", "ceeac", "cemac",
-    "union africaine", "commonwealth britannique",
-    "chine au gabon", "russie", "wagner", "chantiers chinois",
-    "ambassade américaine", "greenpeace", "wwf", "brainforest",
+    "diplomatie": {
+        "weight": 0.8,
+        "terms": [
+            "coopération franco-gabonaise", "bases militaires françaises",
+            "ambassade de france", "total", "bolloré", "ceeac", "cemac",
+            "union africaine", "commonwealth britannique",
+            "chine au gabon", "russie", "wagner", "chantiers chinois",
+            "ambassade américaine", "greenpeace", "wwf", "brainforest"
+        ]
+    },
     
     # MENACES & CRISES
-    "manifestation", "émeute", "protestation", "barrage routier",
-    "grève générale", "mouvement social", "fake news gabon",
-    "rumeur coup d'état", "complot", "diaspora gabonaise",
-    "exilés politiques", "activistes facebook", "youtube gabon",
-    "inondation libreville", "glissement de terrain", "incendie",
+    "menaces": {
+        "weight": 1.5,
+        "terms": [
+            "manifestation", "émeute", "protestation", "barrage routier",
+            "grève", "grève générale", "rumeur", "mouvement social", "fake news gabon",
+            "rumeur coup d'état", "complot", "diaspora gabonaise",
+            "exilés politiques", "activistes facebook", "youtube gabon",
+            "inondation libreville", "glissement de terrain", "incendie"
+        ]
+    },
     
     # GÉNÉRIQUE CONTEXTUEL
-    "gabon", "gabon actualités", "gabon news", "gabon politique",
-    "gabon économie", "libreville news", "port-gentil actualités"
-]
+    "contexte": {
+        "weight": 0.2,
+        "terms": [
+            "gabon", "gabon actualités", "gabon news", "gabon politique",
+            "gabon économie", "libreville news", "port-gentil actualités"
+        ]
+    }
+}
+
+# Poids spécifiques : termes ambigus ou très génériques (signal faible)
+TERM_WEIGHTS = {
+    "or": 0.2, "fer": 0.3, "gr": 0.3, "fag": 0.3, "pain": 0.3, "riz": 0.3,
+    "essence": 0.5, "total": 0.3, "libération": 0.5, "libreville": 0.4,
+    "le boss": 0.3, "le patron": 0.3, "le vieux": 0.3
+}
+
+# Liste à plat de tous les termes de la taxonomie
+INTELLIGENCE_KEYWORDS = [term for category in KEYWORD_TAXONOMY.values() for term in category["terms"]]
 
 # Mots-clés prioritaires (surveillance critique)
 PRIORITY_KEYWORDS = [
@@ -86,6 +139,16 @@ PRIORITY_KEYWORDS = [
     "rumeur", "complot", "émeute", "protestation"
 ]
 
+# Multiplicateur de poids des mots-clés prioritaires
+PRIORITY_WEIGHT_FACTOR = 2.0
+
+KeywordTerm = namedtuple('KeywordTerm', ['term', 'category', 'weight'])
+
+# Contexte gabonais requis pour les résultats de recherche web
+GABON_CONTEXT_KEYWORDS = [
+    "gabon", "gabonais", "gabonaise", "gabonaises"
+]
+
 # Modificateurs pour combinaisons dynamiques
 MODIFIERS = [
     "crise", "problème", "scandale", "grève", "manifestation",
@@ -99,6 +162,20 @@ CITIES = [
     "moanda", "tchibanga", "mouila", "lambaréné", "bitam"
 ]
 
+def get_keyword_terms():
+    """
+    Retourne les termes de la taxonomie avec leur catégorie et leur poids
+    (poids de la catégorie, sauf poids spécifique ; prioritaires renforcés)
+    """
+    terms = []
+    for category, spec in KEYWORD_TAXONOMY.items():
+        for term in spec["terms"]:
+            weight = TERM_WEIGHTS.get(term, spec["weight"])
+            if term in PRIORITY_KEYWORDS:
+                weight *= PRIORITY_WEIGHT_FACTOR
+            terms.append(KeywordTerm(term, category, weight))
+    return terms
+
 def get_daily_keywords(count=30):
     """
     Retourne un échantillon aléatoire de mots-clés pour la journée
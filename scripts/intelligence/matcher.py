@@ -0,0 +1,179 @@
+"""
+Lynx Eye Keyword Matcher
+Automate Aho-Corasick compilé une seule fois à partir des listes de mots-clés.
+Chaque texte est parcouru en une seule passe, quel que soit le nombre de termes :
+- casse et accents normalisés ("greve" trouve "grève")
+- frontières de mots respectées ("or" ne matche pas dans "Oligui" ni "fer" dans "ferme")
+- chaque occurrence est retournée avec sa position dans le texte d'origine
+"""
+
+import unicodedata
+from collections import deque, namedtuple
+
+Match = namedtuple('Match', ['keyword', 'start', 'end'])
+
+# Apostrophes et tirets typographiques fréquents dans la presse
+_CHAR_EQUIVALENTS = {
+    '’': "'", '‘': "'", 'ʼ': "'", '`': "'",
+    '‐': '-', '‑': '-', '–': '-', '—': '-',
+    ' ': ' ',
+}
+
+
+def _fold_char(char):
+    """Forme normalisée d'un caractère (peut être vide pour un accent isolé)"""
+    char = _CHAR_EQUIVALENTS.get(char, char)
+    decomposed = unicodedata.normalize('NFD', char.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+class _FoldTable(dict):
+    """Table de str.translate remplie à la demande : chaque caractère n'est décomposé qu'une fois"""
+
+    def __missing__(self, code):
+        folded = self[code] = _fold_char(chr(code))
+        return folded
+
+
+_FOLD_TABLE = _FoldTable()
+
+
+def normalize(text):
+    """Minuscules et suppression des accents"""
+    return text.translate(_FOLD_TABLE)
+
+
+def normalize_with_offsets(text):
+    """
+    Normalise le texte et retourne la table de correspondance des positions :
+    offsets[i] est l'indice dans `text` du caractère normalisé i
+    (offsets[len(normalized)] == len(text))
+    """
+    chars = []
+    offsets = []
+    for index, char in enumerate(text):
+        folded = _fold_char(char)
+        chars.append(folded)
+        offsets.extend([index] * len(folded))
+    offsets.append(len(text))
+    return ''.join(chars), offsets
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+class KeywordMatcher:
+    """Automate Aho-Corasick sur une liste de mots-clés"""
+
+    def __init__(self, keywords):
+        self.keywords = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self._lengths = []
+
+        seen = set()
+        for keyword in keywords:
+            pattern = normalize(keyword).strip()
+            if not pattern or pattern in seen:
+                continue
+            seen.add(pattern)
+            self._add(pattern, keyword)
+
+        self._build()
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def _add(self, pattern, keyword):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        self._out[state] = (len(self.keywords),)
+        self.keywords.append(keyword)
+        self._lengths.append(len(pattern))
+
+    def _build(self):
+        """Calcule les liens d'échec (parcours en largeur)"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def _scan(self, normalized):
+        """Génère (indice du mot-clé, début, fin) dans le texte normalisé"""
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        lengths = self._lengths
+        size = len(normalized)
+        state = 0
+
+        for position, char in enumerate(normalized):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+
+            end = position + 1
+            if end < size and _is_word_char(normalized[end]):
+                continue
+            for index in out[state]:
+                start = end - lengths[index]
+                if start > 0 and _is_word_char(normalized[start - 1]):
+                    continue
+                yield index, start, end
+
+    def finditer(self, text):
+        """Génère chaque occurrence (Match) avec sa position dans le texte d'origine"""
+        if not text:
+            return
+        normalized, offsets = normalize_with_offsets(text)
+        for index, start, end in self._scan(normalized):
+            yield Match(self.keywords[index], offsets[start], offsets[end])
+
+    def find_all(self, text):
+        """Retourne toutes les occurrences, triées par position"""
+        return sorted(self.finditer(text), key=lambda m: (m.start, -m.end))
+
+    def search(self, text):
+        """True dès qu'un mot-clé est trouvé (arrêt à la première occurrence)"""
+        if not text:
+            return False
+        for _ in self._scan(normalize(text)):
+            return True
+        return False
+
+    def matched_keywords(self, text):
+        """Liste des mots-clés distincts trouvés, dans l'ordre d'apparition"""
+        if not text:
+            return []
+        found = {}
+        for index, _, _ in self._scan(normalize(text)):
+            found.setdefault(index, None)
+        return [self.keywords[index] for index in found]
+
+    def counts(self, text):
+        """Nombre d'occurrences par mot-clé distinct, dans l'ordre d'apparition"""
+        if not text:
+            return {}
+        found = {}
+        for index, _, _ in self._scan(normalize(text)):
+            found[index] = found.get(index, 0) + 1
+        return {self.keywords[index]: count for index, count in found.items()}
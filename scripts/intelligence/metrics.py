@@ -0,0 +1,239 @@
+"""
+Lynx Eye Run Metrics
+Instrumentation légère des exécutions :
+- temps cumulé par étape (fetch, parse, filter, dedupe, save)
+- items entrants / sortants par étape
+- histogrammes de latence par source, requête et upsert (buckets fixes)
+- compteurs d'erreurs
+Export en rapport JSON et, en option, en fichier texte au format Prometheus.
+
+Le coût par observation se limite à un bisect et une mise à jour de dict sous verrou.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+
+import settings
+from state import state_path
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Histogramme cumulatif à buckets fixes (compatible Prometheus)"""
+
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Estimation par interpolation linéaire dans le bucket concerné"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(self.counts):
+            upper = BUCKETS[index] if index < len(BUCKETS) else self.max
+            if bucket_count and seen + bucket_count >= target:
+                return min(self.max, lower + (upper - lower) * (target - seen) / bucket_count)
+            seen += bucket_count
+            lower = upper
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum_s': round(self.sum, 6),
+            'mean_ms': round(self.sum / self.count * 1000, 2) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.5) * 1000, 2),
+            'p99_ms': round(self.quantile(0.99) * 1000, 2),
+            'max_ms': round(self.max * 1000, 2),
+        }
+
+
+class RunMetrics:
+    """Métriques d'une exécution de scraper"""
+
+    def __init__(self, run='run'):
+        self.run = run
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stage_seconds = {}
+        self.stage_items = {}
+        self.latencies = {}
+        self.errors = {}
+        self.counters = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Chronomètre un bloc et l'ajoute au temps de l'étape"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - started)
+
+    def add_stage_time(self, name, seconds):
+        with self._lock:
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+
+    def count_items(self, stage, items_in=0, items_out=0):
+        with self._lock:
+            counts = self.stage_items.setdefault(stage, [0, 0])
+            counts[0] += items_in
+            counts[1] += items_out
+
+    def observe(self, kind, label, seconds):
+        """Latence d'une source, requête ou écriture (kind = 'source', 'query', 'upsert'...)"""
+        with self._lock:
+            histogram = self.latencies.setdefault(kind, {}).get(label)
+            if histogram is None:
+                histogram = self.latencies[kind][label] = Histogram()
+            histogram.observe(seconds)
+
+    def error(self, kind, label=''):
+        with self._lock:
+            key = (kind, label)
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self):
+        """Rapport JSON-sérialisable"""
+        with self._lock:
+            return {
+                'run': self.run,
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'duration_s': round(time.perf_counter() - self._started, 3),
+                'stages': {
+                    name: {
+                        'seconds': round(self.stage_seconds.get(name, 0.0), 6),
+                        'items_in': self.stage_items.get(name, [0, 0])[0],
+                        'items_out': self.stage_items.get(name, [0, 0])[1],
+                    }
+                    for name in sorted(set(self.stage_seconds) | set(self.stage_items))
+                },
+                'latencies': {
+                    kind: {label: histogram.to_dict() for label, histogram in sorted(per_label.items())}
+                    for kind, per_label in self.latencies.items()
+                },
+                'errors': [
+                    {'kind': kind, 'label': label, 'count': count}
+                    for (kind, label), count in sorted(self.errors.items())
+                ],
+                'counters': dict(sorted(self.counters.items())),
+            }
+
+    def write_json(self, path=None):
+        """Écrit le rapport JSON ; par défaut dans .lynx_state/reports/"""
+        if path is None:
+            os.makedirs(state_path('reports'), exist_ok=True)
+            stamp = self.started_at.strftime('%Y%m%d-%H%M%S')
+            path = os.path.join(state_path('reports'), f"{self.run}-{stamp}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def to_prometheus(self):
+        """Export au format texte Prometheus (textfile collector)"""
+        run = _label(self.run)
+        lines = [
+            '# HELP lynx_stage_seconds_total Temps cumulé par étape',
+            '# TYPE lynx_stage_seconds_total counter',
+        ]
+        with self._lock:
+            for name, seconds in sorted(self.stage_seconds.items()):
+                lines.append(f'lynx_stage_seconds_total{{run="{run}",stage="{_label(name)}"}} {seconds:.6f}')
+
+            lines += ['# HELP lynx_stage_items_total Items entrants / sortants par étape',
+                      '# TYPE lynx_stage_items_total counter']
+            for name, (items_in, items_out) in sorted(self.stage_items.items()):
+                stage = _label(name)
+                lines.append(f'lynx_stage_items_total{{run="{run}",stage="{stage}",direction="in"}} {items_in}')
+                lines.append(f'lynx_stage_items_total{{run="{run}",stage="{stage}",direction="out"}} {items_out}')
+
+            lines += ['# HELP lynx_latency_seconds Latence par source, requête et upsert',
+                      '# TYPE lynx_latency_seconds histogram']
+            for kind, per_label in sorted(self.latencies.items()):
+                for label, histogram in sorted(per_label.items()):
+                    labels = f'run="{run}",kind="{_label(kind)}",label="{_label(label)}"'
+                    cumulative = 0
+                    for bound, bucket_count in zip(BUCKETS + ('+Inf',), histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f'lynx_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'lynx_latency_seconds_sum{{{labels}}} {histogram.sum:.6f}')
+                    lines.append(f'lynx_latency_seconds_count{{{labels}}} {histogram.count}')
+
+            lines += ['# HELP lynx_errors_total Erreurs par type',
+                      '# TYPE lynx_errors_total counter']
+            for (kind, label), count in sorted(self.errors.items()):
+                lines.append(f'lynx_errors_total{{run="{run}",kind="{_label(kind)}",label="{_label(label)}"}} {count}')
+
+            lines += ['# HELP lynx_events_total Compteurs divers',
+                      '# TYPE lynx_events_total counter']
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'lynx_events_total{{run="{run}",name="{_label(name)}"}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Écriture atomique (le collecteur ne lit jamais un fichier partiel)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+        return path
+
+    def export(self, json_path=None):
+        """Rapport JSON + fichier Prometheus si LYNX_METRICS_PROM est défini"""
+        paths = [self.write_json(json_path)]
+        prometheus_path = settings.get('LYNX_METRICS_PROM')
+        if prometheus_path:
+            paths.append(self.write_prometheus(prometheus_path))
+        return paths
+
+    def print_summary(self):
+        report = self.report()
+        for name, stage in report['stages'].items():
+            print(f"   ⏱️  {name:<8} {stage['seconds']:>8.2f}s  {stage['items_in']:>6} → {stage['items_out']}")
+        if report['errors']:
+            print(f"   ⚠️  Erreurs: {sum(e['count'] for e in report['errors'])}")
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_current = RunMetrics()
+
+
+def current():
+    """Métriques de l'exécution en cours"""
+    return _current
+
+
+def start_run(run):
+    """Démarre une nouvelle collecte de métriques"""
+    global _current
+    _current = RunMetrics(run)
+    return _current
@@ -0,0 +1,218 @@
+"""
+Lynx Eye Near-Duplicate Detection
+Regroupe les reprises d'un même article (RSS, web, YouTube, syndication)
+avant l'enregistrement :
+- signature MinHash du champ content (shingles de mots normalisés)
+- index LSH par bandes persistant (SQLite) : recherche sous-linéaire
+- un seul item canonique est conservé, avec la liste de toutes ses sources
+"""
+
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from array import array
+
+from matcher import normalize
+from state import state_path
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 2
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_TTL_DAYS = 14
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(241)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Ensemble des n-grammes de mots du texte normalisé (HTML retiré)"""
+    tokens = _TOKEN_RE.findall(normalize(_TAG_RE.sub(' ', text or '')))
+    if len(tokens) < size:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(text):
+    """Signature MinHash (tuple de NUM_PERM entiers) ou None pour un texte vide"""
+    hashes = [_hash64(shingle) for shingle in shingles(text)]
+    if not hashes:
+        return None
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(signature_a, signature_b):
+    """Estimation de la similarité de Jaccard entre deux signatures"""
+    equal = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return equal / len(signature_a)
+
+
+def _band_keys(signature):
+    for band in range(BANDS):
+        values = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(array('Q', values).tobytes(), digest_size=8).hexdigest()
+        yield band, digest
+
+
+def _source_of(item):
+    return {'external_id': item.get('external_id'), 'author': item.get('author')}
+
+
+class NearDuplicateIndex:
+    """Index LSH persistant des items canoniques déjà émis"""
+
+    def __init__(self, path=None, threshold=DEFAULT_THRESHOLD, ttl_days=DEFAULT_TTL_DAYS):
+        self.path = path or state_path('near_duplicates.sqlite3')
+        self.threshold = threshold
+        self.ttl = ttl_days * 86400
+        self.collapsed = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(
+            'CREATE TABLE IF NOT EXISTS signatures ('
+            ' item_key TEXT PRIMARY KEY,'
+            ' signature BLOB NOT NULL,'
+            ' row_json TEXT NOT NULL,'
+            ' seen_at REAL NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS lsh_buckets ('
+            ' band INTEGER NOT NULL,'
+            ' bucket TEXT NOT NULL,'
+            ' item_key TEXT NOT NULL);'
+            'CREATE INDEX IF NOT EXISTS idx_lsh_buckets ON lsh_buckets (band, bucket);'
+            'CREATE INDEX IF NOT EXISTS idx_lsh_buckets_item ON lsh_buckets (item_key);'
+        )
+        self._conn.commit()
+        self.evict_expired()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def evict_expired(self):
+        """Oublie les items canoniques plus anciens que le TTL"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            self._conn.execute(
+                'DELETE FROM lsh_buckets WHERE item_key IN '
+                '(SELECT item_key FROM signatures WHERE seen_at < ?)', (cutoff,)
+            )
+            cursor = self._conn.execute('DELETE FROM signatures WHERE seen_at < ?', (cutoff,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def find(self, signature):
+        """Retourne (item_key, row) du canonique le plus proche au-dessus du seuil, sinon None"""
+        candidates = set()
+        with self._lock:
+            for band, bucket in _band_keys(signature):
+                for (item_key,) in self._conn.execute(
+                    'SELECT item_key FROM lsh_buckets WHERE band = ? AND bucket = ?', (band, bucket)
+                ):
+                    candidates.add(item_key)
+
+            best = None
+            best_score = self.threshold
+            for item_key in candidates:
+                row = self._conn.execute(
+                    'SELECT signature, row_json FROM signatures WHERE item_key = ?', (item_key,)
+                ).fetchone()
+                if not row:
+                    continue
+                score = similarity(signature, array('Q', row[0]))
+                if score >= best_score:
+                    best, best_score = (item_key, json.loads(row[1])), score
+            return best
+
+    def add(self, item_key, signature, row):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO signatures (item_key, signature, row_json, seen_at) VALUES (?, ?, ?, ?)',
+                (item_key, array('Q', signature).tobytes(), json.dumps(row, ensure_ascii=False), time.time())
+            )
+            self._conn.execute('DELETE FROM lsh_buckets WHERE item_key = ?', (item_key,))
+            self._conn.executemany(
+                'INSERT INTO lsh_buckets (band, bucket, item_key) VALUES (?, ?, ?)',
+                [(band, bucket, item_key) for band, bucket in _band_keys(signature)]
+            )
+            self._conn.commit()
+
+    def update_row(self, item_key, row):
+        with self._lock:
+            self._conn.execute(
+                'UPDATE signatures SET row_json = ? WHERE item_key = ?',
+                (json.dumps(row, ensure_ascii=False), item_key)
+            )
+            self._conn.commit()
+
+    def collapse(self, items):
+        """
+        Regroupe les quasi-doublons d'un lot.
+        Chaque item retourné porte un champ `sources` ; un canonique déjà enregistré
+        lors d'une exécution précédente est ré-émis uniquement si une nouvelle source s'y ajoute.
+        """
+        emitted = {}
+
+        for item in items:
+            source = _source_of(item)
+            signature = minhash(item.get('content', ''))
+            item_key = item.get('external_id') or f"sha:{_hash64(item.get('content', ''))}"
+
+            if signature is None:
+                emitted.setdefault(item_key, dict(item, sources=[source]))
+                continue
+
+            match = self.find(signature)
+            if match is None:
+                row = dict(item, sources=[source])
+                self.add(item_key, signature, row)
+                emitted[item_key] = row
+                continue
+
+            canonical_key, stored_row = match
+            if canonical_key == item_key:
+                # Même article relu (mis à jour) : le contenu reçu remplace la version enregistrée,
+                # sources conservées, signature recalculée
+                sources = emitted.get(item_key, stored_row)['sources']
+                if not any(s.get('external_id') == source['external_id'] for s in sources):
+                    sources.append(source)
+                row = dict(item, sources=sources)
+                self.add(item_key, signature, row)
+                emitted[item_key] = row
+                continue
+
+            row = emitted.get(canonical_key, stored_row)
+            self.collapsed += 1
+            if any(s.get('external_id') == source['external_id'] for s in row['sources']):
+                continue
+
+            row['sources'].append(source)
+            self.update_row(canonical_key, row)
+            emitted[canonical_key] = row
+
+        return list(emitted.values())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,192 @@
+"""
+Lynx Eye Streaming Pipeline
+Collecte en flux continu : sources -> étapes (filtre, dédoublonnage) -> sink groupé.
+- chaque source est un générateur exécuté dans son propre thread
+- files bornées entre les étapes : une source rapide est freinée (backpressure)
+  au lieu d'accumuler toute l'exécution en mémoire
+- le sink (BatchWriter) est vidé dès qu'un chunk est plein ou après
+  `flush_interval` secondes d'inactivité : les items sont stockés peu après leur collecte
+"""
+
+import queue
+import threading
+import time
+
+import metrics
+
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+_DONE = object()
+
+
+def filter_stage(predicate):
+    """Étape qui ne laisse passer que les items validant le prédicat"""
+    def stage(item):
+        return (item,) if predicate(item) else ()
+    return stage
+
+
+def collection_stages(seen_index, dedup_index):
+    """Étapes standard : items déjà envoyés écartés, puis quasi-doublons regroupés"""
+    return [
+        ('filter', filter_stage(seen_index.is_new)),
+        ('dedupe', lambda item: dedup_index.collapse([item])),
+    ]
+
+
+class YieldTracker:
+    """
+    Attribue les lignes effectivement écrites à la source (flux, requête) qui les a produites.
+    Les sources appellent le callback avec leurs items ; le sink appelle saved() avec les lignes écrites.
+    """
+
+    def __init__(self):
+        self._origins = {}
+        self.outcomes = {}
+
+    def callback(self, prefix):
+        """
+        Callback (source, items, erreur, cached=False) pour une famille de sources ('rss', 'web'...) ;
+        cached : résultats servis par le cache de requêtes (déjà vus, sans valeur pour le rendement)
+        """
+        def record(source, items, error, cached=False):
+            key = f"{prefix}:{source}"
+            self.outcomes[key] = {'new': 0, 'failed': error is not None, 'cached': cached}
+            for item in items:
+                if item.get('external_id'):
+                    self._origins[item['external_id']] = key
+        return record
+
+    def saved(self, rows):
+        for row in rows:
+            key = self._origins.pop(row.get('external_id'), None)
+            if key in self.outcomes:
+                self.outcomes[key]['new'] += 1
+
+    def outcome(self, key):
+        """{'new', 'failed', 'cached'} ; une source sans compte rendu est considérée en échec"""
+        return self.outcomes.get(key, {'new': 0, 'failed': True, 'cached': False})
+
+    def reset(self):
+        self._origins.clear()
+        self.outcomes = {}
+
+
+class Pipeline:
+    """Pipeline borné sources -> étapes -> sink"""
+
+    def __init__(self, sources, stages, sink, queue_size=DEFAULT_QUEUE_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL):
+        """
+        sources : dict nom -> callable retournant un itérable d'items
+        stages  : liste de (nom, callable(item) -> itérable d'items)
+        sink    : objet exposant add(item), flush() et __len__ (ex. BatchWriter)
+        """
+        self.sources = sources
+        self.stages = stages
+        self.sink = sink
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+
+        self.produced = {name: 0 for name in sources}
+        self.stage_counts = {name: {'in': 0, 'out': 0} for name, _ in stages}
+        self.errors = {}
+        self.elapsed = 0.0
+
+    def _record_error(self, where, error):
+        self.errors[where] = self.errors.get(where, 0) + 1
+        metrics.current().error('pipeline', where)
+        print(f"  ✗ Erreur pipeline ({where}): {error}")
+
+    def _run_source(self, name, factory, raw):
+        try:
+            for item in factory():
+                self.produced[name] += 1
+                raw.put(item)
+        except Exception as e:
+            self._record_error(name, e)
+        finally:
+            raw.put(_DONE)
+
+    def _apply_stages(self, item, run_metrics):
+        items = [item]
+        for name, stage in self.stages:
+            counts = self.stage_counts[name]
+            next_items = []
+            started = time.perf_counter()
+            for current in items:
+                counts['in'] += 1
+                try:
+                    next_items.extend(stage(current))
+                except Exception as e:
+                    self._record_error(name, e)
+            run_metrics.add_stage_time(name, time.perf_counter() - started)
+            run_metrics.count_items(name, len(items), len(next_items))
+            counts['out'] += len(next_items)
+            items = next_items
+            if not items:
+                break
+        return items
+
+    def _run_stages(self, raw, ready):
+        run_metrics = metrics.current()
+        remaining = len(self.sources)
+        while remaining:
+            item = raw.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            for output in self._apply_stages(item, run_metrics):
+                ready.put(output)
+        ready.put(_DONE)
+
+    def print_summary(self, result):
+        for name, count in self.produced.items():
+            print(f"   • {name}: {count} items collectés")
+        for name, counts in self.stage_counts.items():
+            print(f"   • étape {name}: {counts['in']} → {counts['out']}")
+        print(f"✅ {result.saved} items sauvegardés ({result.failed} échecs, "
+              f"{result.duplicates} doublons) en {self.elapsed:.1f}s")
+        if result.pending:
+            print(f"⏸️  {result.pending} items en attente dans le spool (rejoués à la prochaine exécution)")
+
+    def run(self):
+        """Exécute le pipeline jusqu'à épuisement des sources ; retourne le bilan du sink"""
+        started = time.monotonic()
+        raw = queue.Queue(maxsize=self.queue_size)
+        ready = queue.Queue(maxsize=self.queue_size)
+
+        threads = [
+            threading.Thread(target=self._run_source, args=(name, factory, raw),
+                             name=f"source-{name}", daemon=True)
+            for name, factory in self.sources.items()
+        ]
+        threads.append(threading.Thread(target=self._run_stages, args=(raw, ready),
+                                        name='stages', daemon=True))
+        for thread in threads:
+            thread.start()
+
+        # Le sink tourne dans le thread appelant
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = ready.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            if item is _DONE:
+                break
+            if item is not None:
+                self.sink.add(item)
+
+            now = time.monotonic()
+            if now - last_flush >= self.flush_interval:
+                if len(self.sink):
+                    self.sink.flush()
+                last_flush = now
+
+        result = self.sink.flush()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.monotonic() - started
+        return result
@@ -0,0 +1,185 @@
+"""
+Lynx Eye Query Cache
+Cache persistant (SQLite) des résultats de recherche web / YouTube :
+- clé (backend, requête normalisée, limite)
+- TTL configurable par backend
+- taille bornée avec éviction LRU
+- mode stale-while-revalidate : une entrée expirée mais récente est servie
+  immédiatement et rafraîchie en arrière-plan
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from matcher import normalize
+from state import state_path
+
+DEFAULT_TTLS = {
+    'ddg': 6 * 3600,
+    'youtube': 12 * 3600,
+}
+DEFAULT_TTL = 6 * 3600
+DEFAULT_STALE_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def normalize_query(query):
+    """Requête en minuscules, sans accents ni espaces superflus"""
+    return ' '.join(normalize(query).split())
+
+
+class QueryCache:
+    """Cache TTL + LRU des résultats de recherche"""
+
+    def __init__(self, path=None, ttls=None, default_ttl=DEFAULT_TTL, stale_ttl=DEFAULT_STALE_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES, stale_while_revalidate=True, clock=time.time):
+        self.path = path or state_path('query_cache.sqlite3')
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.stale_while_revalidate = stale_while_revalidate
+        self._clock = clock
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._revalidator = None
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(
+            'CREATE TABLE IF NOT EXISTS query_results ('
+            ' backend TEXT NOT NULL,'
+            ' query TEXT NOT NULL,'
+            ' max_results INTEGER NOT NULL,'
+            ' results_json TEXT NOT NULL,'
+            ' fetched_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL,'
+            ' PRIMARY KEY (backend, query, max_results));'
+            'CREATE INDEX IF NOT EXISTS idx_query_results_accessed ON query_results (accessed_at);'
+        )
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def ttl_for(self, backend):
+        return self.ttls.get(backend, self.default_ttl)
+
+    def get(self, backend, query, max_results):
+        """Retourne (résultats, 'fresh' | 'stale') ou None si absent / trop ancien"""
+        key = (backend, normalize_query(query), max_results)
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT results_json, fetched_at FROM query_results '
+                'WHERE backend = ? AND query = ? AND max_results = ?', key
+            ).fetchone()
+            if not row:
+                return None
+
+            age = now - row[1]
+            ttl = self.ttl_for(backend)
+            if age <= ttl:
+                state = 'fresh'
+            elif self.stale_while_revalidate and age <= ttl + self.stale_ttl:
+                state = 'stale'
+            else:
+                return None
+
+            self._conn.execute(
+                'UPDATE query_results SET accessed_at = ? '
+                'WHERE backend = ? AND query = ? AND max_results = ?', (now,) + key
+            )
+            self._conn.commit()
+            return json.loads(row[0]), state
+
+    def put(self, backend, query, max_results, results):
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO query_results '
+                '(backend, query, max_results, results_json, fetched_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (backend, normalize_query(query), max_results,
+                 json.dumps(results, ensure_ascii=False, default=str), now, now)
+            )
+            self._evict_lru()
+            self._conn.commit()
+
+    def _evict_lru(self):
+        count = self._conn.execute('SELECT COUNT(*) FROM query_results').fetchone()[0]
+        if count <= self.max_entries:
+            return
+        # Marge de 10 % pour ne pas évincer à chaque insertion
+        excess = count - int(self.max_entries * 0.9)
+        self._conn.execute(
+            'DELETE FROM query_results WHERE rowid IN '
+            '(SELECT rowid FROM query_results ORDER BY accessed_at LIMIT ?)', (excess,)
+        )
+
+    def revalidate(self, backend, query, max_results, fetch):
+        """Rafraîchit une entrée en arrière-plan (une seule fois par clé)"""
+        key = (backend, normalize_query(query), max_results)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+            if self._revalidator is None:
+                self._revalidator = ThreadPoolExecutor(max_workers=2)
+            revalidator = self._revalidator
+
+        def refresh():
+            try:
+                self.put(backend, query, max_results, fetch())
+            except Exception as e:
+                print(f"  ✗ Rafraîchissement du cache échoué pour '{query}': {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        revalidator.submit(refresh)
+
+    def get_or_fetch(self, backend, query, max_results, fetch):
+        """
+        Retourne (résultats, statut) avec statut 'hit', 'stale' ou 'miss'.
+        `fetch()` n'est appelé (de façon synchrone) qu'en cas d'absence.
+        """
+        cached = self.get(backend, query, max_results)
+        if cached is not None:
+            results, state = cached
+            if state == 'fresh':
+                self.hits += 1
+                return results, 'hit'
+            self.stale_hits += 1
+            self.revalidate(backend, query, max_results, fetch)
+            return results, 'stale'
+
+        self.misses += 1
+        results = fetch()
+        self.put(backend, query, max_results, results)
+        return results, 'miss'
+
+    def stats(self):
+        return {'hits': self.hits, 'stale_hits': self.stale_hits, 'misses': self.misses}
+
+    def drain(self):
+        """Attend la fin des rafraîchissements en arrière-plan"""
+        with self._lock:
+            revalidator, self._revalidator = self._revalidator, None
+        if revalidator is not None:
+            revalidator.shutdown(wait=True)
+
+    def close(self):
+        self.drain()
+        with self._lock:
+            self._conn.close()
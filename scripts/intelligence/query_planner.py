@@ -0,0 +1,185 @@
+"""
+Lynx Eye Query Planner
+Répartition du budget de requêtes selon leur rendement (remplace le tirage aléatoire) :
+- chaque combinaison mot-clé / modificateur / ville est un « bras » dont on
+  enregistre le nombre de requêtes et d'items nouveaux effectivement sauvegardés
+- sélection par échantillonnage de Thompson (modèle Gamma-Poisson) : les bras
+  productifs sont exploités, les bras peu essayés gardent une chance d'être explorés
+- un bras jamais essayé hérite du rendement moyen de son mot-clé
+- les statistiques s'érodent à chaque exécution pour suivre l'actualité
+- historique des exécutions : items nouveaux par requête au fil du temps
+"""
+
+import random
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from state import state_path
+
+# Poids (en requêtes virtuelles) de l'a priori hérité du mot-clé
+PRIOR_STRENGTH = 1.0
+# Rendement supposé d'un mot-clé jamais essayé (optimiste : favorise l'exploration)
+OPTIMISTIC_PRIOR = 1.0
+# Facteur d'oubli appliqué aux statistiques à chaque fin d'exécution
+DECAY = 0.95
+# Nombre maximal de requêtes par mot-clé dans un même plan
+MAX_PER_KEYWORD = 2
+# Part du budget réservée aux mots-clés prioritaires
+PRIORITY_SHARE = 0.3
+
+QueryArm = namedtuple('QueryArm', ['query', 'keyword', 'modifier', 'city'])
+
+
+def build_arms(keywords, modifiers, cities):
+    """Toutes les combinaisons mot-clé, mot-clé + modificateur, mot-clé + ville"""
+    arms = []
+    for keyword in dict.fromkeys(keywords):
+        arms.append(QueryArm(keyword, keyword, None, None))
+        for modifier in modifiers:
+            arms.append(QueryArm(f"{keyword} {modifier}", keyword, modifier, None))
+        for city in cities:
+            if city not in keyword:
+                arms.append(QueryArm(f"{keyword} {city}", keyword, None, city))
+    return arms
+
+
+class QueryPlanner:
+    """Bandit persistant (SQLite) sur les combinaisons de requêtes"""
+
+    def __init__(self, arms, priority_keywords=(), path=None, rng=None):
+        self.arms = list(arms)
+        self._keywords = {arm.query: arm.keyword for arm in self.arms}
+        self.priority_keywords = set(priority_keywords)
+        self.path = path or state_path('query_planner.sqlite3')
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._run_totals = {}
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(
+            'CREATE TABLE IF NOT EXISTS query_stats ('
+            ' engine TEXT NOT NULL,'
+            ' query TEXT NOT NULL,'
+            ' keyword TEXT NOT NULL,'
+            ' pulls REAL NOT NULL DEFAULT 0,'
+            ' new_items REAL NOT NULL DEFAULT 0,'
+            ' last_pulled REAL,'
+            ' PRIMARY KEY (engine, query));'
+            'CREATE TABLE IF NOT EXISTS planner_runs ('
+            ' engine TEXT NOT NULL,'
+            ' run_at REAL NOT NULL,'
+            ' queries INTEGER NOT NULL,'
+            ' new_items INTEGER NOT NULL);'
+        )
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _stats(self, engine):
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT query, keyword, pulls, new_items FROM query_stats WHERE engine = ?', (engine,)
+            ).fetchall()
+        return {query: (keyword, pulls, new_items) for query, keyword, pulls, new_items in rows}
+
+    def _samples(self, engine):
+        """Tirage de Thompson : rendement échantillonné pour chaque bras"""
+        stats = self._stats(engine)
+        total_pulls = sum(pulls for _, pulls, _ in stats.values())
+        total_new = sum(new for _, _, new in stats.values())
+        global_mean = (total_new + OPTIMISTIC_PRIOR * PRIOR_STRENGTH) / (total_pulls + PRIOR_STRENGTH)
+
+        by_keyword = {}
+        for keyword, pulls, new in stats.values():
+            keyword_pulls, keyword_new = by_keyword.get(keyword, (0.0, 0.0))
+            by_keyword[keyword] = (keyword_pulls + pulls, keyword_new + new)
+
+        samples = []
+        for arm in self.arms:
+            keyword_pulls, keyword_new = by_keyword.get(arm.keyword, (0.0, 0.0))
+            prior_mean = (keyword_new + global_mean * PRIOR_STRENGTH) / (keyword_pulls + PRIOR_STRENGTH)
+            _, pulls, new = stats.get(arm.query, (arm.keyword, 0.0, 0.0))
+            shape = max(prior_mean * PRIOR_STRENGTH + new, 0.01)
+            rate = PRIOR_STRENGTH + pulls
+            samples.append((self._rng.gammavariate(shape, 1 / rate), arm))
+        samples.sort(key=lambda sample: sample[0], reverse=True)
+        return samples
+
+    def plan(self, budget, engine='ddg'):
+        """Sélectionne `budget` requêtes (une part réservée aux mots-clés prioritaires)"""
+        if budget <= 0 or not self.arms:
+            return []
+        samples = self._samples(engine)
+        per_keyword = {}
+        chosen = []
+
+        def take(candidates, limit):
+            for _, arm in candidates:
+                if len(chosen) >= limit:
+                    return
+                if arm.query in chosen or per_keyword.get(arm.keyword, 0) >= MAX_PER_KEYWORD:
+                    continue
+                per_keyword[arm.keyword] = per_keyword.get(arm.keyword, 0) + 1
+                chosen.append(arm.query)
+
+        if self.priority_keywords:
+            reserved = max(1, round(budget * PRIORITY_SHARE))
+            take([s for s in samples if s[1].keyword in self.priority_keywords], min(budget, reserved))
+        take(samples, budget)
+        return chosen
+
+    def record(self, query, new_items, engine='ddg'):
+        """Enregistre le rendement d'une requête exécutée"""
+        keyword = self._keywords.get(query, query)
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO query_stats (engine, query, keyword, pulls, new_items, last_pulled)'
+                ' VALUES (?, ?, ?, 1, ?, ?)'
+                ' ON CONFLICT (engine, query) DO UPDATE SET'
+                ' pulls = pulls + 1, new_items = new_items + excluded.new_items,'
+                ' last_pulled = excluded.last_pulled',
+                (engine, query, keyword, new_items, time.time())
+            )
+            self._conn.commit()
+            queries, total = self._run_totals.get(engine, (0, 0))
+            self._run_totals[engine] = (queries + 1, total + new_items)
+
+    def finish_run(self, engine='ddg', decay=True):
+        """
+        Clôt l'exécution : historique du rendement puis érosion des statistiques
+        (decay=False quand plusieurs workers partagent le planificateur : un seul l'applique)
+        """
+        with self._lock:
+            queries, total = self._run_totals.pop(engine, (0, 0))
+            if not queries:
+                return None
+            self._conn.execute(
+                'INSERT INTO planner_runs (engine, run_at, queries, new_items) VALUES (?, ?, ?, ?)',
+                (engine, time.time(), queries, total)
+            )
+            if decay:
+                self._conn.execute(
+                    'UPDATE query_stats SET pulls = pulls * ?, new_items = new_items * ? WHERE engine = ?',
+                    (DECAY, DECAY, engine)
+                )
+            self._conn.commit()
+        return total / queries
+
+    def history(self, engine='ddg', limit=10):
+        """Rendement (items nouveaux par requête) des dernières exécutions, du plus ancien au plus récent"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT run_at, queries, new_items FROM planner_runs WHERE engine = ?'
+                ' ORDER BY run_at DESC LIMIT ?', (engine, limit)
+            ).fetchall()
+        return [(run_at, new_items / queries if queries else 0.0) for run_at, queries, new_items in reversed(rows)]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,47 @@
+"""
+Lynx Eye Relevance Scorer
+Score de pertinence calculé en une seule passe de l'automate sur la taxonomie :
+- nombre d'occurrences par catégorie (politique, securite, economie...)
+- score pondéré : chaque terme distinct apporte son poids, ses répétitions
+  une fraction décroissante (au plus deux fois le poids du terme)
+Le résultat est attaché à la ligne sauvegardée (relevance_score, keyword_hits,
+matched_keywords) pour que les traitements en aval puissent trier sans relire le texte.
+"""
+
+from collections import namedtuple
+
+from matcher import KeywordMatcher
+
+Relevance = namedtuple('Relevance', ['score', 'category_hits', 'keywords'])
+
+# Part du poids ajoutée par chaque répétition : 1, 1/2, 1/4...
+REPEAT_DECAY = 0.5
+
+
+class RelevanceScorer:
+    """Scorer construit à partir d'une liste de KeywordTerm (term, category, weight)"""
+
+    def __init__(self, terms):
+        terms = list(terms)
+        self._terms = {}
+        for term in terms:
+            self._terms.setdefault(term.term, term)
+        self.matcher = KeywordMatcher(term.term for term in terms)
+
+    def score(self, text):
+        """Relevance du texte ; keywords vide si aucun terme n'est trouvé"""
+        category_hits = {}
+        score = 0.0
+        counts = self.matcher.counts(text)
+        for keyword, occurrences in counts.items():
+            term = self._terms[keyword]
+            category_hits[term.category] = category_hits.get(term.category, 0) + occurrences
+            score += term.weight * (1 - REPEAT_DECAY ** occurrences) / (1 - REPEAT_DECAY)
+        return Relevance(round(score, 2), category_hits, list(counts))
+
+    def annotate(self, item, relevance):
+        """Ajoute le score et les compteurs par catégorie à une ligne"""
+        item['relevance_score'] = relevance.score
+        item['keyword_hits'] = relevance.category_hits
+        item['matched_keywords'] = relevance.keywords
+        return item
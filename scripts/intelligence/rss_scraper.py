@@ -2,89 +2,311 @@
 RSS Feed Scraper for Lynx Eye
 Scrape directement les flux RSS des médias gabonais
 Plus rapide et plus fiable que DuckDuckGo pour les sources connues
+Les médias sans flux RSS sont lus sur leurs pages de rubrique (html_scraper.py)
 """
 
-import os
 import sys
-import feedparser
+import time
 from datetime import datetime
-from dotenv import load_dotenv
-from supabase import create_client
 
 try:
-    from sources import get_all_rss_feeds, PRESS_URLS, get_all_hashtags_flat
-    from keywords import PRIORITY_KEYWORDS
-except ImportError:
-    print("⚠️  Modules sources.py ou keywords.py non trouvés")
+    from sources import get_all_rss_feeds, PRESS_URLS, get_all_hashtags_flat, HTML_SELECTORS, DEFAULT_HTML_SELECTORS
+    from keywords import get_keyword_terms
+    from relevance import RelevanceScorer
+    from feed_fetcher import FeedFetcher
+    from health import CircuitOpenError, HealthRegistry
+    from feed_cursors import FeedCursors
+    from feed_parser import FeedScan, configured_parser, iter_entries
+    from html_scraper import HtmlListing, iter_listings
+    from supabase_writer import BatchWriter, configured_chunk_size
+    from spool import WriteSpool
+    from archive import ArchiveWriter
+    from term_index import TermIndex
+    from seen_index import SeenIndex
+    from near_dup import NearDuplicateIndex
+    from pipeline import Pipeline, collection_stages
+    from clients import supabase_client
+    from settings import ConfigError
+    import metrics
+except ImportError as e:
+    print(f"⚠️  Modules locaux du scraper non trouvés ({e})")
     sys.exit(1)
 
-load_dotenv()
+# Automate de la taxonomie compilé une seule fois pour tous les flux
+SCORER = RelevanceScorer(get_keyword_terms())
 
-# Configuration Supabase
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+# Entrées écartées transmises à on_rejected par lots de cette taille
+REJECTED_BATCH = 500
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    print("❌ Erreur: Variables SUPABASE requises dans .env")
-    sys.exit(1)
+def entry_item(entry, source_name, rejected=None):
+    """
+    Ligne intelligence_items d'une entrée (flux RSS ou page HTML),
+    ou None si aucun mot-clé de la taxonomie n'y figure
+    rejected : liste recevant les lignes écartées (index des termes, backfill)
+    """
+    # Filtrer et scorer par la taxonomie (prioritaires inclus), en une seule passe
+    content = f"{entry.get('title', '')} {entry.get('summary', '')}"
+    relevance = SCORER.score(content)
+    item = {
+        'content': f"{entry.get('title', '')} - {entry.get('summary', '')}",
+        'author': source_name,
+        'external_id': entry.get('link') or entry.get('id', ''),
+        'published_at': entry.get('published') or datetime.now().isoformat()
+    }
+    if not relevance.keywords:
+        if rejected is not None:
+            rejected.append(item)
+        return None
+    return SCORER.annotate(item, relevance)
+
+def parse_feed_entries(feed_content, source_name, scan=None, on_rejected=None):
+    """
+    Extrait les articles pertinents d'un flux RSS déjà téléchargé.
+    Avec un curseur (scan), seules les entrées nouvelles sont lues :
+    la lecture s'arrête à la première entrée déjà vue.
+    on_rejected : callback(lignes) recevant les entrées sans mot-clé
+    """
+    if configured_parser() == 'feedparser':
+        import feedparser
+        feed_entries = feedparser.parse(feed_content).entries
+    else:
+        # Entrées lues une à une : le parseur s'arrête avec le curseur, à la première déjà vue
+        feed_entries = iter_entries(feed_content)
+    return select_entries(feed_entries, source_name, scan, on_rejected)
+
+class EntrySelection:
+    """
+    Sélection des articles pertinents entrée par entrée (consommateur de FeedScan) :
+    seuls les articles retenus sont gardés, les entrées écartées partent par lots
+    vers on_rejected
+    """
+
+    def __init__(self, source_name, on_rejected=None):
+        self.source_name = source_name
+        self.on_rejected = on_rejected
+        self.results = []
+        self.rejected = [] if on_rejected else None
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    def __call__(self, entry):
+        item = entry_item(entry, self.source_name, self.rejected)
+        if item:
+            self.results.append(item)
+        elif self.rejected is not None and len(self.rejected) >= REJECTED_BATCH:
+            self._flush()
 
-def scrape_rss_feed(feed_url, source_name):
-    """Scrape un flux RSS spécifique"""
-    results = []
+    def _flush(self):
+        if self.rejected:
+            self.on_rejected(self.rejected)
+            self.rejected = []
+
+    def finish(self):
+        """Articles retenus ; envoie les dernières entrées écartées"""
+        self._flush()
+        return self.results
+
+def select_entries(feed_entries, source_name, scan=None, on_rejected=None):
+    """Articles pertinents parmi des entrées déjà parsées (nouvelles uniquement avec un curseur)"""
+    selection = EntrySelection(source_name, on_rejected)
+    entries = scan.new_entries(feed_entries) if scan is not None else feed_entries
+    
+    for entry in entries:
+        selection(entry)
+    return selection.finish()
+
+def scrape_rss_feed(feed_url, source_name, fetcher=None, cursors=None):
+    """Scrape un flux RSS spécifique (nouvelles entrées uniquement)"""
+    owns_fetcher = fetcher is None
+    fetcher = fetcher or FeedFetcher()
+    owns_cursors = cursors is None
+    cursors = cursors or FeedCursors()
     
     try:
-        feed = feedparser.parse(feed_url)
-        
-        for entry in feed.entries[:10]:  # Limiter aux 10 derniers articles
-            # Filtrer par mots-clés prioritaires
-            content = f"{entry.get('title', '')} {entry.get('summary', '')}".lower()
-            
-            # Vérifier si au moins un mot-clé prioritaire est présent
-            if any(kw.lower() in content for kw in PRIORITY_KEYWORDS):
-                results.append({
-                    'content': f"{entry.get('title', '')} - {entry.get('summary', '')}",
-                    'author': source_name,
-                    'external_id': entry.get('link', entry.get('id', '')),
-                    'published_at': entry.get('published', datetime.now().isoformat())
-                })
+        response = fetcher.fetch(feed_url)
+        if response.error:
+            raise response.error
+        if response.status == 304:
+            return []
         
+        scan = cursors.scan(feed_url)
+        results = parse_feed_entries(response.content, source_name, scan)
+        fetcher.commit(response)
+        cursors.commit(feed_url, scan)
         return results
         
     except Exception as e:
         print(f"  ✗ Erreur RSS pour {source_name}: {e}")
         return []
+    finally:
+        if owns_fetcher:
+            fetcher.close()
+        if owns_cursors:
+            cursors.save()
 
-def scrape_all_rss_feeds():
-    """Scrape tous les flux RSS configurés"""
-    all_results = []
-    
-    print("📰 Scraping des flux RSS...")
-    
+def rss_feeds():
+    """Flux RSS configurés : URL -> nom de la source"""
+    feeds = {}
     for category, sources in PRESS_URLS.items():
-        print(f"\n  [{category.upper()}]")
-        
         for source_name, feed_url in sources.items():
             if '/feed/' in feed_url or '/rss' in feed_url:
-                results = scrape_rss_feed(feed_url, f"{source_name} ({category})")
-                all_results.extend(results)
-                print(f"    ✓ {source_name}: {len(results)} articles")
+                feeds[feed_url] = f"{source_name} ({category})"
+    return feeds
+
+def iter_rss_items(fetcher=None, cursors=None, feeds=None, on_feed=None, on_rejected=None):
+    """
+    Génère les articles pertinents au fil des flux téléchargés (en parallèle).
+    feeds       : sous-ensemble URL -> nom (par défaut tous les flux configurés)
+    on_feed     : callback(url, articles, erreur) appelé après chaque flux
+    on_rejected : callback(lignes) recevant les entrées sans mot-clé de chaque flux
+    """
+    print("📰 Scraping des flux RSS...")
+    
+    feeds = feeds if feeds is not None else rss_feeds()
     
-    return all_results
+    owns_fetcher = fetcher is None
+    fetcher = fetcher or FeedFetcher()
+    owns_cursors = cursors is None
+    cursors = cursors or FeedCursors()
+    run_metrics = metrics.current()
+    scans = {url: cursors.scan(url) for url in feeds}
+    # Flux parsés et filtrés pendant le téléchargement, interrompu à la première entrée déjà vue :
+    # seuls les articles retenus restent en mémoire
+    selections = {url: EntrySelection(feeds[url], on_rejected) for url in feeds}
+    sinks = None
+    if configured_parser() != 'feedparser':
+        sinks = {url: FeedScan(scans[url], on_entry=selections[url]) for url in feeds}
+    
+    try:
+        for response in fetcher.fetch_all(feeds, sinks=sinks):
+            source_name = feeds[response.url]
+            
+            if isinstance(response.error, CircuitOpenError):
+                print(f"    ⏸️  {source_name}: ignoré ({response.error})")
+                if on_feed:
+                    on_feed(response.url, [], response.error)
+                continue
+            if response.error:
+                print(f"    ✗ Erreur RSS pour {source_name}: {response.error} ({response.elapsed:.1f}s)")
+                if on_feed:
+                    on_feed(response.url, [], response.error)
+                continue
+            if response.status == 304:
+                print(f"    = {source_name}: inchangé (304, {response.elapsed:.1f}s)")
+                if on_feed:
+                    on_feed(response.url, [], None)
+                continue
+            
+            scan = scans[response.url]
+            started = time.perf_counter()
+            try:
+                if sinks is None:
+                    results = parse_feed_entries(response.content, source_name, scan, on_rejected)
+                else:
+                    sinks[response.url].finish()
+                    results = selections[response.url].finish()
+            except Exception as e:
+                run_metrics.error('parse', response.url)
+                print(f"    ✗ Erreur RSS pour {source_name}: {e}")
+                if on_feed:
+                    on_feed(response.url, [], e)
+                continue
+            finally:
+                run_metrics.add_stage_time('parse', time.perf_counter() - started)
+            run_metrics.count_items('parse', scan.scanned, len(results))
+            
+            fetcher.commit(response)
+            cursors.commit(response.url, scan)
+            print(f"    ✓ {source_name}: {scan.scanned} nouvelles entrées, {len(results)} articles retenus "
+                  f"({response.elapsed:.1f}s)")
+            if on_feed:
+                on_feed(response.url, results, None)
+            yield from results
+    finally:
+        # Corps conservés des flux en erreur
+        for sink in (sinks or {}).values():
+            sink.close()
+        if owns_fetcher:
+            fetcher.close()
+        if owns_cursors:
+            cursors.save()
+
+def html_listings():
+    """Pages de rubrique des médias sans flux RSS : URL -> HtmlListing(nom, sélecteurs)"""
+    listings = {}
+    for category, sources in PRESS_URLS.items():
+        for source_name, page_url in sources.items():
+            if '/feed/' not in page_url and '/rss' not in page_url:
+                selectors = HTML_SELECTORS.get(source_name, DEFAULT_HTML_SELECTORS)
+                listings[page_url] = HtmlListing(f"{source_name} ({category})", selectors)
+    return listings
 
-def save_to_supabase(items):
-    """Save items to Supabase intelligence_items table"""
-    saved_count = 0
+def iter_html_items(fetcher=None, listings=None, on_page=None, on_rejected=None):
+    """
+    Génère les articles pertinents des pages de rubrique (téléchargées en parallèle,
+    parsées au fil de la réception). Les articles déjà envoyés sont écartés en aval
+    par l'index local, comme pour les flux RSS.
+    listings    : sous-ensemble URL -> HtmlListing (par défaut toutes les pages configurées)
+    on_page     : callback(url, articles, erreur) appelé après chaque page
+    on_rejected : callback(lignes) recevant les articles sans mot-clé de chaque page
+    """
+    print("🌐 Scraping des pages sans flux RSS...")
     
-    for item in items:
-        try:
-            supabase.table('intelligence_items').upsert(item, on_conflict='external_id').execute()
-            saved_count += 1
-        except Exception as e:
-            print(f"  ✗ Erreur sauvegarde: {e}")
+    listings = listings if listings is not None else html_listings()
     
-    return saved_count
+    owns_fetcher = fetcher is None
+    fetcher = fetcher or FeedFetcher()
+    run_metrics = metrics.current()
+    
+    try:
+        for response, entries in iter_listings(fetcher, listings):
+            source_name = listings[response.url].name
+            
+            if isinstance(response.error, CircuitOpenError):
+                print(f"    ⏸️  {source_name}: ignoré ({response.error})")
+                if on_page:
+                    on_page(response.url, [], response.error)
+                continue
+            if response.error:
+                print(f"    ✗ Erreur HTML pour {source_name}: {response.error} ({response.elapsed:.1f}s)")
+                if on_page:
+                    on_page(response.url, [], response.error)
+                continue
+            if entries is None:
+                print(f"    = {source_name}: inchangé (304, {response.elapsed:.1f}s)")
+                if on_page:
+                    on_page(response.url, [], None)
+                continue
+            
+            started = time.perf_counter()
+            rejected = [] if on_rejected else None
+            results = [item for item in (entry_item(entry, source_name, rejected) for entry in entries) if item]
+            if rejected:
+                on_rejected(rejected)
+            run_metrics.add_stage_time('parse', time.perf_counter() - started)
+            run_metrics.count_items('parse', len(entries), len(results))
+            if not entries:
+                # Sélecteurs à revoir : la page ne correspond plus à la configuration
+                run_metrics.error('parse', response.url)
+            
+            fetcher.commit(response)
+            print(f"    ✓ {source_name}: {len(entries)} titres, {len(results)} articles retenus "
+                  f"({response.elapsed:.1f}s)")
+            if on_page:
+                on_page(response.url, results, None)
+            yield from results
+    finally:
+        if owns_fetcher:
+            fetcher.close()
+
+def scrape_all_rss_feeds(fetcher=None, cursors=None):
+    """Scrape tous les flux RSS configurés (en parallèle, nouvelles entrées uniquement)"""
+    return list(iter_rss_items(fetcher, cursors))
+
+def save_to_supabase(items, on_saved=None):
+    """Save items to Supabase intelligence_items table (upserts groupés par chunks)"""
+    with WriteSpool() as spool:
+        writer = BatchWriter(supabase_client(), chunk_size=configured_chunk_size(), on_saved=on_saved, spool=spool)
+        writer.extend(items)
+        return writer.close()
 
 def main():
     print("=" * 70)
@@ -93,18 +315,53 @@ def main():
     print(f"⏰ Exécution: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
-    # Scraping RSS
-    rss_results = scrape_all_rss_feeds()
-    print(f"\n✓ RSS: {len(rss_results)} items collectés")
-    print()
+    try:
+        supabase = supabase_client()
+    except ConfigError as e:
+        print(f"❌ Erreur: {e}")
+        sys.exit(1)
     
-    # Sauvegarde
-    if rss_results:
-        print(f"💾 Enregistrement dans Supabase...")
-        saved = save_to_supabase(rss_results)
-        print(f"✅ {saved}/{len(rss_results)} items sauvegardés avec succès")
-    else:
-        print("⚠️  Aucun résultat à sauvegarder")
+    run_metrics = metrics.start_run('rss')
+    
+    # Collecte en flux : flux RSS et pages HTML -> items déjà envoyés écartés ->
+    # quasi-doublons regroupés -> spool local -> upserts groupés au fil de l'eau
+    # (un seul fetcher : pool de connexions, cache des validateurs et disjoncteurs partagés)
+    health = HealthRegistry()
+    fetcher = FeedFetcher(health=health)
+    with SeenIndex() as seen_index, NearDuplicateIndex() as dedup_index, WriteSpool() as spool, \
+            ArchiveWriter() as archive, TermIndex() as term_index:
+        # Taxonomie de référence des futurs backfills (backfill.py)
+        term_index.ensure_keywords(SCORER.matcher.keywords)
+        
+        def on_saved(rows):
+            seen_index.mark_items(rows)
+            archive.add_rows(rows)
+            term_index.add_saved(rows)
+        
+        writer = BatchWriter(supabase, chunk_size=configured_chunk_size(), on_saved=on_saved, spool=spool)
+        pipeline = Pipeline(
+            sources={
+                'rss': lambda: iter_rss_items(fetcher, on_rejected=term_index.add_rejected),
+                'html': lambda: iter_html_items(fetcher, on_rejected=term_index.add_rejected),
+            },
+            stages=collection_stages(seen_index, dedup_index),
+            sink=writer
+        )
+        pipeline.run()
+        result = writer.close()
+        
+        print()
+        print("📊 Bilan de la collecte:")
+        pipeline.print_summary(result)
+        print(f"🔁 Index local: {seen_index.hits} déjà connus, {seen_index.misses} nouveaux")
+        print(f"🧬 Quasi-doublons regroupés: {dedup_index.collapsed}")
+        health.print_summary()
+    fetcher.close()
+    health.close()
+    
+    run_metrics.print_summary()
+    for path in run_metrics.export():
+        print(f"📈 Métriques écrites dans {path}")
     
     print()
     print("=" * 70)
@@ -0,0 +1,141 @@
+"""
+Lynx Eye Adaptive Scheduler
+Planification par source (flux RSS, requête web, requête YouTube) :
+- chaque source a son propre intervalle de collecte
+- l'intervalle raccourcit quand la source produit des items nouveaux,
+  s'allonge quand elle est muette, et double à chaque échec (backoff)
+- état persistant (JSON) : un redémarrage reprend les intervalles appris
+"""
+
+import json
+import os
+import random
+import threading
+import time
+
+from state import state_path
+
+SPEEDUP = 0.5        # facteur appliqué quand la source a produit des items nouveaux
+IDLE_BACKOFF = 1.5   # facteur appliqué quand la source n'a rien produit
+ERROR_BACKOFF = 2.0  # facteur appliqué en cas d'échec
+JITTER = 0.1         # ±10 % pour éviter que toutes les sources tombent ensemble
+
+
+class SourceSchedule:
+    """Intervalle adaptatif d'une source"""
+
+    def __init__(self, key, interval, min_interval, max_interval, next_due=0.0,
+                 failures=0, polls=0, total_new=0, last_new=0):
+        self.key = key
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min(max_interval, max(min_interval, interval))
+        self.next_due = next_due
+        self.failures = failures
+        self.polls = polls
+        self.total_new = total_new
+        self.last_new = last_new
+
+    def record(self, new_items, failed, now, rng=random):
+        """Met à jour l'intervalle après une collecte et planifie la suivante"""
+        self.polls += 1
+        if failed:
+            self.failures += 1
+            factor = ERROR_BACKOFF
+        else:
+            self.failures = 0
+            self.last_new = new_items
+            self.total_new += new_items
+            factor = SPEEDUP if new_items else IDLE_BACKOFF
+
+        self.interval = min(self.max_interval, max(self.min_interval, self.interval * factor))
+        self.next_due = now + self.interval * rng.uniform(1 - JITTER, 1 + JITTER)
+
+    def to_dict(self):
+        return {
+            'interval': round(self.interval, 1),
+            'next_due': round(self.next_due, 1),
+            'failures': self.failures,
+            'polls': self.polls,
+            'total_new': self.total_new,
+            'last_new': self.last_new,
+        }
+
+
+class AdaptiveScheduler:
+    """Ensemble de sources planifiées, persisté en JSON"""
+
+    def __init__(self, path=None, clock=time.time, rng=None):
+        self.path = path or state_path('schedule.json')
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._saved = {}
+        self.sources = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self._saved = json.load(f)
+            except (OSError, ValueError):
+                self._saved = {}
+
+    def register(self, key, interval, min_interval=None, max_interval=None):
+        """Ajoute une source (reprend son état enregistré s'il existe)"""
+        min_interval = min_interval if min_interval is not None else interval / 6
+        max_interval = max_interval if max_interval is not None else interval * 8
+        with self._lock:
+            if key in self.sources:
+                return self.sources[key]
+            saved = self._saved.get(key, {})
+            schedule = SourceSchedule(
+                key,
+                saved.get('interval', interval),
+                min_interval,
+                max_interval,
+                next_due=saved.get('next_due', 0.0),
+                failures=saved.get('failures', 0),
+                polls=saved.get('polls', 0),
+                total_new=saved.get('total_new', 0),
+                last_new=saved.get('last_new', 0),
+            )
+            self.sources[key] = schedule
+            return schedule
+
+    def retain(self, keys):
+        """Oublie les sources actives absentes de `keys` (leur état reste sur disque)"""
+        keys = set(keys)
+        with self._lock:
+            for key in list(self.sources):
+                if key not in keys:
+                    self._saved[key] = self.sources.pop(key).to_dict()
+
+    def due(self, prefix=''):
+        """Clés des sources à collecter maintenant"""
+        now = self._clock()
+        with self._lock:
+            return [key for key, schedule in self.sources.items()
+                    if key.startswith(prefix) and schedule.next_due <= now]
+
+    def next_wakeup(self):
+        """Instant de la prochaine échéance (None si aucune source)"""
+        with self._lock:
+            if not self.sources:
+                return None
+            return min(schedule.next_due for schedule in self.sources.values())
+
+    def record(self, key, new_items=0, failed=False):
+        with self._lock:
+            schedule = self.sources.get(key)
+            if schedule is not None:
+                schedule.record(new_items, failed, self._clock(), self._rng)
+
+    def save(self):
+        """Écriture atomique de l'état des sources"""
+        with self._lock:
+            data = dict(self._saved)
+            data.update({key: schedule.to_dict() for key, schedule in self.sources.items()})
+            self._saved = data
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
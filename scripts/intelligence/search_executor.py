@@ -0,0 +1,254 @@
+"""
+Lynx Eye Search Executor
+Exécution parallèle des requêtes de recherche :
+- une session client par worker, réutilisée d'une requête à l'autre et recréée
+  après une erreur (DDGS refuse tout appel suivant une exception)
+- pool de workers borné
+- limiteur de débit token-bucket, ralenti automatiquement (AIMD) quand
+  le moteur signale un throttling, puis ré-accéléré progressivement
+- cache de résultats optionnel : une requête servie par le cache ne consomme
+  ni jeton ni temps réseau
+- moteurs : DuckDuckGo (sessions DDGS par worker) et YouTube
+- registre de santé optionnel (health.py) : disjoncteur du moteur, une panne
+  fait échouer les requêtes suivantes sans attendre le timeout
+"""
+
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import metrics
+from health import CircuitOpenError
+
+SearchResult = namedtuple('SearchResult', ['query', 'results', 'error', 'elapsed', 'attempts', 'cached'],
+                          defaults=(False,))
+
+
+def is_rate_limit_error(error):
+    """Détecte un refus pour excès de requêtes (DDGS RatelimitException, HTTP 429/202)"""
+    if type(error).__name__ in ('RatelimitException', 'TooManyRequests'):
+        return True
+    message = str(error).lower()
+    return 'ratelimit' in message or 'rate limit' in message or '429' in message
+
+
+class TokenBucket:
+    """Limiteur de débit thread-safe dont le débit s'adapte au throttling"""
+
+    def __init__(self, rate, capacity=None, min_rate=None, clock=time.monotonic, sleep=time.sleep):
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min_rate if min_rate is not None else self.base_rate / 16
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Bloque jusqu'à obtenir un jeton"""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+    def penalize(self):
+        """Throttling détecté : débit divisé par deux, jetons en réserve annulés"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+
+    def reward(self):
+        """Requête réussie : le débit remonte par paliers vers le débit de base"""
+        with self._lock:
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 10)
+
+
+class DDGSBackend:
+    """Moteur DuckDuckGo : une session DDGS par thread, recréée après une erreur"""
+
+    name = 'ddg'
+
+    def __init__(self, timeout=10):
+        from duckduckgo_search import DDGS
+        self._factory = DDGS
+        self.timeout = timeout
+        self._local = threading.local()
+        self._clients = []
+        self._lock = threading.Lock()
+
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._factory(timeout=self.timeout)
+            self._local.client = client
+            with self._lock:
+                self._clients.append(client)
+        return client
+
+    def _discard(self, client):
+        self._local.client = None
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+        _close_client(client)
+
+    def search(self, query, max_results):
+        client = self._client()
+        try:
+            return list(client.text(query, max_results=max_results) or [])
+        except Exception:
+            # Après une erreur (202 compris), DDGS lève « Exception occurred in previous call. »
+            # sans appel réseau : la session est remplacée pour que le retry parte vraiment
+            self._discard(client)
+            raise
+
+    def close(self):
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            _close_client(client)
+
+
+def _close_client(client):
+    close = getattr(client, '__exit__', None)
+    if close:
+        close(None, None, None)
+
+
+class YouTubeBackend:
+    """Recherche de vidéos YouTube (youtubesearchpython importé à la construction)"""
+
+    name = 'youtube'
+
+    def __init__(self, timeout=10):
+        from youtubesearchpython import VideosSearch
+        self._videos_search = VideosSearch
+        # Sans timeout, la bibliothèque peut attendre indéfiniment une réponse
+        self.timeout = timeout
+
+    def search(self, query, max_results):
+        search = self._videos_search(query, limit=max_results, timeout=self.timeout)
+        return list(search.result().get('result') or [])
+
+
+class SearchExecutor:
+    """Lance des requêtes en parallèle à travers un backend partagé"""
+
+    def __init__(self, backend, max_workers=4, rate=1.0, burst=2, max_retries=3,
+                 backoff=2.0, max_backoff=60.0, sleep=time.sleep, cache=None, health=None):
+        self.backend = backend
+        self.cache = cache
+        self.health = health
+        self.max_workers = max_workers
+        self.max_retries = max(1, max_retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.limiter = TokenBucket(rate, capacity=burst, sleep=sleep)
+        self._sleep = sleep
+        self.throttled = 0
+
+    def search(self, query, max_results):
+        """Exécute une requête, servie par le cache si possible"""
+        result = self._cached_search(query, max_results)
+        run_metrics = metrics.current()
+        run_metrics.add_stage_time('fetch', result.elapsed)
+        run_metrics.observe('query', f"{self.backend.name}:{query}", result.elapsed)
+        run_metrics.count_items('fetch', 1, 0 if result.error else 1)
+        if result.error and not isinstance(result.error, CircuitOpenError):
+            run_metrics.error('search', f"{self.backend.name}:{query}")
+        if result.cached:
+            run_metrics.incr('query_cache_hits')
+        return result
+
+    def _cached_search(self, query, max_results):
+        if self.cache is None:
+            return self._search(query, max_results)
+
+        started = time.monotonic()
+        attempts = [0]
+
+        def fetch():
+            result = self._search(query, max_results)
+            attempts[0] = result.attempts
+            if result.error:
+                raise result.error
+            return result.results
+
+        try:
+            results, status = self.cache.get_or_fetch(self.backend.name, query, max_results, fetch)
+        except Exception as e:
+            return SearchResult(query, [], e, time.monotonic() - started, attempts[0])
+        return SearchResult(query, results, None, time.monotonic() - started, attempts[0], status != 'miss')
+
+    def _search(self, query, max_results):
+        """Exécute une requête (retry sur throttling) et en rend compte au registre de santé"""
+        name = self.backend.name
+        if self.health is not None and not self.health.allow(name):
+            return SearchResult(query, [], CircuitOpenError(name, self.health.get(name).open_until), 0.0, 0)
+        result = self._attempts(query, max_results)
+        if self.health is not None:
+            self.health.record(name, result.elapsed, result.error)
+        return result
+
+    def _attempts(self, query, max_results):
+        started = time.monotonic()
+        error = None
+        for attempt in range(1, self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                results = self.backend.search(query, max_results)
+            except Exception as e:
+                error = e
+                if not is_rate_limit_error(e):
+                    break
+                self.throttled += 1
+                metrics.current().incr(f"{self.backend.name}_throttled")
+                self.limiter.penalize()
+                if attempt < self.max_retries:
+                    self._sleep(min(self.max_backoff, self.backoff * (2 ** (attempt - 1))))
+                continue
+
+            self.limiter.reward()
+            return SearchResult(query, results, None, time.monotonic() - started, attempt)
+
+        return SearchResult(query, [], error, time.monotonic() - started, attempt)
+
+    def run(self, queries, max_results):
+        """Génère les résultats au fil de l'eau (ordre de complétion)"""
+        queries = list(dict.fromkeys(queries))
+        if not queries:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(queries))) as executor:
+            futures = [executor.submit(self.search, query, max_results) for query in queries]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def replace_backend(self, backend):
+        """Remplace le moteur (sessions neuves) en conservant le débit appris et le cache"""
+        if self.cache is not None:
+            self.cache.drain()
+        previous, self.backend = self.backend, backend
+        close = getattr(previous, 'close', None)
+        if close:
+            close()
+
+    def close(self):
+        # Les rafraîchissements stale-while-revalidate utilisent encore le backend
+        if self.cache is not None:
+            self.cache.drain()
+        close = getattr(self.backend, 'close', None)
+        if close:
+            close()
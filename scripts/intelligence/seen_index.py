@@ -0,0 +1,102 @@
+"""
+Lynx Eye Seen Index
+Index local (SQLite) des external_id déjà envoyés à Supabase.
+Les items connus sont écartés avant toute écriture réseau ;
+les entrées expirent après un TTL pour laisser passer les mises à jour tardives.
+"""
+
+import sqlite3
+import threading
+import time
+
+import settings
+from state import state_path
+
+DEFAULT_TTL_DAYS = 30
+
+
+class SeenIndex:
+    """Ensemble persistant d'external_id avec expiration"""
+
+    def __init__(self, path=None, ttl_days=None):
+        if ttl_days is None:
+            ttl_days = settings.get('LYNX_SEEN_TTL_DAYS', DEFAULT_TTL_DAYS, float)
+        self.path = path or state_path('seen_items.sqlite3')
+        self.ttl = ttl_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS seen_items ('
+            ' external_id TEXT PRIMARY KEY,'
+            ' seen_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+        self.evict_expired()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _cutoff(self):
+        return time.time() - self.ttl
+
+    def contains(self, external_id):
+        """True si l'id a été envoyé pendant la durée du TTL (compte un hit / miss)"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM seen_items WHERE external_id = ? AND seen_at >= ?',
+                (external_id, self._cutoff())
+            ).fetchone()
+            if row:
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def is_new(self, item, key='external_id'):
+        """True si l'item n'a jamais été envoyé (les items sans id passent)"""
+        return not item.get(key) or not self.contains(item[key])
+
+    def filter_new(self, items, key='external_id'):
+        """Retourne uniquement les items jamais envoyés"""
+        return [item for item in items if self.is_new(item, key)]
+
+    def mark(self, external_ids):
+        """Enregistre des ids comme envoyés"""
+        now = time.time()
+        rows = [(external_id, now) for external_id in external_ids if external_id]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO seen_items (external_id, seen_at) VALUES (?, ?)',
+                rows
+            )
+            self._conn.commit()
+
+    def mark_items(self, items, key='external_id'):
+        self.mark(item.get(key) for item in items)
+
+    def evict_expired(self):
+        """Supprime les entrées plus anciennes que le TTL ; retourne leur nombre"""
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM seen_items WHERE seen_at < ?', (self._cutoff(),))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,45 @@
+"""
+Lynx Eye Settings
+Configuration lue à la demande : le fichier .env n'est chargé qu'au premier accès,
+jamais à l'import d'un module.
+"""
+
+import os
+import threading
+
+_lock = threading.Lock()
+_loaded = False
+
+
+class ConfigError(RuntimeError):
+    """Variable de configuration obligatoire absente"""
+
+
+def load_env():
+    """Charge .env une seule fois (les variables déjà définies sont prioritaires)"""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _loaded = True
+
+
+def get(name, default=None, cast=str):
+    """Valeur d'une variable d'environnement (ou .env), convertie par `cast`"""
+    load_env()
+    value = os.getenv(name)
+    if value is None or value == '':
+        return default
+    return cast(value)
+
+
+def require(*names):
+    """Valeurs des variables obligatoires ; ConfigError si l'une manque"""
+    values = [get(name) for name in names]
+    missing = [name for name, value in zip(names, values) if not value]
+    if missing:
+        raise ConfigError(f"Variables {' et '.join(missing)} requises dans .env")
+    return values
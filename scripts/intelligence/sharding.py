@@ -0,0 +1,232 @@
+"""
+Lynx Eye Sharding
+Répartition des sources (flux RSS, pages HTML, requêtes web / YouTube) entre plusieurs
+workers, processus locaux ou machines partageant le même répertoire d'état :
+- anneau de hachage cohérent (nœuds virtuels) à charge bornée sur les workers vivants :
+  chaque worker reçoit au plus BALANCE fois la part moyenne, et l'arrivée ou le départ
+  d'un worker ne déplace qu'une petite partie des sources
+- propriété par bail (lease) dans une base SQLite commune : une source n'est collectée
+  que par le worker qui détient son bail, renouvelé en continu par un thread de heartbeat
+- un worker qui ne renouvelle plus ses baux (crash) sort de l'anneau après lease_ttl ;
+  sa part revient aux survivants dont les baux prennent le relais à l'expiration
+- valeurs partagées (plan de requêtes du jour) : la première publiée fait foi pour tous
+"""
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_right
+
+import settings
+from state import state_path
+
+# Nœuds virtuels par worker : répartition homogène dès deux ou trois workers
+VNODES = 64
+# Charge maximale d'un worker, en multiple de la part moyenne (hachage cohérent à charge bornée)
+BALANCE = 1.05
+DEFAULT_LEASE_TTL = 180.0
+# Valeurs partagées conservées (s)
+SHARED_TTL = 7 * 86400
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def worker_state_path(filename, worker_id=None):
+    """Fichier d'état propre à un worker : schedule.json -> schedule-<worker>.json"""
+    if not worker_id:
+        return state_path(filename)
+    stem, extension = os.path.splitext(filename)
+    safe_id = ''.join(char if char.isalnum() or char in '-_' else '_' for char in worker_id)
+    return state_path(f"{stem}-{safe_id}{extension}")
+
+
+class HashRing:
+    """Anneau de hachage cohérent : clé -> worker"""
+
+    def __init__(self, workers, vnodes=VNODES):
+        points = sorted((_hash(f"{worker}#{index}"), worker) for worker in set(workers) for index in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._workers = [worker for _, worker in points]
+
+    def owner(self, key):
+        if not self._hashes:
+            return None
+        return self._workers[bisect_right(self._hashes, _hash(key)) % len(self._hashes)]
+
+    def assign(self, keys, balance=BALANCE):
+        """
+        Répartition clé -> worker à charge bornée : une clé dont le worker naturel est plein
+        passe au suivant sur l'anneau. Déterministe pour un même ensemble de clés et de workers.
+        """
+        if not self._hashes:
+            return {}
+        keys = sorted(set(keys), key=lambda key: (_hash(key), key))
+        capacity = math.ceil(balance * len(keys) / len(set(self._workers)))
+        loads = {}
+        assignment = {}
+        for key in keys:
+            index = bisect_right(self._hashes, _hash(key))
+            while True:
+                worker = self._workers[index % len(self._workers)]
+                if loads.get(worker, 0) < capacity:
+                    break
+                index += 1
+            loads[worker] = loads.get(worker, 0) + 1
+            assignment[key] = worker
+        return assignment
+
+
+class ShardCoordinator:
+    """Appartenance et baux d'un worker dans la base de coordination commune"""
+
+    def __init__(self, worker_id, path=None, lease_ttl=None, clock=time.time):
+        self.worker_id = worker_id
+        self.path = path or settings.get('LYNX_SHARD_DB') or state_path('shards.sqlite3')
+        self.lease_ttl = lease_ttl or settings.get('LYNX_LEASE_TTL', DEFAULT_LEASE_TTL, float)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat_thread = None
+        self.owned = set()
+        # Autocommit : les transactions sont ouvertes explicitement (BEGIN IMMEDIATE)
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(
+            'CREATE TABLE IF NOT EXISTS workers ('
+            ' worker_id TEXT PRIMARY KEY,'
+            ' heartbeat REAL NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS leases ('
+            ' key TEXT PRIMARY KEY,'
+            ' owner TEXT NOT NULL,'
+            ' expires_at REAL NOT NULL);'
+            'CREATE INDEX IF NOT EXISTS leases_owner ON leases (owner);'
+            'CREATE TABLE IF NOT EXISTS shared ('
+            ' name TEXT PRIMARY KEY,'
+            ' value TEXT NOT NULL,'
+            ' created_at REAL NOT NULL);'
+        )
+        self.heartbeat()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _transaction(self, statements):
+        """Exécute (sql, params) dans une transaction en écriture ; retourne les rowcount"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                counts = [self._conn.execute(sql, params).rowcount for sql, params in statements]
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+        return counts
+
+    def heartbeat(self):
+        """Signale le worker vivant et prolonge ses baux"""
+        now = self._clock()
+        self._transaction([
+            ('INSERT INTO workers (worker_id, heartbeat) VALUES (?, ?)'
+             ' ON CONFLICT (worker_id) DO UPDATE SET heartbeat = excluded.heartbeat', (self.worker_id, now)),
+            ('UPDATE leases SET expires_at = ? WHERE owner = ?', (now + self.lease_ttl, self.worker_id)),
+        ])
+
+    def live_workers(self):
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT worker_id FROM workers WHERE heartbeat >= ? ORDER BY worker_id',
+                (self._clock() - self.lease_ttl,)
+            ).fetchall()
+        return [worker_id for worker_id, in rows]
+
+    def is_leader(self, name):
+        """Le worker est-il responsable de la tâche unique `name` (décroissance du planificateur...) ?"""
+        return HashRing(self.live_workers()).owner(name) == self.worker_id
+
+    def assign(self, keys):
+        """
+        Sources à collecter par ce worker : sa part de l'anneau dont il obtient le bail.
+        Les baux des sources sorties de sa part sont rendus ; un bail tenu par un autre
+        worker n'est repris qu'après expiration.
+        """
+        self.heartbeat()
+        assignment = HashRing(self.live_workers()).assign(keys)
+        mine = [key for key in dict.fromkeys(keys) if assignment.get(key) == self.worker_id]
+        now = self._clock()
+
+        statements = [('DELETE FROM leases WHERE key = ? AND owner = ?', (key, self.worker_id))
+                      for key in self.owned.difference(mine)]
+        statements += [
+            ('INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?)'
+             ' ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at'
+             ' WHERE leases.owner = excluded.owner OR leases.expires_at < ?',
+             (key, self.worker_id, now + self.lease_ttl, now))
+            for key in mine
+        ]
+        counts = self._transaction(statements)[len(statements) - len(mine):]
+        self.owned = {key for key, count in zip(mine, counts) if count}
+        return [key for key in mine if key in self.owned]
+
+    def holds(self, keys):
+        """Sous-ensemble des clés dont ce worker détient encore un bail valide (à vérifier avant collecte)"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT key FROM leases WHERE owner = ? AND expires_at >= ?', (self.worker_id, self._clock())
+            ).fetchall()
+        held = {key for key, in rows}
+        return [key for key in keys if key in held]
+
+    def shared_value(self, name, factory):
+        """Valeur commune à tous les workers : la première publiée (factory()) fait foi"""
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM shared WHERE name = ?', (name,)).fetchone()
+        if row:
+            return json.loads(row[0])
+        now = self._clock()
+        self._transaction([
+            ('DELETE FROM shared WHERE created_at < ?', (now - SHARED_TTL,)),
+            ('INSERT OR IGNORE INTO shared (name, value, created_at) VALUES (?, ?, ?)',
+             (name, json.dumps(factory(), ensure_ascii=False), now)),
+        ])
+        with self._lock:
+            return json.loads(self._conn.execute('SELECT value FROM shared WHERE name = ?', (name,)).fetchone()[0])
+
+    def start(self):
+        """Renouvelle heartbeat et baux en arrière-plan (tous les tiers de lease_ttl)"""
+        if self._heartbeat_thread is None:
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name='shard-heartbeat',
+                                                      daemon=True)
+            self._heartbeat_thread.start()
+        return self
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.lease_ttl / 3):
+            try:
+                self.heartbeat()
+            except sqlite3.Error as e:
+                print(f"  ⚠️  Heartbeat du worker {self.worker_id} en échec: {e}")
+
+    def retire(self):
+        """Départ propre : baux rendus et worker retiré de l'anneau immédiatement"""
+        self._transaction([
+            ('DELETE FROM leases WHERE owner = ?', (self.worker_id,)),
+            ('DELETE FROM workers WHERE worker_id = ?', (self.worker_id,)),
+        ])
+        self.owned = set()
+
+    def close(self):
+        self._stop.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+        self.retire()
+        with self._lock:
+            self._conn.close()
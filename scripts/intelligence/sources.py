@@ -31,6 +31,42 @@ PRESS_URLS = {
     }
 }
 
+# Sélecteurs des pages de rubrique (sources sans flux RSS)
+# item : bloc d'un article ; title / link / summary / date : éléments dans ce bloc.
+# Syntaxe : balise, .classe, #id, descendant (espace), alternatives (virgule).
+# Les sites absents utilisent DEFAULT_HTML_SELECTORS (gabarit WordPress courant).
+DEFAULT_HTML_SELECTORS = {
+    "item": "article",
+    "title": ".entry-title, h2, h3",
+    "link": ".entry-title a, h2 a, h3 a, a",
+    "summary": ".entry-summary, .entry-content p, p",
+    "date": "time"
+}
+
+HTML_SELECTORS = {
+    "AGP Gabon": {
+        "item": "div.views-row, article",
+        "title": ".field-title, h2, h3",
+        "link": ".field-title a, h2 a, h3 a",
+        "summary": ".field-body, p",
+        "date": ".date-display-single, time"
+    },
+    "RFI": {
+        "item": "div.m-item-list-article",
+        "title": ".article__title",
+        "link": "a",
+        "summary": ".article__chapo",
+        "date": "time"
+    },
+    "Africa Intelligence": {
+        "item": "article, div.article-item",
+        "title": ".article-item__title, h2, h3",
+        "link": "a",
+        "summary": ".article-item__summary, p",
+        "date": "time"
+    }
+}
+
 # Comptes sociaux officiels (Twitter/X, Facebook, Instagram)
 SOCIAL_HANDLES = {
     # Institutions
@@ -152,11 +188,16 @@ def get_social_search_queries():
             queries.append(f"{handle} news")
     return queries
 
+def get_youtube_channel_queries():
+    """Une requête YouTube par compte suivi (vidéos des chaînes et vidéos qui les citent)"""
+    return [f"@{handle} Gabon" for handles in SOCIAL_HANDLES.values() for handle in handles]
+
 # Export pour intégration facile
 if __name__ == "__main__":
     import json
     print("=== LYNX EYE SOURCES DATABASE ===")
     print(f"\n📰 Flux RSS: {len(get_all_rss_feeds())} sources")
+    print(f"🌐 Pages HTML: {sum(len(urls) for urls in PRESS_URLS.values()) - len(get_all_rss_feeds())} sources")
     print(f"👥 Comptes sociaux: {sum(len(v) for v in SOCIAL_HANDLES.values())} handles")
     print(f"#️⃣ Hashtags: {len(get_all_hashtags_flat())} tags")
     print(f"\n📋 Configuration JSON exportée:")
@@ -0,0 +1,150 @@
+"""
+Lynx Eye Write Spool
+Journal d'écriture local (SQLite en mode WAL) placé devant intelligence_items :
+- chaque item collecté y est d'abord ajouté (durable avant tout appel réseau)
+- le writer le vide ensuite vers Supabase par upserts groupés, au rythme de la base
+- rejeu idempotent : une ligne par external_id (la dernière version l'emporte),
+  upsert on_conflict=external_id côté Supabase
+- une ligne n'est supprimée qu'après acquittement de son upsert ; le fichier est
+  compacté (checkpoint du WAL + pages libres rendues) une fois les lignes acquittées
+- taille bornée : au-delà de max_items, les lignes les plus anciennes sont abandonnées
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+import metrics
+import settings
+from state import state_path
+
+DEFAULT_MAX_ITEMS = 100000
+
+SpooledRow = namedtuple('SpooledRow', ['seq', 'version', 'row', 'attempts'], defaults=(0,))
+
+
+def configured_max_items():
+    """Nombre maximal de lignes en attente dans le spool (LYNX_SPOOL_MAX_ITEMS)"""
+    return settings.get('LYNX_SPOOL_MAX_ITEMS', DEFAULT_MAX_ITEMS, int)
+
+
+class WriteSpool:
+    """File persistante des lignes à écrire, dédupliquée par external_id"""
+
+    def __init__(self, path=None, max_items=None, key='external_id'):
+        self.path = path or state_path('write_spool.sqlite3')
+        self.max_items = max(1, max_items if max_items is not None else configured_max_items())
+        self.key = key
+        self.dropped = 0
+        self._acked_since_compact = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        # auto_vacuum doit précéder la création des tables pour être pris en compte
+        self._conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS spool ('
+            ' seq INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' external_id TEXT UNIQUE,'
+            ' version INTEGER NOT NULL DEFAULT 0,'
+            ' payload TEXT NOT NULL,'
+            ' attempts INTEGER NOT NULL DEFAULT 0,'
+            ' enqueued_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+        self._size = self._conn.execute('SELECT COUNT(*) FROM spool').fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self._size
+
+    def append(self, row):
+        """
+        Ajoute une ligne ; retourne True si elle remplace une ligne en attente
+        (même external_id). Une ligne remplacée pendant son envoi n'est pas acquittée
+        par cet envoi (numéro de version) et repart au prochain vidage.
+        """
+        external_id = row.get(self.key) or None
+        payload = json.dumps(row, ensure_ascii=False, default=str)
+        with self._lock:
+            replaced = False
+            if external_id is not None:
+                replaced = self._conn.execute(
+                    'UPDATE spool SET payload = ?, version = version + 1, attempts = 0'
+                    ' WHERE external_id = ?', (payload, external_id)
+                ).rowcount > 0
+            if not replaced:
+                self._conn.execute(
+                    'INSERT INTO spool (external_id, payload, enqueued_at) VALUES (?, ?, ?)',
+                    (external_id, payload, time.time())
+                )
+                self._size += 1
+                if self._size > self.max_items:
+                    self._drop_oldest(self._size - self.max_items)
+            self._conn.commit()
+        return replaced
+
+    def _drop_oldest(self, count):
+        self._conn.execute(
+            'DELETE FROM spool WHERE seq IN (SELECT seq FROM spool ORDER BY seq LIMIT ?)', (count,)
+        )
+        self._size -= count
+        if not self.dropped:
+            print(f"  ⚠️  Spool plein ({self.max_items} lignes) : les lignes les plus anciennes sont abandonnées")
+        self.dropped += count
+        metrics.current().incr('spool_dropped', count)
+
+    def pending(self, limit):
+        """Prochaines lignes à envoyer : les moins souvent en échec d'abord, puis les plus anciennes"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT seq, version, payload, attempts FROM spool ORDER BY attempts, seq LIMIT ?', (limit,)
+            ).fetchall()
+        return [SpooledRow(seq, version, json.loads(payload), attempts) for seq, version, payload, attempts in rows]
+
+    def ack(self, entries):
+        """
+        Supprime les lignes écrites (sauf si une version plus récente est arrivée entre-temps) ;
+        retourne les lignes effectivement supprimées
+        """
+        with self._lock:
+            removed = [
+                entry for entry in entries
+                if self._conn.execute(
+                    'DELETE FROM spool WHERE seq = ? AND version = ?', (entry.seq, entry.version)
+                ).rowcount
+            ]
+            self._conn.commit()
+            self._size -= len(removed)
+            self._acked_since_compact += len(removed)
+        return removed
+
+    def defer(self, entries):
+        """Remet des lignes en attente après un échec d'envoi"""
+        with self._lock:
+            self._conn.executemany(
+                'UPDATE spool SET attempts = attempts + 1 WHERE seq = ?', [(entry.seq,) for entry in entries]
+            )
+            self._conn.commit()
+
+    def compact(self):
+        """Rend au système l'espace des lignes acquittées (WAL tronqué, pages libres)"""
+        with self._lock:
+            if not self._acked_since_compact:
+                return
+            self._conn.execute('PRAGMA incremental_vacuum')
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self._acked_since_compact = 0
+
+    def close(self):
+        self.compact()
+        with self._lock:
+            self._conn.close()
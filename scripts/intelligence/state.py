@@ -0,0 +1,22 @@
+"""
+Lynx Eye Local State
+Emplacement des fichiers d'état locaux (caches, index) partagés entre les exécutions
+"""
+
+import os
+
+import settings
+
+DEFAULT_STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.lynx_state')
+
+
+def state_dir():
+    """Répertoire d'état (LYNX_STATE_DIR, sinon .lynx_state/)"""
+    return settings.get('LYNX_STATE_DIR', DEFAULT_STATE_DIR)
+
+
+def state_path(filename):
+    """Chemin d'un fichier d'état (le répertoire est créé au besoin)"""
+    directory = state_dir()
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
@@ -0,0 +1,318 @@
+"""
+Lynx Eye Supabase Writer
+Écriture groupée dans intelligence_items :
+- tampon dédupliqué par external_id (un seul aller-retour par chunk)
+- upserts multi-lignes par chunks de taille configurable
+- retry avec backoff exponentiel, puis bisection pour isoler les lignes invalides
+- erreurs classées : ligne refusée (400/409/422, contrainte, type) ou panne (timeout,
+  réseau, 5xx, 429, authentification) ; une panne n'abandonne jamais une ligne du spool
+- comptage exact des lignes sauvegardées / en échec
+- callback on_saved appelé avec les lignes effectivement écrites
+- avec un spool (spool.py) : les items y sont d'abord ajoutés, puis un thread de
+  vidage les envoie en arrière-plan ; la collecte ne dépend plus de la disponibilité
+  ni de la latence de Supabase, et une panne laisse les lignes dans le spool
+"""
+
+import re
+import threading
+import time
+from collections import namedtuple
+
+import metrics
+import settings
+
+DEFAULT_CHUNK_SIZE = 200
+
+# Vidage du spool : lot partiel envoyé après ce délai (s)
+DEFAULT_DRAIN_INTERVAL = 2.0
+# Reprise après une panne de Supabase : délai doublé à chaque échec, dans ces bornes (s)
+SPOOL_RETRY_MIN = 1.0
+SPOOL_RETRY_MAX = 60.0
+
+# Vidage du spool : une ligne isolée toujours en panne après ce nombre de vidages est abandonnée
+# (si d'autres lignes passent pendant le même vidage)
+DEFAULT_MAX_ROW_ATTEMPTS = 5
+
+# Erreurs propres aux lignes envoyées : statuts HTTP, classes SQLSTATE (cardinalité,
+# données, contraintes, colonnes) et codes PostgREST (corps invalide, colonne inconnue)
+ROW_ERROR_STATUSES = {400, 409, 413, 422}
+ROW_ERROR_SQLSTATE_CLASSES = ('21', '22', '23', '42')
+ROW_ERROR_PGRST_CODES = {'PGRST102', 'PGRST204'}
+HTTP_STATUS = re.compile(r'\b([45]\d\d)\b')
+
+WriteResult = namedtuple('WriteResult', ['saved', 'failed', 'duplicates', 'pending'])
+
+
+class SpoolDeferred(Exception):
+    """Supabase injoignable : le vidage s'interrompt, les lignes restent dans le spool"""
+
+
+def _error_status(error):
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is None:
+        match = HTTP_STATUS.search(str(error))
+        status = int(match.group(1)) if match else None
+    return status
+
+
+def is_row_error(error):
+    """
+    True si Supabase a refusé les lignes elles-mêmes (validation, contrainte, type) ;
+    False pour une panne ou une erreur inconnue (timeout, réseau, 5xx, 429, 401/403)
+    """
+    code = str(getattr(error, 'code', None) or '')
+    if code in ROW_ERROR_PGRST_CODES:
+        return True
+    if len(code) == 5 and not code.startswith('PGRST'):
+        return code[:2] in ROW_ERROR_SQLSTATE_CLASSES
+    return _error_status(error) in ROW_ERROR_STATUSES
+
+
+def configured_chunk_size():
+    """Taille des upserts multi-lignes (LYNX_UPSERT_CHUNK_SIZE)"""
+    return settings.get('LYNX_UPSERT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE, int)
+
+
+class BatchWriter:
+    """Tampon d'écriture vers une table Supabase (upsert par chunks)"""
+
+    def __init__(self, client, table='intelligence_items', on_conflict='external_id',
+                 chunk_size=DEFAULT_CHUNK_SIZE, max_retries=3, backoff=0.5, sleep=time.sleep,
+                 on_saved=None, spool=None, drain_interval=DEFAULT_DRAIN_INTERVAL, clock=time.monotonic,
+                 max_row_attempts=DEFAULT_MAX_ROW_ATTEMPTS):
+        self.client = client
+        self.table = table
+        self.on_conflict = on_conflict
+        self.chunk_size = max(1, chunk_size)
+        self.max_retries = max(1, max_retries)
+        self.backoff = backoff
+        self._sleep = sleep
+        self._on_saved = on_saved
+        self.spool = spool
+        self.drain_interval = drain_interval
+        self.max_row_attempts = max(1, max_row_attempts)
+        self._clock = clock
+
+        self._drain_lock = threading.Lock()
+        self._drainer = None
+        self._wake = threading.Event()
+        self._closed = False
+        self._retry_delay = 0.0
+        self._retry_at = 0.0
+        # Au moins un upsert accepté pendant le vidage en cours ; lignes sorties du spool
+        self._drain_wrote = False
+        self._drain_progress = 0
+        self._last_error = None
+
+        self._buffer = {}
+        self._anonymous = []
+        self.saved = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.errors = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        # Avec un spool, rien n'est retenu en mémoire : les items sont déjà durables
+        return len(self._buffer) + len(self._anonymous)
+
+    def add(self, item):
+        """Ajoute un item au tampon (le dernier reçu l'emporte pour un même external_id)"""
+        if self.spool is not None:
+            if self.spool.append(item):
+                self.duplicates += 1
+            self._start_drainer()
+            if len(self.spool) >= self.chunk_size:
+                self._wake.set()
+            return
+
+        key = item.get(self.on_conflict)
+        if key:
+            if key in self._buffer:
+                self.duplicates += 1
+            self._buffer[key] = item
+        else:
+            self._anonymous.append(item)
+
+        if len(self) >= self.chunk_size:
+            self.flush()
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+
+    def flush(self):
+        """Envoie le contenu du tampon (ou du spool) ; retourne le bilan cumulé"""
+        if self.spool is not None:
+            self._drain(force=True)
+            return self.result()
+
+        rows = list(self._buffer.values()) + self._anonymous
+        self._buffer = {}
+        self._anonymous = []
+
+        saved_before = self.saved
+        with metrics.current().stage('save'):
+            for start in range(0, len(rows), self.chunk_size):
+                self._write_chunk(rows[start:start + self.chunk_size], self.max_retries)
+        if rows:
+            metrics.current().count_items('save', len(rows), self.saved - saved_before)
+
+        return self.result()
+
+    def result(self):
+        pending = len(self.spool) if self.spool is not None else 0
+        return WriteResult(self.saved, self.failed, self.duplicates, pending)
+
+    def close(self):
+        """Arrête le vidage en arrière-plan puis envoie ce qui peut l'être ; retourne le bilan"""
+        self._closed = True
+        self._wake.set()
+        if self._drainer is not None:
+            self._drainer.join()
+        return self.flush()
+
+    def _start_drainer(self):
+        if self._drainer is None and not self._closed:
+            self._drainer = threading.Thread(target=self._drain_loop, name='spool-drain', daemon=True)
+            self._drainer.start()
+
+    def _drain_loop(self):
+        while not self._closed:
+            self._wake.wait(self.drain_interval)
+            self._wake.clear()
+            if not self._closed:
+                self._drain()
+
+    def _drain(self, force=False):
+        """Vide le spool par chunks ; s'interrompt (sans rien perdre) si Supabase est injoignable"""
+        with self._drain_lock:
+            if not force and self._clock() < self._retry_at:
+                return
+            saved_before = self.saved
+            processed = 0
+            self._drain_wrote = False
+            self._drain_progress = 0
+            with metrics.current().stage('save'):
+                try:
+                    while True:
+                        batch = self.spool.pending(self.chunk_size)
+                        if not batch:
+                            break
+                        progress = self._drain_progress
+                        self._write_spooled(batch, self.max_retries)
+                        processed += len(batch)
+                        if self._drain_progress == progress:
+                            # Lot entier remis en attente (lignes suspectes sans voisine écrite)
+                            raise SpoolDeferred(self._last_error)
+                except SpoolDeferred as e:
+                    self._retry_delay = min(SPOOL_RETRY_MAX, max(SPOOL_RETRY_MIN, self._retry_delay * 2))
+                    self._retry_at = self._clock() + self._retry_delay
+                    metrics.current().incr('spool_deferred')
+                    print(f"  ⏸️  Supabase indisponible ({e}) : {len(self.spool)} lignes conservées "
+                          f"dans le spool, nouvel essai dans {self._retry_delay:.0f}s")
+                else:
+                    self._retry_delay = 0.0
+                    self._retry_at = 0.0
+            if processed:
+                metrics.current().count_items('save', processed, self.saved - saved_before)
+            self.spool.compact()
+
+    def _write_spooled(self, batch, attempts, sibling_ok=False):
+        """
+        Écrit un lot du spool ; retourne True si l'upsert a été accepté.
+        - lignes refusées (is_row_error) : bisection, la ligne isolée est abandonnée
+        - panne : le lot reste dans le spool (defer) et le vidage est suspendu (SpoolDeferred),
+          sauf si la moitié voisine vient de passer ou si le lot a déjà échoué
+          max_row_attempts fois : bisection, et une ligne isolée n'est abandonnée que si la
+          base accepte d'autres lignes (voisine écrite, ou lot épuisé pendant un vidage actif) ;
+          sinon elle est remise en attente et ses voisines sont essayées
+        """
+        rows = [entry.row for entry in batch]
+        error = self._try_write(rows, attempts)
+        if error is None:
+            self._drain_wrote = True
+            written = self.spool.ack(batch)
+            # Ligne remplacée pendant l'envoi : sa nouvelle version sera comptée à son tour
+            if written:
+                self._drain_progress += len(written)
+                self._saved([entry.row for entry in written])
+            return True
+
+        row_error = is_row_error(error)
+        exhausted = all(entry.attempts + 1 >= self.max_row_attempts for entry in batch)
+        if len(batch) == 1:
+            if row_error or sibling_ok or (exhausted and self._drain_wrote):
+                self._failed(rows[0], error)
+                self._drain_progress += len(self.spool.ack(batch))
+                return False
+            self.spool.defer(batch)
+            if exhausted:
+                # Ligne suspecte : les lignes voisines sont essayées avant de conclure à une panne
+                self._last_error = error
+                return False
+            raise SpoolDeferred(error)
+        if not (row_error or sibling_ok or exhausted):
+            self.spool.defer(batch)
+            raise SpoolDeferred(error)
+
+        middle = len(batch) // 2
+        left_ok = self._write_spooled(batch[:middle], 1)
+        self._write_spooled(batch[middle:], 1, sibling_ok=left_ok)
+        return False
+
+    def _upsert(self, rows):
+        started = time.perf_counter()
+        try:
+            self.client.table(self.table).upsert(rows, on_conflict=self.on_conflict).execute()
+        except Exception:
+            metrics.current().error('upsert', self.table)
+            raise
+        finally:
+            metrics.current().observe('upsert', self.table, time.perf_counter() - started)
+
+    def _try_write(self, rows, attempts):
+        """Upsert avec retry et backoff exponentiel ; retourne la dernière erreur ou None"""
+        error = None
+        for attempt in range(attempts):
+            try:
+                self._upsert(rows)
+                return None
+            except Exception as e:
+                error = e
+                if attempt + 1 < attempts:
+                    self._sleep(self.backoff * (2 ** attempt))
+        return error
+
+    def _saved(self, rows):
+        self.saved += len(rows)
+        if self._on_saved:
+            self._on_saved(rows)
+
+    def _failed(self, row, error):
+        self.failed += 1
+        self.errors.append((row.get(self.on_conflict), error))
+        print(f"  ✗ Erreur sauvegarde ({row.get(self.on_conflict) or 'sans id'}): {error}")
+
+    def _write_chunk(self, rows, attempts):
+        """Écrit un chunk ; en cas d'échec persistant, le coupe en deux"""
+        error = self._try_write(rows, attempts)
+        if error is None:
+            self._saved(rows)
+            return
+
+        if len(rows) == 1:
+            self._failed(rows[0], error)
+            return
+
+        # Bisection : les moitiés saines passent, la ligne fautive est isolée
+        middle = len(rows) // 2
+        self._write_chunk(rows[:middle], 1)
+        self._write_chunk(rows[middle:], 1)
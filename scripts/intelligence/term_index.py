@@ -0,0 +1,193 @@
+"""
+Lynx Eye Term Index
+Index inversé local (SQLite en mode WAL) des items vus par les scrapers, qu'ils aient été
+sauvegardés ou écartés par le filtre de mots-clés :
+- termes = mots du texte normalisé comme dans matcher.py (minuscules, sans accents)
+- une liste de postings par terme : table (term, item_id) sans rowid, rangée par terme
+- mis à jour au fil de la collecte (lignes sauvegardées, entrées écartées par la taxonomie)
+- candidates(keywords) : items contenant tous les mots d'au moins un mot-clé, par
+  intersection des listes de postings, sans relire les autres items
+- taxonomie appliquée mémorisée : backfill.py en déduit les mots-clés ajoutés depuis
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+import settings
+from matcher import normalize
+from state import state_path
+
+DEFAULT_TTL_DAYS = 365
+# Items relus par requête SQL lors d'un backfill
+FETCH_BATCH = 500
+
+WORD = re.compile(r'\w+')
+
+IndexedItem = namedtuple('IndexedItem', ['item_id', 'external_id', 'author', 'content', 'published_at', 'kept'])
+
+
+def terms(text):
+    """Mots distincts du texte normalisé"""
+    return set(WORD.findall(normalize(text or '')))
+
+
+class TermIndex:
+    """Index inversé persistant mot -> items, avec expiration des items anciens"""
+
+    def __init__(self, path=None, ttl_days=None):
+        if ttl_days is None:
+            ttl_days = settings.get('LYNX_TERM_INDEX_TTL_DAYS', DEFAULT_TTL_DAYS, float)
+        self.path = path or state_path('term_index.sqlite3')
+        self.ttl = ttl_days * 86400
+        self.added = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(
+            'CREATE TABLE IF NOT EXISTS items ('
+            ' item_id INTEGER PRIMARY KEY,'
+            ' external_id TEXT UNIQUE NOT NULL,'
+            ' author TEXT,'
+            ' content TEXT NOT NULL,'
+            ' published_at TEXT,'
+            ' kept INTEGER NOT NULL DEFAULT 0,'
+            ' indexed_at REAL NOT NULL);'
+            'CREATE INDEX IF NOT EXISTS items_indexed_at ON items (indexed_at);'
+            'CREATE TABLE IF NOT EXISTS postings ('
+            ' term TEXT NOT NULL,'
+            ' item_id INTEGER NOT NULL,'
+            ' PRIMARY KEY (term, item_id)) WITHOUT ROWID;'
+            'CREATE TABLE IF NOT EXISTS taxonomy ('
+            ' keyword TEXT PRIMARY KEY);'
+        )
+        self._conn.commit()
+        self.evict_expired()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+
+    def _postings(self, item_id, content):
+        return [(term, item_id) for term in terms(content)]
+
+    def add(self, rows, kept):
+        """
+        Indexe des lignes (content, author, external_id, published_at).
+        kept : True pour les lignes sauvegardées, False pour les entrées écartées par le filtre ;
+        une ligne déjà indexée n'est réindexée que si son contenu a changé.
+        """
+        now = time.time()
+        with self._lock:
+            for row in rows:
+                external_id = row.get('external_id')
+                content = row.get('content') or ''
+                if not external_id or not content:
+                    continue
+                existing = self._conn.execute(
+                    'SELECT item_id, content FROM items WHERE external_id = ?', (external_id,)
+                ).fetchone()
+                if existing is None:
+                    item_id = self._conn.execute(
+                        'INSERT INTO items (external_id, author, content, published_at, kept, indexed_at)'
+                        ' VALUES (?, ?, ?, ?, ?, ?)',
+                        (external_id, row.get('author'), content, row.get('published_at'), int(kept), now)
+                    ).lastrowid
+                    self._conn.executemany('INSERT OR IGNORE INTO postings (term, item_id) VALUES (?, ?)',
+                                           self._postings(item_id, content))
+                    self.added += 1
+                    continue
+                item_id, old_content = existing
+                self._conn.execute(
+                    'UPDATE items SET kept = MAX(kept, ?), indexed_at = ? WHERE item_id = ?',
+                    (int(kept), now, item_id)
+                )
+                if old_content != content:
+                    # Postings retirés d'après l'ancien contenu, sans parcourir la table
+                    self._conn.executemany('DELETE FROM postings WHERE term = ? AND item_id = ?',
+                                           self._postings(item_id, old_content))
+                    self._conn.executemany('INSERT OR IGNORE INTO postings (term, item_id) VALUES (?, ?)',
+                                           self._postings(item_id, content))
+                    self._conn.execute(
+                        'UPDATE items SET author = ?, content = ?, published_at = ? WHERE item_id = ?',
+                        (row.get('author'), content, row.get('published_at'), item_id)
+                    )
+            self._conn.commit()
+
+    def add_saved(self, rows):
+        """Callback on_saved du writer"""
+        self.add(rows, kept=True)
+
+    def add_rejected(self, rows):
+        """Callback on_rejected des scrapers (entrées sans mot-clé de la taxonomie)"""
+        self.add(rows, kept=False)
+
+    def candidates(self, keywords):
+        """
+        Items contenant tous les mots d'au moins un des mots-clés (sur-ensemble des
+        correspondances exactes, à confirmer avec KeywordMatcher), par lots
+        """
+        with self._lock:
+            item_ids = set()
+            for keyword in keywords:
+                words = sorted(terms(keyword))
+                if not words:
+                    continue
+                query = ' INTERSECT '.join(['SELECT item_id FROM postings WHERE term = ?'] * len(words))
+                item_ids.update(item_id for item_id, in self._conn.execute(query, words))
+        item_ids = sorted(item_ids)
+        for start in range(0, len(item_ids), FETCH_BATCH):
+            batch = item_ids[start:start + FETCH_BATCH]
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT item_id, external_id, author, content, published_at, kept FROM items'
+                    f" WHERE item_id IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+            for row in rows:
+                yield IndexedItem(*row[:5], bool(row[5]))
+
+    def applied_keywords(self):
+        """Mots-clés de la taxonomie déjà appliqués à l'index (None si jamais enregistrée)"""
+        with self._lock:
+            keywords = {keyword for keyword, in self._conn.execute('SELECT keyword FROM taxonomy')}
+        return keywords or None
+
+    def record_keywords(self, keywords):
+        """Mémorise la taxonomie appliquée (remplace la précédente)"""
+        with self._lock:
+            self._conn.execute('DELETE FROM taxonomy')
+            self._conn.executemany('INSERT OR IGNORE INTO taxonomy (keyword) VALUES (?)',
+                                   [(keyword,) for keyword in keywords])
+            self._conn.commit()
+
+    def ensure_keywords(self, keywords):
+        """Enregistre la taxonomie courante si l'index n'en a encore aucune (première exécution)"""
+        if self.applied_keywords() is None:
+            self.record_keywords(keywords)
+
+    def evict_expired(self):
+        """Supprime les items indexés avant le TTL et leurs postings ; retourne leur nombre"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = self._conn.execute(
+                'SELECT item_id, content FROM items WHERE indexed_at < ?', (cutoff,)
+            ).fetchall()
+            for item_id, content in expired:
+                self._conn.executemany('DELETE FROM postings WHERE term = ? AND item_id = ?',
+                                       self._postings(item_id, content))
+            self._conn.execute('DELETE FROM items WHERE indexed_at < ?', (cutoff,))
+            self._conn.commit()
+        return len(expired)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
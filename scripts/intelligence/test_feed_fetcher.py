@@ -0,0 +1,27 @@
+"""
+Téléchargement concurrent des flux (feed_fetcher.py) contre un serveur HTTP local.
+
+Usage (depuis scripts/intelligence) :
+    python -m pytest test_feed_fetcher.py
+"""
+
+from bench.fakes import LocalFeedServer
+from feed_fetcher import FeedFetcher, ValidatorCache
+
+FEED = b'<rss version="2.0"><channel></channel></rss>'
+
+
+def test_host_queue_wait_does_not_count_against_timeout(tmp_path):
+    paths = [f"/feed-{index}/" for index in range(3)]
+    with LocalFeedServer({path: FEED for path in paths}, latency=0.3) as server:
+        # Une connexion par hôte : le troisième flux attend ~0,6 s avant sa requête
+        fetcher = FeedFetcher(cache=ValidatorCache(str(tmp_path / 'validators.json')), per_host=1, timeout=0.5)
+        try:
+            responses = list(fetcher.fetch_all([server.url(path) for path in paths]))
+        finally:
+            fetcher.close()
+
+    assert [response.error for response in responses] == [None, None, None]
+    assert all(response.content == FEED for response in responses)
+    # Latence mesurée sans l'attente dans la file de l'hôte
+    assert max(response.elapsed for response in responses) < 0.5
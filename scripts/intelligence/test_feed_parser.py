@@ -0,0 +1,135 @@
+"""
+Parseur de flux en continu (feed_parser.py) comparé à feedparser sur des flux enregistrés
+(bench/data) et synthétiques.
+
+Usage (depuis scripts/intelligence) :
+    python -m pytest test_feed_parser.py
+"""
+
+import os
+
+import feedparser
+
+import rss_scraper
+from bench.fakes import LocalFeedServer
+from bench.fixtures import build_rss, synthetic_articles
+from feed_cursors import CursorScan
+from feed_fetcher import FeedFetcher, ValidatorCache
+from feed_parser import FeedScan, iter_entries, parse_entries
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench', 'data')
+FIELDS = ('title', 'summary', 'link', 'id', 'published', 'published_parsed', 'updated', 'updated_parsed')
+
+ATOM_FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Presse</title>
+  <entry>
+    <title>Conseil des ministres</title>
+    <link rel="enclosure" href="https://media.example/photo.jpg"/>
+    <link rel="alternate" href="https://media.example/conseil"/>
+    <id>urn:media:conseil</id>
+    <published>2026-02-03T09:12:00+01:00</published>
+    <updated>2026-02-03T10:00:00Z</updated>
+    <content type="html">Le CTRI r\xc3\xa9unit le gouvernement.</content>
+  </entry>
+</feed>"""
+
+
+def _fields(entries):
+    return [{field: entry.get(field) for field in FIELDS} for entry in entries]
+
+
+def _assert_same_as_feedparser(document):
+    expected = _fields(feedparser.parse(document).entries)
+    assert expected
+    assert _fields(parse_entries(document)) == expected
+
+
+def test_recorded_feed_matches_feedparser():
+    with open(os.path.join(DATA_DIR, 'gabonreview_feed.xml'), 'rb') as f:
+        _assert_same_as_feedparser(f.read())
+
+
+def test_synthetic_and_atom_feeds_match_feedparser():
+    _assert_same_as_feedparser(build_rss(synthetic_articles(50)))
+    _assert_same_as_feedparser(ATOM_FEED)
+    entry = parse_entries(ATOM_FEED)[0]
+    # Atom : lien « alternate », contenu à défaut de résumé
+    assert entry['link'] == 'https://media.example/conseil'
+    assert entry['summary'] == 'Le CTRI réunit le gouvernement.'
+
+
+def test_guid_stands_in_for_missing_link():
+    document = (b'<rss version="2.0"><channel>'
+                b'<item><title>Gr\xc3\xa8ve \xc3\xa0 Libreville</title><description>Pr\xc3\xa9avis</description>'
+                b'<guid>https://media.example/greve</guid></item>'
+                b'<item><title>Gr\xc3\xa8ve \xc3\xa0 Port-Gentil</title><description>Pr\xc3\xa9avis</description>'
+                b'<guid isPermaLink="false">pg-42</guid></item>'
+                b'</channel></rss>')
+    _assert_same_as_feedparser(document)
+    permalink, opaque = parse_entries(document)
+    assert permalink['link'] == 'https://media.example/greve'
+    # Sans lien, l'identifiant de l'article reste le guid (pas une chaîne vide)
+    assert 'link' not in opaque
+    assert rss_scraper.entry_item(opaque, 'Média')['external_id'] == 'pg-42'
+
+
+def test_malformed_feed_falls_back_to_feedparser():
+    document = build_rss(synthetic_articles(5)).replace(b'</title>', b'&nbsp;</title>', 3)
+    entries = parse_entries(document)
+    assert len(entries) == len(feedparser.parse(document).entries) == 5
+
+
+def test_consumer_stop_ends_reading():
+    document = build_rss(synthetic_articles(200))
+    chunks = []
+
+    def source():
+        for start in range(0, len(document), 1024):
+            chunks.append(start)
+            yield document[start:start + 1024]
+
+    entries = iter_entries(source())
+    first = [next(entries) for _ in range(3)]
+    entries.close()
+    assert [entry['title'] for entry in first] == [entry.title for entry in feedparser.parse(document).entries[:3]]
+    # Seul le début du document a été lu
+    assert len(chunks) * 1024 < len(document) / 10
+
+
+def test_download_stops_at_first_known_entry(tmp_path):
+    articles = synthetic_articles(1000)
+    document = build_rss(articles)
+    expected = feedparser.parse(document).entries
+    with LocalFeedServer({'/feed/': document}) as server:
+        fetcher = FeedFetcher(cache=ValidatorCache(str(tmp_path / 'validators.json')))
+        try:
+            # Curseur : les 5 premières entrées sont nouvelles
+            cursor = CursorScan({'guids': [articles[5]['guid']]})
+            scan = FeedScan(cursor)
+            response = fetcher.fetch(server.url('/feed/'), sink=scan)
+            full = FeedScan()
+            fetcher.fetch(server.url('/feed/'), sink=full)
+        finally:
+            fetcher.close()
+
+    assert response.error is None and scan.stopped
+    assert [entry['id'] for entry in scan.finish()] == [entry.id for entry in expected[:5]]
+    assert cursor.scanned == 5 and cursor.stopped_early
+    assert scan.bytes_read < len(document) / 10
+    assert _fields(full.finish()) == _fields(expected)
+
+
+def test_scan_hands_entries_over_and_spills_fallback_body():
+    document = build_rss(synthetic_articles(200))
+    # Entité HTML dans la dernière entrée : le parseur XML échoue en fin de document
+    end = document.rfind(b'</title>')
+    document = document[:end] + b'&nbsp;' + document[end:]
+    received = []
+    scan = FeedScan(on_entry=received.append, max_buffer=4096)
+    for start in range(0, len(document), 1024):
+        assert not scan(document[start:start + 1024])
+    # Corps du repli écrit sur disque au-delà de max_buffer, entrées transmises au fil de l'eau
+    assert scan._raw._rolled and len(received) > 150
+    assert scan.finish() == []
+    assert _fields(received) == _fields(feedparser.parse(document).entries)
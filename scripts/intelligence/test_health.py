@@ -0,0 +1,117 @@
+"""
+Disjoncteurs du registre de santé (health.py), horloge simulée et serveur HTTP local.
+
+Usage (depuis scripts/intelligence) :
+    python -m pytest test_health.py
+"""
+
+from bench.fakes import LocalFeedServer
+from feed_fetcher import FeedFetcher, ValidatorCache
+from health import CLOSED, HALF_OPEN, OPEN, CircuitOpenError, HealthRegistry
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _registry(tmp_path, clock):
+    return HealthRegistry(path=str(tmp_path / 'health.sqlite3'), failure_threshold=3, cooldown=600, clock=clock)
+
+
+def test_breaker_trips_cools_down_and_probes(tmp_path):
+    clock = Clock()
+    with _registry(tmp_path, clock) as registry:
+        for _ in range(3):
+            assert registry.allow('ddg')
+            registry.record('ddg', 10.0, TimeoutError('timeout'))
+        assert registry.get('ddg').state == OPEN
+        assert not registry.allow('ddg')
+
+        # Délai écoulé : un seul essai à la fois
+        clock.now += 601
+        assert registry.allow('ddg')
+        assert registry.get('ddg').state == HALF_OPEN
+        assert not registry.allow('ddg')
+
+        # Essai en échec : rouvert avec un délai doublé
+        registry.record('ddg', 10.0, TimeoutError('timeout'))
+        health = registry.get('ddg')
+        assert health.state == OPEN and health.cooldown == 1200
+        clock.now += 601
+        assert not registry.allow('ddg')
+
+        clock.now += 600
+        assert registry.allow('ddg')
+        registry.record('ddg', 0.2)
+        health = registry.get('ddg')
+        assert health.state == CLOSED and health.failures == 0 and health.cooldown == 600
+        assert health.calls == 5 and health.errors == 4 and health.trips == 1
+        assert 0 < health.error_rate < 1
+
+    # État persistant : une nouvelle exécution reprend le disjoncteur
+    with _registry(tmp_path, clock) as registry:
+        assert registry.get('ddg').calls == 5
+        for _ in range(3):
+            registry.record('youtube', 1.0, ValueError('quota'))
+    with _registry(tmp_path, clock) as registry:
+        try:
+            registry.check('youtube')
+        except CircuitOpenError as e:
+            assert e.key == 'youtube' and e.retry_at == clock.now + 600
+        else:
+            raise AssertionError("disjoncteur youtube fermé")
+
+
+def test_dead_feed_is_skipped_without_request(tmp_path):
+    clock = Clock()
+    with LocalFeedServer({'/feed/': b'<rss version="2.0"><channel></channel></rss>'}) as server, \
+            _registry(tmp_path, clock) as registry:
+        fetcher = FeedFetcher(cache=ValidatorCache(str(tmp_path / 'validators.json')), health=registry)
+        dead, alive = server.url('/disparu/feed/'), server.url('/feed/')
+        try:
+            for _ in range(3):
+                responses = {response.url: response for response in fetcher.fetch_all([dead, alive])}
+                assert responses[dead].error is not None and responses[alive].error is None
+            requests = server.requests
+            responses = {response.url: response for response in fetcher.fetch_all([dead, alive])}
+        finally:
+            fetcher.close()
+        assert registry.summary() == {CLOSED: 1, HALF_OPEN: 0, OPEN: 1}
+
+    assert isinstance(responses[dead].error, CircuitOpenError)
+    assert server.requests == requests + 1
+
+
+def test_registries_share_state_across_processes(tmp_path):
+    """Deux registres sur le même fichier (workers, --reset depuis un autre terminal)"""
+    clock = Clock()
+    with _registry(tmp_path, clock) as worker, _registry(tmp_path, clock) as other:
+        # Les compteurs des deux workers s'additionnent
+        worker.record('ddg', 0.1)
+        other.record('ddg', 0.3)
+        worker.record('ddg', 0.2)
+        assert worker.get('ddg').calls == other.get('ddg').calls == 3
+
+        # Échecs répartis entre les workers : le disjoncteur s'ouvre au troisième
+        worker.record('ddg', 5.0, TimeoutError('timeout'))
+        other.record('ddg', 5.0, TimeoutError('timeout'))
+        worker.record('ddg', 5.0, TimeoutError('timeout'))
+        assert not other.allow('ddg')
+
+        # Un seul essai semi-ouvert, tous registres confondus
+        clock.now += 601
+        assert worker.allow('ddg')
+        assert not other.allow('ddg')
+        worker.record('ddg', 5.0, TimeoutError('timeout'))
+        assert other.get('ddg').state == OPEN and other.get('ddg').cooldown == 1200
+
+        # Referme d'un autre registre : pris en compte, puis pas écrasé par le compte rendu suivant
+        assert other.reset('ddg')
+        assert worker.allow('ddg')
+        worker.record('ddg', 5.0, TimeoutError('timeout'))
+        health = other.get('ddg')
+        assert health.state == CLOSED and health.failures == 1 and health.calls == 8
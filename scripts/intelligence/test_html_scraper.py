@@ -0,0 +1,121 @@
+"""
+Extraction des pages de rubrique sur des pages HTML enregistrées (bench/data/html).
+
+Usage (depuis scripts/intelligence) :
+    python -m pytest test_html_scraper.py
+"""
+
+import os
+
+import rss_scraper
+from bench.fakes import LocalFeedServer
+from feed_fetcher import FeedFetcher, ValidatorCache
+from html_scraper import HtmlListing, ListingScan, extract_entries, iter_listings
+from sources import DEFAULT_HTML_SELECTORS, HTML_SELECTORS
+
+HTML_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench', 'data', 'html')
+
+FIXTURES = {
+    'infos241.html': ('https://infos241.com/', DEFAULT_HTML_SELECTORS),
+    'rfi_gabon.html': ('https://www.rfi.fr/fr/tag/gabon/', HTML_SELECTORS['RFI']),
+    'agp_gabon.html': ('https://www.agpgabon.ga/', HTML_SELECTORS['AGP Gabon']),
+}
+
+
+def _fixture(name):
+    with open(os.path.join(HTML_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def test_extracts_headlines_links_and_dates():
+    entries = extract_entries(_fixture('infos241.html'), DEFAULT_HTML_SELECTORS, 'https://infos241.com/')
+    assert [entry['title'] for entry in entries] == [
+        "Le CTRI réunit un conseil des ministres extraordinaire",
+        "Akanda : nouveaux délestages, la SEEG mise en cause",
+        "Football : les Panthères en stage de préparation",
+        "Université Omar Bongo : la grève des enseignants se durcit",
+    ]
+    # Liens relatifs résolus, navigation et widgets ignorés
+    assert entries[1]['link'] == 'https://infos241.com/2026/02/02/delestages-seeg-akanda/'
+    assert entries[1]['summary'].endswith('quartiers. Les riverains dénoncent la vie chère.')
+    assert entries[0]['published'] == '2026-02-03T09:12:00+01:00'
+
+
+def test_site_selectors():
+    rfi = extract_entries(_fixture('rfi_gabon.html'), HTML_SELECTORS['RFI'], 'https://www.rfi.fr/fr/tag/gabon/')
+    assert rfi[0]['title'] == "Gabon: le général Oligui Nguema annonce un remaniement"
+    assert rfi[0]['link'].startswith('https://www.rfi.fr/fr/afrique/20260203-gabon')
+    assert rfi[0]['summary'].startswith('Le chef de la transition')
+
+    agp = extract_entries(_fixture('agp_gabon.html'), HTML_SELECTORS['AGP Gabon'], 'https://www.agpgabon.ga/')
+    assert len(agp) == 3
+    assert agp[0]['published'] == '2026-02-03T10:45:00'
+
+
+def test_chunked_parsing_matches_whole_document():
+    for name, (base_url, selectors) in FIXTURES.items():
+        body = _fixture(name)
+        scan = ListingScan(selectors, base_url)
+        for start in range(0, len(body), 7):
+            scan(body[start:start + 7])
+        assert scan.finish() == extract_entries(body, selectors, base_url), name
+
+
+def test_scan_stops_once_enough_entries():
+    body = _fixture('infos241.html')
+    scan = ListingScan(DEFAULT_HTML_SELECTORS, 'https://infos241.com/', max_entries=2)
+    stopped_at = None
+    for start in range(0, len(body), 256):
+        if scan(body[start:start + 256]):
+            stopped_at = start + 256
+            break
+    assert stopped_at is not None and stopped_at < len(body)
+    assert len(scan.finish()) == 2
+
+
+def test_html_items_are_filtered_and_unchanged_pages_skipped(tmp_path):
+    routes = {f"/{name}": _fixture(name) for name in FIXTURES}
+    with LocalFeedServer(routes) as server:
+        listings = {
+            server.url(f"/{name}"): HtmlListing(f"Source {name}", selectors)
+            for name, (_, selectors) in FIXTURES.items()
+        }
+        fetcher = FeedFetcher(cache=ValidatorCache(str(tmp_path / 'validators.json')))
+        pages = {}
+        try:
+            items = list(rss_scraper.iter_html_items(
+                fetcher, listings, on_page=lambda url, results, error: pages.setdefault(url, error)))
+            assert list(rss_scraper.iter_html_items(fetcher, listings)) == []
+        finally:
+            fetcher.close()
+
+    assert set(pages) == set(listings) and not any(pages.values())
+    titles = {item['content'].split(' - ')[0] for item in items}
+    # Seuls les articles portant un mot-clé de la taxonomie sont retenus
+    assert "Le CTRI réunit un conseil des ministres extraordinaire" in titles
+    assert "Gabon: manifestation à Port-Gentil contre la vie chère" in titles
+    assert "Football : les Panthères en stage de préparation" not in titles
+    assert "Tournoi inter-quartiers : la finale reportée" not in titles
+    for item in items:
+        assert item['author'].startswith('Source ')
+        assert item['external_id'].startswith('http')
+        assert item['relevance_score'] > 0
+
+
+def test_legacy_charsets_from_meta_and_header(tmp_path):
+    expected = extract_entries(_fixture('infos241.html'), DEFAULT_HTML_SELECTORS, 'https://infos241.com/')
+    page = _fixture('infos241.html').decode('utf-8')
+    # Sites anciens : pages en windows-1252, charset déclaré dans la page ou seulement dans l'en-tête
+    declared = page.replace('<meta charset="UTF-8">',
+                            '<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">')
+    assert extract_entries(declared.encode('cp1252'), DEFAULT_HTML_SELECTORS, 'https://infos241.com/') == expected
+
+    undeclared = page.replace('<meta charset="UTF-8">', '').encode('cp1252')
+    with LocalFeedServer({'/': undeclared}, content_types={'/': 'text/html; charset=ISO-8859-1'}) as server:
+        fetcher = FeedFetcher(cache=ValidatorCache(str(tmp_path / 'validators.json')))
+        try:
+            (response, entries), = iter_listings(fetcher, {server.url('/'): HtmlListing('Infos241', DEFAULT_HTML_SELECTORS)})
+        finally:
+            fetcher.close()
+    assert response.error is None
+    assert [entry['title'] for entry in entries] == [entry['title'] for entry in expected]
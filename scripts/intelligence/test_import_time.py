@@ -0,0 +1,46 @@
+"""
+Budget de démarrage à froid des scrapers.
+L'import de rss_scraper / web_scraper / daemon ne doit ni lire la configuration,
+ni créer de client, ni charger les bibliothèques lourdes, et rester sous le budget.
+
+Usage (depuis scripts/intelligence) :
+    python -m pytest test_import_time.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+IMPORT_BUDGET_MS = float(os.getenv('LYNX_IMPORT_BUDGET_MS', '150'))
+HEAVY_MODULES = ['supabase', 'duckduckgo_search', 'youtubesearchpython', 'feedparser', 'requests', 'dotenv']
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import rss_scraper, web_scraper, daemon
+elapsed = (time.perf_counter() - started) * 1000
+print(json.dumps({{
+    'elapsed_ms': elapsed,
+    'loaded': [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+
+def _probe():
+    env = {key: value for key, value in os.environ.items() if not key.startswith('SUPABASE_')}
+    completed = subprocess.run([sys.executable, '-c', PROBE], cwd=HERE, env=env,
+                               capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stdout + completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_import_without_config_or_heavy_modules():
+    assert _probe()['loaded'] == []
+
+
+def test_import_time_budget():
+    # Meilleur de trois essais : on mesure le code, pas le bruit de la machine
+    best = min(_probe()['elapsed_ms'] for _ in range(3))
+    assert best < IMPORT_BUDGET_MS, f"import en {best:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
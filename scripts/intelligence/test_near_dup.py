@@ -0,0 +1,34 @@
+"""
+Regroupement des quasi-doublons (near_dup.py) sur un index temporaire.
+
+Usage (depuis scripts/intelligence) :
+    python -m pytest test_near_dup.py
+"""
+
+from near_dup import NearDuplicateIndex
+
+ARTICLE = ("Le gouvernement de transition annonce une hausse des salaires des enseignants "
+           "après trois semaines de grève dans les lycées de Libreville et de Port-Gentil")
+
+
+def _item(external_id, content, author='Média'):
+    return {'external_id': external_id, 'author': author, 'content': content}
+
+
+def test_updated_article_replaces_stored_version(tmp_path):
+    with NearDuplicateIndex(path=str(tmp_path / 'near_dup.sqlite3')) as index:
+        assert len(index.collapse([_item('https://media.example/greve', ARTICLE)])) == 1
+
+        # Même article relu avec une correction : la version reçue est émise, pas l'ancienne
+        updated = ARTICLE + " selon le ministre"
+        rows = index.collapse([_item('https://media.example/greve', updated)])
+        assert [row['content'] for row in rows] == [updated]
+        assert [s['external_id'] for s in rows[0]['sources']] == ['https://media.example/greve']
+
+        # Une reprise ultérieure est rattachée à la version enregistrée la plus récente
+        rows = index.collapse([_item('https://autre.example/reprise', updated, author='Autre')])
+        assert [row['content'] for row in rows] == [updated]
+        assert [s['external_id'] for s in rows[0]['sources']] == [
+            'https://media.example/greve', 'https://autre.example/reprise'
+        ]
+        assert index.collapsed == 1
@@ -0,0 +1,45 @@
+"""
+Rendement des requêtes (query_planner.py, web_scraper.record_query_yields) contre un moteur simulé.
+
+Usage (depuis scripts/intelligence) :
+    python -m pytest test_query_planner.py
+"""
+
+import web_scraper
+from bench.fakes import StubSearchBackend
+from pipeline import YieldTracker
+from query_cache import QueryCache
+from query_planner import QueryPlanner, build_arms
+from search_executor import SearchExecutor
+
+
+def _run(queries, executor, planner, tracker):
+    """Une exécution web : collecte, écriture simulée de tous les items, enregistrement du rendement"""
+    tracker.reset()
+    items = list(web_scraper.iter_web_news(queries, max_results_per_query=3, executor=executor,
+                                           on_query=tracker.callback('web')))
+    tracker.saved(items)
+    return items, web_scraper.record_query_yields(planner, tracker, 'web', 'ddg', queries)
+
+
+def test_cached_queries_leave_planner_unchanged(tmp_path):
+    backend = StubSearchBackend(latency=0)
+    arms = build_arms(['grève', 'corruption'], ['Libreville'], [])
+    queries = [arm.query for arm in arms]
+    with QueryCache(path=str(tmp_path / 'cache.sqlite3')) as cache, \
+            QueryPlanner(arms, path=str(tmp_path / 'planner.sqlite3')) as planner:
+        executor = SearchExecutor(backend, max_workers=2, rate=1000, burst=100, cache=cache)
+        tracker = YieldTracker()
+
+        items, yield_ = _run(queries, executor, planner, tracker)
+        assert items and yield_ is not None
+        before = planner._stats('ddg')
+        assert set(before) == set(queries)
+
+        # Deuxième exécution servie par le cache : aucun tirage, aucune érosion, aucun historique
+        items, yield_ = _run(queries, executor, planner, tracker)
+        assert backend.calls == len(queries)
+        assert items and all(tracker.outcome(f"web:{query}")['cached'] for query in queries)
+        assert yield_ is None
+        assert planner._stats('ddg') == before
+        assert len(planner.history('ddg')) == 1
@@ -0,0 +1,71 @@
+"""
+Exécuteur de recherches (search_executor.py) face au throttling, moteurs simulés.
+
+Usage (depuis scripts/intelligence) :
+    python -m pytest test_search_executor.py
+"""
+
+import threading
+
+import duckduckgo_search
+from duckduckgo_search.exceptions import DuckDuckGoSearchException, RatelimitException
+
+from bench.fakes import StubSearchBackend
+from search_executor import DDGSBackend, SearchExecutor
+
+
+class PoisonedDDGS:
+    """
+    Reproduit DDGS 6.x : la première requête reçoit un 202, puis la session refuse
+    tout appel (« Exception occurred in previous call. ») sans passer par le réseau
+    """
+
+    network_calls = 0
+    _lock = threading.Lock()
+
+    def __init__(self, timeout=10):
+        self._failed = False
+
+    def text(self, keywords, max_results=None):
+        if self._failed:
+            raise DuckDuckGoSearchException("Exception occurred in previous call.")
+        with self._lock:
+            PoisonedDDGS.network_calls += 1
+            calls = PoisonedDDGS.network_calls
+        if calls == 1:
+            self._failed = True
+            raise RatelimitException("https://html.duckduckgo.com/html 202 Ratelimit")
+        return [{'title': keywords, 'href': f"https://example.ga/{calls}", 'body': ''}]
+
+
+def test_throttled_queries_back_off_and_succeed():
+    backend = StubSearchBackend(latency=0, throttle_every=3)
+    sleeps = []
+    executor = SearchExecutor(backend, max_workers=2, rate=1000, burst=100, sleep=sleeps.append)
+    queries = [f"délestage SEEG {index}" for index in range(8)]
+    try:
+        results = list(executor.run(queries, max_results=2))
+    finally:
+        executor.close()
+
+    assert sorted(result.query for result in results) == sorted(queries)
+    assert all(result.error is None and len(result.results) == 2 for result in results)
+    assert executor.throttled == backend.calls - len(queries) > 0
+    # Recul exponentiel avant chaque nouvel essai, débit réduit par le throttling
+    assert 2.0 in sleeps
+    assert executor.limiter.rate < executor.limiter.base_rate
+
+
+def test_ddgs_session_recreated_after_rate_limit(monkeypatch):
+    monkeypatch.setattr(duckduckgo_search, 'DDGS', PoisonedDDGS)
+    monkeypatch.setattr(PoisonedDDGS, 'network_calls', 0)
+    executor = SearchExecutor(DDGSBackend(), max_workers=1, rate=1000, burst=100, sleep=lambda seconds: None)
+    try:
+        results = [executor.search(query, 3) for query in ('q1', 'q2', 'q3')]
+    finally:
+        executor.close()
+
+    assert [result.error for result in results] == [None, None, None]
+    assert results[0].attempts == 2 and executor.throttled == 1
+    # Le 202 puis une requête réseau par recherche
+    assert PoisonedDDGS.network_calls == 4
@@ -0,0 +1,104 @@
+"""
+Vidage du spool vers Supabase (supabase_writer.py, spool.py) face aux pannes et aux lignes refusées.
+
+Usage (depuis scripts/intelligence) :
+    python -m pytest test_supabase_writer.py
+"""
+
+from postgrest.exceptions import APIError
+
+from spool import WriteSpool
+from supabase_writer import BatchWriter
+
+
+class ScriptedClient:
+    """Faux client Supabase : chaque upsert est accepté ou refusé par `respond(appel, lignes)`"""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = 0
+        self.stored = {}
+
+    def table(self, name):
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self._rows = rows
+        return self
+
+    def execute(self):
+        self.calls += 1
+        error = self.respond(self.calls, self._rows)
+        if error is not None:
+            raise error
+        for row in self._rows:
+            self.stored[row['external_id']] = row
+
+
+def _rows(count):
+    return [{'external_id': f"https://presse.ga/{index}", 'content': f"article {index}"} for index in range(count)]
+
+
+def _writer(client, tmp_path, **kwargs):
+    spool = WriteSpool(path=str(tmp_path / 'spool.sqlite3'))
+    return BatchWriter(client, chunk_size=10, sleep=lambda seconds: None, spool=spool,
+                       drain_interval=3600, **kwargs), spool
+
+
+def test_outage_mid_drain_keeps_rows_in_spool(tmp_path):
+    client = ScriptedClient(lambda call, rows: None if call == 1 else RuntimeError('503 upstream timeout'))
+    writer, spool = _writer(client, tmp_path)
+    writer.extend(_rows(30))
+    result = writer.close()
+
+    assert (result.saved, result.failed, result.pending) == (10, 0, 20)
+    assert len(spool) == 20 and len(client.stored) == 10
+    # Base revenue : les lignes conservées partent au vidage suivant
+    client.respond = lambda call, rows: None
+    assert writer.flush().pending == 0 and len(client.stored) == 30
+    spool.close()
+
+
+def test_invalid_rows_are_dropped(tmp_path):
+    bad = {'external_id': 'https://presse.ga/sans-contenu', 'content': None}
+    constraint = APIError({'code': '23502', 'message': 'null value in column "content"'})
+    client = ScriptedClient(lambda call, rows: constraint if bad in rows else None)
+    writer, spool = _writer(client, tmp_path)
+    writer.extend([bad] + _rows(9))
+    result = writer.close()
+
+    assert (result.saved, result.failed, result.pending) == (9, 1, 0)
+    spool.close()
+
+
+def test_poison_row_with_unclassified_error_stops_blocking(tmp_path):
+    bad = {'external_id': 'https://presse.ga/trigger', 'content': 'x'}
+    client = ScriptedClient(lambda call, rows: RuntimeError('500 trigger failed') if bad in rows else None)
+    writer, spool = _writer(client, tmp_path, max_row_attempts=3)
+    writer.extend([bad] + _rows(9))
+    # Erreur non classée : traitée comme une panne tant que le lot n'a pas échoué 3 fois
+    assert writer.flush().pending == 10
+    assert writer.flush().pending == 10
+    result = writer.close()
+
+    assert (result.saved, result.failed, result.pending) == (9, 1, 0)
+    spool.close()
+
+
+def test_row_replaced_during_upsert_is_counted_once(tmp_path):
+    rows = _rows(3)
+    writer = None
+
+    def respond(call, sent):
+        if call == 1:
+            # Nouvelle version collectée pendant l'envoi : l'ancienne n'est pas acquittée
+            writer.add(dict(rows[0], content='article 0 (mis à jour)'))
+
+    client = ScriptedClient(respond)
+    writer, spool = _writer(client, tmp_path)
+    writer.extend(rows)
+    result = writer.close()
+
+    assert (result.saved, result.pending) == (3, 0)
+    assert client.calls == 2 and client.stored[rows[0]['external_id']]['content'] == 'article 0 (mis à jour)'
+    spool.close()
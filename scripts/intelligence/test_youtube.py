@@ -0,0 +1,87 @@
+"""
+Collecte YouTube (web_scraper.iter_youtube, video_index.py) contre un moteur simulé.
+
+Usage (depuis scripts/intelligence) :
+    python -m pytest test_youtube.py
+"""
+
+import threading
+
+import web_scraper
+from bench.fakes import StubVideoBackend
+from search_executor import SearchExecutor
+from sources import SOCIAL_HANDLES
+from video_index import VideoIndex
+
+
+class ConcurrentVideoBackend(StubVideoBackend):
+    """Moteur simulé qui mesure le nombre de recherches simultanées"""
+
+    def __init__(self, latency):
+        super().__init__(latency)
+        self.active = 0
+        self.peak = 0
+        self._active_lock = threading.Lock()
+
+    def search(self, query, max_results):
+        with self._active_lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            return super().search(query, max_results)
+        finally:
+            with self._active_lock:
+                self.active -= 1
+
+
+def _executor(backend, workers=4):
+    return SearchExecutor(backend, max_workers=workers, rate=1000, burst=100)
+
+
+def _collect(queries, backend, videos, reports=None):
+    on_query = (lambda query, items, error, cached=False: reports.append((query, len(items), error))) \
+        if reports is not None else None
+    return list(web_scraper.iter_youtube(queries, max_results_per_query=3, executor=_executor(backend),
+                                         on_query=on_query, videos=videos))
+
+
+def test_queries_run_in_parallel_with_bounded_workers(tmp_path):
+    backend = ConcurrentVideoBackend(latency=0.05)
+    queries = [f"grève enseignants {index}" for index in range(12)]
+    reports = []
+    with VideoIndex(path=str(tmp_path / 'videos.sqlite3')) as videos:
+        items = _collect(queries, backend, videos, reports)
+
+    assert backend.calls == 12 and 1 < backend.peak <= 4
+    assert len(items) == 36
+    # Chaque requête d'origine reçoit son compte rendu (la requête envoyée porte le suffixe « Gabon »)
+    assert sorted(query for query, _, _ in reports) == sorted(queries)
+    assert all(count == 3 and error is None for _, count, error in reports)
+
+
+def test_saved_videos_are_skipped_on_next_runs(tmp_path):
+    backend = StubVideoBackend(latency=0)
+    queries = ['vie chère', 'CTRI']
+    path = str(tmp_path / 'videos.sqlite3')
+
+    with VideoIndex(path=path) as videos:
+        first = _collect(queries, backend, videos)
+        # Exécution interrompue avant l'écriture d'une vidéo : elle est reproposée
+        videos.mark_saved(first[:-1])
+    with VideoIndex(path=path) as videos:
+        second = _collect(queries, backend, videos)
+        assert (videos.new, videos.known) == (0, len(first) - 1)
+
+    assert [item['external_id'] for item in second] == [first[-1]['external_id']]
+    # published_at fixé à la première observation, estimé depuis « N days ago »
+    assert second[0]['published_at'] == first[-1]['published_at']
+    dates = sorted({item['published_at'][:10] for item in first})
+    assert len(dates) == 3
+
+
+def test_channel_handles_are_added_to_planned_queries():
+    handles = [handle for group in SOCIAL_HANDLES.values() for handle in group]
+    queries = web_scraper.youtube_queries(['vie chère', f"@{handles[0]} Gabon"])
+    assert queries[0] == 'vie chère'
+    assert len(queries) == 1 + len(handles)
+    assert all(f"@{handle} Gabon" in queries for handle in handles)
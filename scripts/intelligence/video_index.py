@@ -0,0 +1,128 @@
+"""
+Lynx Eye Video Index
+Index local (SQLite en mode WAL) des vidéos YouTube rencontrées par les recherches :
+- date de première observation de chaque vidéo : published_at reste le même d'une
+  exécution à l'autre (estimé depuis « 3 days ago » quand YouTube l'indique)
+- vidéos déjà sauvegardées écartées dès la collecte, avant filtres et écriture
+- une vidéo vue mais jamais sauvegardée (exécution interrompue) est reproposée
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import settings
+from state import state_path
+
+DEFAULT_TTL_DAYS = 365
+
+# « 3 days ago », « Streamed 5 hours ago » (recherche en anglais, voir search_executor.YouTubeBackend)
+RELATIVE_AGE = re.compile(r'(\d+)\s+(second|minute|hour|day|week|month|year)s?\s+ago')
+UNIT_SECONDS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400,
+    'week': 7 * 86400,
+    'month': 30 * 86400,
+    'year': 365 * 86400,
+}
+
+
+def estimated_published(video, seen_at):
+    """Date de publication (epoch) estimée depuis l'âge affiché par YouTube, sinon seen_at"""
+    match = RELATIVE_AGE.search((video.get('publishedTime') or '').lower())
+    if not match:
+        return seen_at
+    return seen_at - int(match.group(1)) * UNIT_SECONDS[match.group(2)]
+
+
+class VideoIndex:
+    """Vidéos vues (première observation) et sauvegardées, avec expiration"""
+
+    def __init__(self, path=None, ttl_days=None, clock=time.time):
+        if ttl_days is None:
+            ttl_days = settings.get('LYNX_VIDEO_TTL_DAYS', DEFAULT_TTL_DAYS, float)
+        self.path = path or state_path('videos.sqlite3')
+        self.ttl = ttl_days * 86400
+        self._clock = clock
+        self.known = 0
+        self.new = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS videos ('
+            ' video_id TEXT PRIMARY KEY,'
+            ' first_seen REAL NOT NULL,'
+            ' published_at TEXT NOT NULL,'
+            ' saved_at REAL)'
+        )
+        self._conn.commit()
+        self.evict_expired()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def observe(self, videos):
+        """
+        Vidéos encore jamais sauvegardées, avec leur date de publication stable :
+        liste de (vidéo, published_at ISO) ; les nouvelles vidéos sont enregistrées
+        """
+        now = self._clock()
+        fresh = []
+        with self._lock:
+            for video in videos:
+                video_id = video.get('id')
+                if not video_id:
+                    continue
+                row = self._conn.execute(
+                    'SELECT published_at, saved_at FROM videos WHERE video_id = ?', (video_id,)
+                ).fetchone()
+                if row is None:
+                    published_at = datetime.fromtimestamp(estimated_published(video, now)).isoformat(timespec='seconds')
+                    self._conn.execute(
+                        'INSERT INTO videos (video_id, first_seen, published_at) VALUES (?, ?, ?)',
+                        (video_id, now, published_at)
+                    )
+                    self.new += 1
+                elif row[1] is not None:
+                    self.known += 1
+                    continue
+                else:
+                    published_at = row[0]
+                fresh.append((video, published_at))
+            self._conn.commit()
+        return fresh
+
+    def mark_saved(self, rows):
+        """Callback on_saved du writer (les lignes qui ne sont pas des vidéos sont ignorées)"""
+        now = self._clock()
+        with self._lock:
+            self._conn.executemany(
+                'UPDATE videos SET saved_at = ? WHERE video_id = ? AND saved_at IS NULL',
+                [(now, row['external_id']) for row in rows if row.get('external_id')]
+            )
+            self._conn.commit()
+
+    def evict_expired(self):
+        """Oublie les vidéos vues pour la première fois avant le TTL ; retourne leur nombre"""
+        with self._lock:
+            removed = self._conn.execute(
+                'DELETE FROM videos WHERE first_seen < ?', (self._clock() - self.ttl,)
+            ).rowcount
+            self._conn.commit()
+        return removed
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM videos').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
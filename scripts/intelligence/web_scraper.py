@@ -8,106 +8,240 @@ Installation:
 pip install supabase duckduckgo-search youtube-search-python python-dotenv
 """
 
-import os
 import sys
-import random
+import time
 from datetime import datetime
-from dotenv import load_dotenv
-from supabase import create_client
-from duckduckgo_search import DDGS
-from youtubesearchpython import VideosSearch
+from matcher import KeywordMatcher
+from relevance import RelevanceScorer
+from supabase_writer import BatchWriter, configured_chunk_size
+from spool import WriteSpool
+from archive import ArchiveWriter
+from term_index import TermIndex
+from search_executor import SearchExecutor, DDGSBackend, YouTubeBackend
+from video_index import VideoIndex
+from sources import get_youtube_channel_queries
+from query_cache import QueryCache
+from health import CircuitOpenError, HealthRegistry
+from seen_index import SeenIndex
+from near_dup import NearDuplicateIndex
+from pipeline import Pipeline, YieldTracker, collection_stages
+from query_planner import QueryPlanner, build_arms
+from clients import supabase_client
+from settings import ConfigError
+import settings
+import metrics
 
 # Importer le module keywords
 try:
-    from keywords import get_daily_keywords, generate_search_queries, PRIORITY_KEYWORDS
+    from keywords import (get_keyword_terms, PRIORITY_KEYWORDS, INTELLIGENCE_KEYWORDS,
+                          GABON_CONTEXT_KEYWORDS, MODIFIERS, CITIES)
 except ImportError:
     print("⚠️  keywords.py non trouvé, utilisation de mots-clés de base")
+    from collections import namedtuple
     PRIORITY_KEYWORDS = ["gabon", "oligui", "libreville"]
-    get_daily_keywords = lambda count: PRIORITY_KEYWORDS
-    generate_search_queries = lambda kw, max_q: kw
+    INTELLIGENCE_KEYWORDS = []
+    GABON_CONTEXT_KEYWORDS = ["gabon", "gabonais", "gabonaise", "gabonaises"]
+    MODIFIERS = []
+    CITIES = []
+    KeywordTerm = namedtuple('KeywordTerm', ['term', 'category', 'weight'])
+    get_keyword_terms = lambda: [KeywordTerm(kw, 'autre', 1.0) for kw in PRIORITY_KEYWORDS]
 
-load_dotenv()
+# Budgets et parallélisme des recherches (LYNX_WEB_QUERY_BUDGET, LYNX_YOUTUBE_QUERY_BUDGET,
+# LYNX_SEARCH_WORKERS, LYNX_SEARCH_RATE)
+DEFAULT_WEB_QUERY_BUDGET = 15
+DEFAULT_YOUTUBE_QUERY_BUDGET = 5
+DEFAULT_SEARCH_WORKERS = 4
+DEFAULT_SEARCH_RATE = 1.0
+# Recherches YouTube simultanées et débit maximal en requêtes/s (LYNX_YOUTUBE_WORKERS, LYNX_YOUTUBE_RATE)
+DEFAULT_YOUTUBE_WORKERS = 4
+DEFAULT_YOUTUBE_RATE = 5.0
 
-# Configuration Supabase
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+def web_query_budget():
+    return settings.get('LYNX_WEB_QUERY_BUDGET', DEFAULT_WEB_QUERY_BUDGET, int)
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    print("❌ Erreur: Variables SUPABASE_URL et SUPABASE_SERVICE_ROLE_KEY requises dans .env")
-    sys.exit(1)
+def youtube_query_budget():
+    return settings.get('LYNX_YOUTUBE_QUERY_BUDGET', DEFAULT_YOUTUBE_QUERY_BUDGET, int)
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+def query_planner():
+    """Planificateur de requêtes sur les combinaisons mot-clé / modificateur / ville"""
+    return QueryPlanner(build_arms(PRIORITY_KEYWORDS + INTELLIGENCE_KEYWORDS, MODIFIERS, CITIES),
+                        PRIORITY_KEYWORDS)
 
-def scrape_web_news(queries, max_results_per_query=3):
-    """Scrape web news using DuckDuckGo avec rotation intelligente"""
-    results = []
-    
+def record_query_yields(planner, tracker, prefix, engine, queries, decay=True, pending=0):
+    """
+    Enregistre le rendement de chaque requête réussie et servie par le moteur (une requête servie
+    par le cache ne rapporte que des résultats déjà vus) ; retourne le rendement moyen de l'exécution.
+    pending : lignes restées dans le spool (Supabase indisponible) ; les items nouveaux n'ont
+              pas pu être comptés, l'exécution n'est pas enregistrée (retourne None)
+    """
+    if pending:
+        return None
+    for query in queries:
+        outcome = tracker.outcome(f"{prefix}:{query}")
+        if not outcome['failed'] and not outcome['cached']:
+            planner.record(query, outcome['new'], engine)
+    return planner.finish_run(engine, decay)
+
+def search_executor(cache=None, health=None):
+    """Exécuteur DuckDuckGo configuré (duckduckgo_search importé à la construction)"""
+    return SearchExecutor(
+        DDGSBackend(),
+        max_workers=settings.get('LYNX_SEARCH_WORKERS', DEFAULT_SEARCH_WORKERS, int),
+        rate=settings.get('LYNX_SEARCH_RATE', DEFAULT_SEARCH_RATE, float),
+        cache=cache,
+        health=health
+    )
+
+def youtube_executor(cache=None, health=None):
+    """Exécuteur YouTube configuré (youtubesearchpython importé à la construction)"""
+    workers = settings.get('LYNX_YOUTUBE_WORKERS', DEFAULT_YOUTUBE_WORKERS, int)
+    return SearchExecutor(
+        YouTubeBackend(),
+        max_workers=workers,
+        rate=settings.get('LYNX_YOUTUBE_RATE', DEFAULT_YOUTUBE_RATE, float),
+        burst=workers,
+        cache=cache,
+        health=health
+    )
+
+def youtube_queries(planned):
+    """Requêtes YouTube de l'exécution : requêtes planifiées + une par compte suivi (SOCIAL_HANDLES)"""
+    return list(dict.fromkeys(list(planned) + get_youtube_channel_queries()))
+
+# Automates compilés une seule fois : filtre de contexte gabonais et score de pertinence
+GABON_MATCHER = KeywordMatcher(GABON_CONTEXT_KEYWORDS)
+SCORER = RelevanceScorer(get_keyword_terms())
+
+def iter_web_news(queries, max_results_per_query=3, executor=None, cache=None, on_query=None, health=None):
+    """
+    Génère les résultats web DuckDuckGo au fil des requêtes (parallèles, sessions par worker).
+    on_query : callback(requête, items, erreur, cached=) appelé après chaque requête
+    health   : registre de santé de l'exécuteur créé ici (disjoncteur du moteur 'ddg')
+    """
     print(f"🌐 Scraping Web pour {len(queries)} requêtes...")
     
-    for i, query in enumerate(queries, 1):
-        try:
-            with DDGS() as ddgs:
-                search_results = list(ddgs.text(query, max_results=max_results_per_query))
-                
-                for result in search_results:
-                    # Filtrer les résultats hors contexte gabonais
-                    if 'gabon' in result.get('body', '').lower() or 'gabon' in result.get('title', '').lower():
-                        results.append({
-                            'content': f"{result.get('title', '')} - {result.get('body', '')}",
-                            'author': result.get('link', 'Unknown'),
-                            'external_id': result.get('link', ''),
-                            'published_at': datetime.now().isoformat()
-                        })
-                
-            print(f"  [{i}/{len(queries)}] {query}: {len(search_results)} résultats")
-                
-        except Exception as e:
-            print(f"  ✗ Erreur pour '{query}': {e}")
-    
-    return results
-
-def scrape_youtube(queries, max_results_per_query=2):
-    """Scrape YouTube videos avec filtre Gabon"""
-    results = []
+    owns_executor = executor is None
+    executor = executor or search_executor(cache, health)
     
-    print(f"📺 Scraping YouTube pour {len(queries)} requêtes...")
+    run_metrics = metrics.current()
     
-    for i, query in enumerate(queries, 1):
-        try:
-            # Ajouter "Gabon" si pas déjà présent
-            search_query = query if 'gabon' in query.lower() else f"{query} Gabon"
+    try:
+        for i, search in enumerate(executor.run(queries, max_results_per_query), 1):
+            if isinstance(search.error, CircuitOpenError):
+                print(f"  ⏸️  '{search.query}' ignorée (DuckDuckGo : {search.error})")
+                if on_query:
+                    on_query(search.query, [], search.error)
+                continue
+            if search.error:
+                print(f"  ✗ Erreur pour '{search.query}': {search.error}")
+                if on_query:
+                    on_query(search.query, [], search.error)
+                continue
             
-            videos_search = VideosSearch(search_query, limit=max_results_per_query)
-            search_results = videos_search.result()
+            origin = "cache" if search.cached else f"{search.elapsed:.1f}s"
+            print(f"  [{i}/{len(queries)}] {search.query}: {len(search.results)} résultats ({origin})")
             
-            for video in search_results.get('result', []):
-                results.append({
-                    'content': f"{video.get('title', '')} - {video.get('descriptionSnippet', [{}])[0].get('text', '')}",
-                    'author': video.get('channel', {}).get('name', 'Unknown'),
-                    'external_id': video.get('id', ''),
-                    'published_at': datetime.now().isoformat()
-                })
-            
-            print(f"  [{i}/{len(queries)}] {search_query}: {len(search_results.get('result', []))} vidéos")
-                
-        except Exception as e:
-            print(f"  ✗ Erreur pour '{query}': {e}")
+            started = time.perf_counter()
+            items = []
+            for result in search.results:
+                # Filtrer les résultats hors contexte gabonais
+                text = f"{result.get('title', '')} {result.get('body', '')}"
+                if GABON_MATCHER.search(text):
+                    items.append(SCORER.annotate({
+                        'content': f"{result.get('title', '')} - {result.get('body', '')}",
+                        'author': result.get('href', result.get('link', 'Unknown')),
+                        'external_id': result.get('href', result.get('link', '')),
+                        'published_at': datetime.now().isoformat()
+                    }, SCORER.score(text)))
+            run_metrics.add_stage_time('parse', time.perf_counter() - started)
+            run_metrics.count_items('parse', len(search.results), len(items))
+            if on_query:
+                on_query(search.query, items, None, cached=search.cached)
+            yield from items
+    finally:
+        if owns_executor:
+            executor.close()
     
-    return results
+    if executor.throttled:
+        print(f"  ⏳ Throttling DuckDuckGo: {executor.throttled} fois (débit réduit à {executor.limiter.rate:.2f} req/s)")
+
+def scrape_web_news(queries, max_results_per_query=3, executor=None, cache=None):
+    """Scrape web news using DuckDuckGo (requêtes parallèles, sessions par worker)"""
+    return list(iter_web_news(queries, max_results_per_query, executor, cache))
 
-def save_to_supabase(items):
-    """Save items to Supabase intelligence_items table"""
-    saved_count = 0
+def iter_youtube(queries, max_results_per_query=2, executor=None, cache=None, on_query=None, health=None,
+                 videos=None):
+    """
+    Génère les vidéos YouTube au fil des requêtes (parallèles, même exécuteur que le web), avec filtre Gabon.
+    executor : exécuteur YouTube (par défaut youtube_executor(cache, health), fermé en fin de collecte)
+    on_query : callback(requête, items, erreur, cached=) appelé après chaque requête
+    videos   : VideoIndex ; vidéos déjà sauvegardées écartées, published_at = date de première observation
+    """
+    print(f"📺 Scraping YouTube pour {len(queries)} requêtes...")
     
-    for item in items:
-        try:
-            # Upsert (insert or update if external_id exists)
-            supabase.table('intelligence_items').upsert(item, on_conflict='external_id').execute()
-            saved_count += 1
-        except Exception as e:
-            print(f"  ✗ Erreur sauvegarde: {e}")
+    owns_executor = executor is None
+    executor = executor or youtube_executor(cache, health)
+    run_metrics = metrics.current()
     
-    return saved_count
+    # Ajouter "Gabon" si pas déjà présent ; requête envoyée -> requêtes d'origine
+    search_queries = {}
+    for query in queries:
+        search_query = query if GABON_MATCHER.search(query) else f"{query} Gabon"
+        search_queries.setdefault(search_query, []).append(query)
+    
+    def report(search_query, items, error, cached=False):
+        if on_query:
+            for query in search_queries[search_query]:
+                on_query(query, items, error, cached=cached)
+    
+    try:
+        for i, search in enumerate(executor.run(search_queries, max_results_per_query), 1):
+            if isinstance(search.error, CircuitOpenError):
+                print(f"  ⏸️  '{search.query}' ignorée (YouTube : {search.error})")
+                report(search.query, [], search.error)
+                continue
+            if search.error:
+                print(f"  ✗ Erreur pour '{search.query}': {search.error}")
+                report(search.query, [], search.error)
+                continue
+            
+            started = time.perf_counter()
+            if videos is not None:
+                fresh = videos.observe(search.results)
+            else:
+                now = datetime.now().isoformat()
+                fresh = [(video, now) for video in search.results]
+            items = []
+            for video, published_at in fresh:
+                content = f"{video.get('title', '')} - {(video.get('descriptionSnippet') or [{}])[0].get('text', '')}"
+                items.append(SCORER.annotate({
+                    'content': content,
+                    'author': (video.get('channel') or {}).get('name', 'Unknown'),
+                    'external_id': video.get('id', ''),
+                    'published_at': published_at
+                }, SCORER.score(content)))
+            run_metrics.add_stage_time('parse', time.perf_counter() - started)
+            run_metrics.count_items('parse', len(search.results), len(items))
+            
+            origin = "cache" if search.cached else f"{search.elapsed:.1f}s"
+            print(f"  [{i}/{len(search_queries)}] {search.query}: {len(search.results)} vidéos, "
+                  f"{len(items)} nouvelles ({origin})")
+            report(search.query, items, None, cached=search.cached)
+            yield from items
+    finally:
+        if owns_executor:
+            executor.close()
+
+def scrape_youtube(queries, max_results_per_query=2, cache=None):
+    """Scrape YouTube videos avec filtre Gabon"""
+    return list(iter_youtube(queries, max_results_per_query, cache=cache))
+
+def save_to_supabase(items, on_saved=None):
+    """Save items to Supabase intelligence_items table (upserts groupés par chunks)"""
+    with WriteSpool() as spool:
+        writer = BatchWriter(supabase_client(), chunk_size=configured_chunk_size(), on_saved=on_saved, spool=spool)
+        writer.extend(items)
+        return writer.close()
 
 def main():
     print("=" * 60)
@@ -116,40 +250,84 @@ def main():
     print(f"⏰ Exécution: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
-    # Sélection intelligente des mots-clés
-    print("🎯 Sélection des mots-clés du jour...")
-    daily_keywords = get_daily_keywords(count=20)
-    print(f"   Keywords sélectionnés: {len(daily_keywords)}")
-    print(f"   Prioritaires: {', '.join(PRIORITY_KEYWORDS[:5])}...")
-    print()
-    
-    # Génération des requêtes optimisées
-    print("🔧 Génération des requêtes de recherche...")
-    search_queries = generate_search_queries(daily_keywords, max_queries=15)
-    print(f"   Requêtes générées: {len(search_queries)}")
-    print(f"   Exemples: {', '.join(search_queries[:3])}...")
-    print()
+    try:
+        supabase = supabase_client()
+    except ConfigError as e:
+        print(f"❌ Erreur: {e}")
+        sys.exit(1)
     
-    # Scraping Web
-    web_results = scrape_web_news(search_queries, max_results_per_query=3)
-    print(f"✓ Web: {len(web_results)} items collectés")
-    print()
-    
-    # Scraping YouTube
-    youtube_queries = random.sample(search_queries, min(5, len(search_queries)))
-    youtube_results = scrape_youtube(youtube_queries, max_results_per_query=2)
-    print(f"✓ YouTube: {len(youtube_results)} items collectés")
-    print()
+    run_metrics = metrics.start_run('web')
     
-    # Sauvegarde dans Supabase
-    all_results = web_results + youtube_results
+    # Collecte en flux : Web + YouTube -> items déjà envoyés écartés -> quasi-doublons
+    # regroupés -> spool local -> upserts groupés au fil de l'eau
+    with query_planner() as planner, QueryCache() as query_cache, HealthRegistry() as health, \
+            SeenIndex() as seen_index, NearDuplicateIndex() as dedup_index, WriteSpool() as spool, \
+            ArchiveWriter() as archive, TermIndex() as term_index, VideoIndex() as video_index:
+        term_index.ensure_keywords(SCORER.matcher.keywords)
+        # Budget réparti selon le rendement passé de chaque combinaison de requête
+        print("🎯 Planification des requêtes (rendement des exécutions précédentes)...")
+        search_queries = planner.plan(web_query_budget(), engine='ddg')
+        # YouTube : budget planifié + une requête par compte suivi
+        planned_videos = planner.plan(youtube_query_budget(), engine='youtube')
+        video_queries = youtube_queries(planned_videos)
+        print(f"   Requêtes web: {len(search_queries)} | YouTube: {len(video_queries)} "
+              f"(dont {len(video_queries) - len(planned_videos)} comptes suivis)")
+        print(f"   Exemples: {', '.join(search_queries[:3])}...")
+        print()
+        
+        tracker = YieldTracker()
+        
+        def on_saved(rows):
+            seen_index.mark_items(rows)
+            archive.add_rows(rows)
+            term_index.add_saved(rows)
+            video_index.mark_saved(rows)
+            tracker.saved(rows)
+        
+        writer = BatchWriter(supabase, chunk_size=configured_chunk_size(), on_saved=on_saved, spool=spool)
+        pipeline = Pipeline(
+            sources={
+                'web': lambda: iter_web_news(search_queries, max_results_per_query=3, cache=query_cache,
+                                             on_query=tracker.callback('web'), health=health),
+                'youtube': lambda: iter_youtube(video_queries, max_results_per_query=2, cache=query_cache,
+                                                on_query=tracker.callback('youtube'), health=health,
+                                                videos=video_index),
+            },
+            stages=collection_stages(seen_index, dedup_index),
+            sink=writer
+        )
+        pipeline.run()
+        result = writer.close()
+        
+        web_yield = record_query_yields(planner, tracker, 'web', 'ddg', search_queries, pending=result.pending)
+        # Seules les requêtes planifiées alimentent le planificateur
+        youtube_yield = record_query_yields(planner, tracker, 'youtube', 'youtube', planned_videos,
+                                            pending=result.pending)
+        if result.pending:
+            print(f"📈 Rendement des requêtes non enregistré ({result.pending} lignes en attente dans le spool)")
+        
+        print()
+        print("📊 Bilan de la collecte:")
+        pipeline.print_summary(result)
+        
+        cache_stats = query_cache.stats()
+        print(f"🗄️  Cache requêtes: {cache_stats['hits']} hits, {cache_stats['stale_hits']} périmés servis, "
+              f"{cache_stats['misses']} appels réseau")
+        print(f"🔁 Index local: {seen_index.hits} déjà connus, {seen_index.misses} nouveaux")
+        print(f"🧬 Quasi-doublons regroupés: {dedup_index.collapsed}")
+        print(f"📺 Vidéos: {video_index.new} nouvelles, {video_index.known} déjà sauvegardées écartées")
+        health.print_summary()
+        
+        for label, engine, run_yield in (('Web', 'ddg', web_yield), ('YouTube', 'youtube', youtube_yield)):
+            if run_yield is None:
+                continue
+            history = [value for _, value in planner.history(engine)]
+            print(f"📈 Rendement {label}: {run_yield:.2f} items nouveaux / requête "
+                  f"(moyenne des {len(history)} dernières exécutions: {sum(history) / len(history):.2f})")
     
-    if all_results:
-        print(f"💾 Enregistrement dans Supabase...")
-        saved = save_to_supabase(all_results)
-        print(f"✅ {saved}/{len(all_results)} items sauvegardés avec succès")
-    else:
-        print("⚠️  Aucun résultat à sauvegarder")
+    run_metrics.print_summary()
+    for path in run_metrics.export():
+        print(f"📈 Métriques écrites dans {path}")
     
     print()
     print("=" * 60)
@@ -915,9 +915,13 @@ export type Database = {
           entities: Json | null
           external_id: string | null
           id: string
+          keyword_hits: Json | null
+          matched_keywords: string[] | null
           published_at: string | null
+          relevance_score: number | null
           sentiment: string | null
           source_id: string | null
+          sources: Json | null
           summary: string | null
           updated_at: string | null
         }
@@ -930,9 +934,13 @@ export type Database = {
           entities?: Json | null
           external_id?: string | null
           id?: string
+          keyword_hits?: Json | null
+          matched_keywords?: string[] | null
           published_at?: string | null
+          relevance_score?: number | null
           sentiment?: string | null
           source_id?: string | null
+          sources?: Json | null
           summary?: string | null
           updated_at?: string | null
         }
@@ -945,9 +953,13 @@ export type Database = {
           entities?: Json | null
           external_id?: string | null
           id?: string
+          keyword_hits?: Json | null
+          matched_keywords?: string[] | null
           published_at?: string | null
+          relevance_score?: number | null
           sentiment?: string | null
           source_id?: string | null
+          sources?: Json | null
           summary?: string | null
           updated_at?: string | null
         }
@@ -16,11 +16,12 @@ Deno.serve(async (req: Request) => {
     }
 
     try {
-        // 1. Find items without embeddings
+        // 1. Find items without embeddings (most relevant first, scored by the scraper)
         const { data: items, error } = await supabase
             .from("intelligence_items")
             .select("id, content, author, source_id, published_at")
             .is("embedding", null)
+            .order("relevance_score", { ascending: false, nullsFirst: false })
             .limit(50); // Process in batches of 50 to avoid timeouts
 
         if (error) throw error;
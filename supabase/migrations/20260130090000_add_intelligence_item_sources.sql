@@ -0,0 +1,6 @@
+-- Sources multiples d'un même article (reprises RSS / web / YouTube regroupées par le scraper)
+ALTER TABLE public.intelligence_items
+ADD COLUMN IF NOT EXISTS sources JSONB DEFAULT '[]'::jsonb;
+
+COMMENT ON COLUMN public.intelligence_items.sources IS
+'Liste des sources ({external_id, author}) ayant publié ce contenu ou un quasi-doublon';
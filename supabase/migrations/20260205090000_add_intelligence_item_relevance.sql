@@ -0,0 +1,15 @@
+-- Score de pertinence calculé par le scraper à partir de la taxonomie de mots-clés
+ALTER TABLE public.intelligence_items
+ADD COLUMN IF NOT EXISTS relevance_score NUMERIC,
+ADD COLUMN IF NOT EXISTS keyword_hits JSONB DEFAULT '{}'::jsonb,
+ADD COLUMN IF NOT EXISTS matched_keywords TEXT[] DEFAULT '{}';
+
+CREATE INDEX IF NOT EXISTS idx_intelligence_items_relevance_score
+ON public.intelligence_items(relevance_score DESC NULLS LAST);
+
+COMMENT ON COLUMN public.intelligence_items.relevance_score IS
+'Score pondéré des mots-clés trouvés (poids par catégorie / terme, prioritaires renforcés)';
+COMMENT ON COLUMN public.intelligence_items.keyword_hits IS
+'Nombre d''occurrences par catégorie de la taxonomie (politique, securite, economie...)';
+COMMENT ON COLUMN public.intelligence_items.matched_keywords IS
+'Mots-clés distincts trouvés, dans l''ordre d''apparition';